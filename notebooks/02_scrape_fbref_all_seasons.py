@@ -1,158 +1,113 @@
+import multiprocessing
 import os
 import time
 import pandas as pd
-from bs4 import BeautifulSoup, Comment
-import requests
-import random
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 import sys
 print("🟢 Starting scrape of all seasons...")
 # ---- Configuration ----
-BASE_URL = "https://fbref.com"
-COMPETITION_URL_TEMPLATE = BASE_URL + "/en/comps/9/{season_id}/{season_str}-Premier-League-Stats"
-SEASONS = list(range(2000, 2026))  # 2000 to 2025
+# Table keys, div ids and URLs are shared with scrape_scheduler.py (multi-competition)
+from fbref_pages import (DEFAULT_COMPETITION, SEASONS, TABLES, extract_tables, make_session, page_url, pages_for,
+                         response_bytes, season_str, table_path, write_table)
+# Every fetched page is archived, so tables can be re-extracted offline (html_archive.py extract)
+from html_archive import ARCHIVE_DIR, HtmlArchive
+# --pipeline: overlapped fetch / parse / write stages (scrape_pipeline.py)
+from scrape_pipeline import ScrapePipeline, plan_pages
+# Request spacing adapts to 429 / Retry-After / latency (AIMD) and is remembered between runs
+from rate_control import AdaptiveRateLimiter, polite_get
+
 OUTPUT_DIR = "data/raw"
 LOG_PATH = "data/fbref_scrape_log.csv"
+RUNS_LOG_PATH = "data/fbref_scrape_runs.csv"
+PIPELINE = "--pipeline" in sys.argv
+PARSE_WORKERS = 2
 
-# Tables we want to scrape
-TABLES = {
-    "squad_standard": "Squad Standard Stats",
-    "squad_shooting": "Squad Shooting",
-    "squad_passing": "Squad Pass Types",
-    "squad_goal_shot_creation": "Squad Goal and Shot Creation",
-    "squad_defensive": "Squad Defensive Actions",
-    "squad_possession": "Squad Possession",
-    "squad_playing_time": "Squad Playing Time",
-    "squad_misc": "Squad Miscellaneous Stats",
-    "squad_goalkeeping": "Squad Goalkeeping",
-    "squad_adv_goalkeeping": "Squad Advanced Goalkeeping",
-    "league_table": "Premier League Table",
-}
-
-DIV_ID_MAP = {
-    "squad_standard": "all_stats_squads_standard",
-    "squad_shooting": "all_stats_squads_shooting",
-    "squad_passing": "all_stats_squads_passing",
-    "squad_goal_shot_creation": "all_stats_squads_gca",
-    "squad_defensive": "all_stats_squads_defense",
-    "squad_possession": "all_stats_squads_possession",
-    "squad_playing_time": "all_stats_squads_playing_time",
-    "squad_misc": "all_stats_squads_misc",
-    "squad_goalkeeping": "all_stats_keeper_squads",
-    "squad_adv_goalkeeping": "all_stats_keeper_adv_squads",
-    "league_table": "all_stats_league_table",
-}
+# Parse workers must be forked: this script has no __main__ guard, so a spawned
+# worker would re-run the whole scrape
+if PIPELINE and 'fork' not in multiprocessing.get_all_start_methods():
+    print("🔥 --pipeline needs the 'fork' start method, which this platform lacks; "
+          "use python notebooks/scrape_pipeline.py instead")
+    sys.exit(1)
 
 # ---- Ensure output dir exists ----
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # ---- Initialize logging ----
 log_data = []
+archive = HtmlArchive(ARCHIVE_DIR)
 
-# ---- Setup session with retries and headers ----
-session = requests.Session()
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=10,
-    status_forcelist=[429, 500, 502, 503, 504],
-    allowed_methods=["GET"]
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session.mount("https://", adapter)
-session.mount("http://", adapter)
-
-user_agents = [
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-]
-
-session.headers.update({
-    "User-Agent": random.choice(user_agents),
-    "Referer": "https://fbref.com/en/comps/9/Premier-League-Stats",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-})
-
-# ---- Scrape all available seasons ----
-SEASONS = list(range(2000, 2026))  # 2000 to 2025
-
-print("⏳ Waiting before starting scrape to mimic human behavior...")
-time.sleep(random.uniform(10.0, 20.0))
+# ---- Setup session and rate limiter (retries go through the limiter: rate_control.polite_get) ----
+session = make_session()
+limiter = AdaptiveRateLimiter.load()
+print(f"⏱️ Request spacing: {limiter.interval:.1f}s (learned, {limiter.min_interval:.0f}-{limiter.max_interval:.0f}s bounds)")
 
 # ---- Main scrape loop ----
-for season in SEASONS:
-    already_scraped = all(
-        os.path.exists(f"{OUTPUT_DIR}/fbref_{key}_{season}-{(season + 1) % 100:02d}.csv")
-        for key in TABLES
-    )
-    if already_scraped:
-        print(f"⏭️ Skipping {season} (already scraped)")
-        continue
-
-    print(f"📅 Scraping {season}...")
-    season_str = f"{season}-{(season + 1) % 100:02d}"
-    season_id = f"{season}-{season + 1}"
-    url = COMPETITION_URL_TEMPLATE.format(season_id=season_id, season_str=season_str)
-
-    try:
-        print(f"🔍 Fetching URL: {url}")
-        response = session.get(url, timeout=15)
-        response.raise_for_status()
-        if response.status_code != 200:
-            print(f"❌ HTTP Error {response.status_code} for {url}")
-            log_data.append({**{"season": season_str}, **{k: "missing" for k in TABLES}})
+# Only the pages carrying missing tables are fetched (fbref_pages.pages_for): a
+# partial refresh downloads a few small stats sub-pages, a new season one overview.
+run_pages = 0
+run_bytes = 0
+run_started = time.strftime("%Y-%m-%d %H:%M:%S")
+
+if PIPELINE:
+    # Fetch, parse and write overlap (scrape_pipeline.py): same pages, same request rate,
+    # parsing no longer adds to the crawl time. The log has one row per page.
+    pipeline = ScrapePipeline(limiter, raw_dir=OUTPUT_DIR, archive=archive,
+                              parse_workers=PARSE_WORKERS)
+    pipeline_start = time.perf_counter()
+    log_data = pipeline.run(plan_pages([DEFAULT_COMPETITION], SEASONS, list(TABLES), OUTPUT_DIR))
+    pipeline.report(time.perf_counter() - pipeline_start)
+    run_pages = sum(row["error"] is None for row in log_data)
+    run_bytes = pipeline.bytes
+else:
+    for season in SEASONS:
+        label = season_str(season)
+        missing = [key for key in TABLES if not table_path(DEFAULT_COMPETITION, key, season, OUTPUT_DIR).exists()]
+        if not missing:
+            print(f"⏭️ Skipping {season} (already scraped)")
             continue
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        season_log = {"season": season_str}
-
-        for key, label in TABLES.items():
-            found = False
-            div_id = DIV_ID_MAP.get(key)
-            if not div_id:
-                print(f"⚠️ No div ID found for {key}")
-                season_log[key] = "missing"
-                continue
-
-            table_div = soup.find("div", id=div_id)
-            if not table_div:
-                print(f"⚠️ Div not found: {div_id} for {key}")
-                season_log[key] = "missing"
-                continue
-
-            comment = next((c for c in table_div.children if isinstance(c, Comment)), None)
-            table_soup = BeautifulSoup(comment, "html.parser") if comment else table_div
-
-            try:
-                table = table_soup.find("table")
-                if table:
-                    df = pd.read_html(str(table))[0]
-                    filename = f"{OUTPUT_DIR}/fbref_{key}_{season_str}.csv"
-                    df["season"] = season_str
-                    df.to_csv(filename, index=False)
-                    found = True
-            except Exception as e:
-                print(f"⚠️ Error processing {key} ({label}) for {season_str}: {e}")
-
-            if not found:
-                print(f"⚠️ Table not found: {key} ({label}) in {season_str}")
-            season_log[key] = "yes" if found else "missing"
-            time.sleep(random.uniform(4.0, 7.0))
-
-        log_data.append(season_log)
-        print(f"✅ Done {season_str}")
-        time.sleep(random.uniform(5.0, 10.0))  # Light pause after a season
-
-    except Exception as e:
-        print(f"🔥 Exception occurred for {season_str}: {e}")
-        sys.stdout.flush()
-        time.sleep(random.uniform(60.0, 90.0))  # back off harder on errors
-        log_data.append({**{"season": season_str}, **{k: "error" for k in TABLES}})
+        pages = pages_for(missing)
+        print(f"📅 Scraping {season} ({len(missing)} missing table(s) on {len(pages)} page(s))...")
+        season_log = {"season": label, **{k: "yes" for k in TABLES if k not in missing}}
+        season_bytes = 0
+
+        try:
+            for page, keys in pages.items():
+                url = page_url(DEFAULT_COMPETITION, season, page)
+                print(f"🔍 Fetching URL: {url}")
+                response = polite_get(session, url, limiter, timeout=15)
+                season_bytes += response_bytes(response)
+                run_pages += 1
+                archive.put(url, response.text, DEFAULT_COMPETITION, season, page)
+
+                tables = extract_tables(response.text, keys)
+                for key in keys:
+                    found = tables[key] is not None
+                    if found:
+                        write_table(tables[key], DEFAULT_COMPETITION, key, season, OUTPUT_DIR)
+                    else:
+                        print(f"⚠️ Table not found: {key} ({TABLES[key]}) in {label}")
+                    season_log[key] = "yes" if found else "missing"
+
+            run_bytes += season_bytes
+            log_data.append({**season_log, "pages": len(pages), "bytes": season_bytes})
+            print(f"✅ Done {label} ({season_bytes / 1024:.0f} KB)")
+
+        except Exception as e:
+            print(f"🔥 Exception occurred for {label}: {e}")
+            sys.stdout.flush()
+            run_bytes += season_bytes  # the limiter has already backed off
+            log_data.append({**season_log, **{k: "error" for k in missing if k not in season_log},
+                             "pages": len(pages), "bytes": season_bytes})
+
+limiter.save()
 
 # ---- Save log ----
 log_df = pd.DataFrame(log_data)
 log_df.to_csv(LOG_PATH, index=False)
-print("📄 Log saved to:", LOG_PATH)
\ No newline at end of file
+print("📄 Log saved to:", LOG_PATH)
+
+# ---- Bytes transferred per run (appended, one row per run) ----
+run_df = pd.DataFrame([{"started_at": run_started, "pages": run_pages, "bytes": run_bytes}])
+run_df.to_csv(RUNS_LOG_PATH, mode="a", header=not os.path.exists(RUNS_LOG_PATH), index=False)
+print(f"📦 {run_pages} page(s), {run_bytes / 1024:.0f} KB transferred (logged to {RUNS_LOG_PATH})")
+print(f"⏱️ Request spacing now {limiter.interval:.1f}s (saved to {limiter.state_path})")
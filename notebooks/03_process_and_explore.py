@@ -17,6 +17,8 @@ from pathlib import Path
 import glob
 import warnings
 
+from resampling import compare_groups, era_label
+
 warnings.filterwarnings('ignore')
 
 # Set style for better-looking plots
@@ -303,6 +305,18 @@ print("\nCHANGE:")
 goals_change = ((post_ferguson['goals_per_game'].mean() / ferguson_era['goals_per_game'].mean()) - 1) * 100
 print(f"  Goals per Game: {goals_change:+.1f}%")
 
+# Is the change larger than season-to-season noise? Bootstrap CI of the
+# difference and a permutation p-value (resampling.py). Run in-process: this
+# script has no __main__ guard for spawned pool workers.
+era_metrics = [m for m in ['goals_per_game', 'assists_per_game', 'goal_contribution_per_game']
+               if m in man_utd.columns]
+era_tests = compare_groups(man_utd.assign(era=man_utd['season_start_year'].apply(era_label)),
+                           era_metrics, 'era', 'Ferguson Era', n_resamples=10000, workers=1)
+print("\nSIGNIFICANCE (post-Ferguson minus Ferguson, 95% bootstrap CI, permutation p):")
+for _, row in era_tests[era_tests['group'] == 'Post-Ferguson'].iterrows():
+    print(f"  {row['metric']:28s} {row['diff_vs_baseline']:+.3f} "
+          f"[{row['diff_ci_low']:+.3f}, {row['diff_ci_high']:+.3f}]  p={row['p_value']:.4f}")
+
 # ============================================================================
 # 7. SAVE PROCESSED DATA
 # ============================================================================
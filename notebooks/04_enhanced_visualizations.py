@@ -15,6 +15,9 @@ import seaborn as sns
 from pathlib import Path
 import warnings
 
+from rolling_form import cached_rolling_form
+from plot_colors import MANAGER_COLORS
+
 warnings.filterwarnings('ignore')
 
 # Set style
@@ -58,17 +61,8 @@ manager_map = {
 
 man_utd['manager'] = man_utd['season_start_year'].map(manager_map)
 
-# Define manager colors for visualization
-manager_colors = {
-    'Ferguson': '#228B22',  # Forest Green
-    'Moyes': '#8B4513',     # Brown
-    'Van Gaal': '#FF8C00',  # Dark Orange
-    'Mourinho': '#4169E1',  # Royal Blue
-    'Solskjær': '#DC143C',  # Crimson
-    'Solskjær/Rangnick': '#DC143C',
-    'Ten Hag': '#9932CC',   # Purple
-    'Amorim': '#FFD700'     # Gold
-}
+# Manager colors (plot_colors.py); 04's combined 'Solskjær/Rangnick' label shares Solskjær's
+manager_colors = {**MANAGER_COLORS, 'Solskjær/Rangnick': MANAGER_COLORS['Solskjær']}
 
 # Manager tenure periods (for shaded regions)
 manager_periods = [
@@ -99,6 +93,14 @@ ax.plot(man_utd['season_start_year'], man_utd['goals_per_game'],
         marker='o', linewidth=3, markersize=10, color='#DA291C',
         label='Goals per Game', zorder=5)
 
+# In-season form from match-level data (notebooks/rolling_form.py), if ingested
+form = cached_rolling_form()
+if not form.empty:
+    man_utd_form = form[form['team'] == 'Manchester Utd']
+    ax.plot(man_utd_form['season_progress_x'], man_utd_form['goals_for_r10'],
+            linewidth=1.2, color='#DA291C', alpha=0.35,
+            label='Rolling 10-game Goals per Game', zorder=4)
+
 # Add Ferguson retirement line
 ax.axvline(x=2013, color='black', linestyle='--', linewidth=3, alpha=0.7,
            label='Ferguson Retirement', zorder=3)
@@ -22,6 +22,8 @@ import seaborn as sns
 from pathlib import Path
 import warnings
 
+from pairwise_comparison import FERGUSON_SPLIT, load_comparison
+
 warnings.filterwarnings('ignore')
 
 # Set style
@@ -181,16 +183,13 @@ print(f"Saved: {output_dir / '11_rivals_era_comparison.png'}")
 
 fig, ax = plt.subplots(figsize=(14, 8))
 
-changes = []
-for team in ['Man Utd', 'Man City', 'Liverpool', 'Arsenal', 'Chelsea']:
-    ferguson_avg_team = ferguson_era[ferguson_era['squad'] == team]['goals_per_game'].mean()
-    post_ferguson_avg_team = post_ferguson[post_ferguson['squad'] == team]['goals_per_game'].mean()
-
-    if not pd.isna(ferguson_avg_team) and not pd.isna(post_ferguson_avg_team):
-        pct_change = ((post_ferguson_avg_team / ferguson_avg_team) - 1) * 100
-        changes.append({'team': team, 'change': pct_change})
-
-changes_df = pd.DataFrame(changes).sort_values('change')
+# Slice of the all-clubs comparison (notebooks/pairwise_comparison.py)
+comparison = load_comparison(FERGUSON_SPLIT, cache_path='data/processed/pairwise_comparison_ferguson_split.npz')
+pct_change = comparison.era_change('goals_per_game', rivals).dropna()
+changes_df = pd.DataFrame({
+    'team': pct_change.index.map(lambda t: {'Manchester Utd': 'Man Utd', 'Manchester City': 'Man City'}.get(t, t)),
+    'change': pct_change.values,
+}).sort_values('change')
 
 colors = [team_colors.get(team, '#999999') for team in changes_df['team']]
 bars = ax.barh(range(len(changes_df)), changes_df['change'], color=colors, alpha=0.8)
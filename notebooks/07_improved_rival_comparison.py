@@ -36,6 +36,14 @@ print("\n[1/3] Loading data...")
 
 df_all = pd.read_csv('data/processed/all_teams_standard_stats.csv')
 
+# Schedule-adjusted Dixon-Coles ratings (notebooks/dixon_coles.py), when fitted
+ratings_path = Path('data/processed/all_teams_dixon_coles_ratings.csv')
+if ratings_path.exists():
+    ratings = pd.read_csv(ratings_path)
+    df_all = df_all.merge(ratings[['squad', 'season', 'dc_attack', 'dc_defence', 'dc_overall']],
+                          on=['squad', 'season'], how='left')
+    print(f"Merged Dixon-Coles ratings for {ratings['season'].nunique()} seasons")
+
 # Define teams to compare - expanded list
 teams_to_analyze = [
     'Manchester Utd', 'Manchester City', 'Liverpool', 'Arsenal', 'Chelsea',
@@ -266,6 +274,45 @@ for _, row in changes_df.iterrows():
     direction = "↑" if row['change'] > 0 else "↓" if row['change'] < 0 else "→"
     print(f"{row['team']:15s}: #{int(row['old_rank'])} → #{int(row['new_rank'])} {direction} ({row['change']:+.0f})")
 
+if 'dc_overall' in df_teams.columns:
+    print("\n" + "=" * 80)
+    print("STRENGTH-ADJUSTED RANKINGS (Dixon-Coles, 0 = league average)")
+    print("=" * 80)
+    for label, era_df in [('Ferguson Era (2000-2013)', ferguson_era), ('Post-Ferguson Era (2014-2025)', post_ferguson)]:
+        era_ratings = era_df.groupby('squad')[['dc_attack', 'dc_defence', 'dc_overall']].mean()
+        era_ratings = era_ratings.dropna().sort_values('dc_overall', ascending=False)
+        if era_ratings.empty:
+            continue
+        print(f"\n{label}:")
+        for i, (team, row) in enumerate(era_ratings.iterrows(), 1):
+            print(f"{i}. {team:15s}: overall {row['dc_overall']:+.3f} "
+                  f"(attack {row['dc_attack']:+.3f}, defence {row['dc_defence']:+.3f})")
+
+# Precomputed within-season percentiles (notebooks/season_percentiles.py), when built
+percentiles_path = Path('data/processed/all_teams_season_percentiles.csv')
+if percentiles_path.exists():
+    percentiles = pd.read_csv(percentiles_path, usecols=['squad', 'season', 'goals_per_game_pct'])
+    percentiles = percentiles[percentiles['squad'].isin(teams_to_analyze)]
+    recent_seasons = sorted(percentiles['season'].unique())[-5:]
+    table = (percentiles[percentiles['season'].isin(recent_seasons)]
+             .pivot(index='squad', columns='season', values='goals_per_game_pct'))
+    print("\n" + "=" * 80)
+    print("GOALS PER GAME: WITHIN-SEASON PERCENTILE (100 = league best)")
+    print("=" * 80)
+    print(table.round(0).to_string())
+
+# Metrics most associated with points (notebooks/metric_correlations.py), when ranked
+correlations_path = Path('data/processed/metric_correlations_ranked.csv')
+if correlations_path.exists():
+    correlations = pd.read_csv(correlations_path)
+    top = correlations[correlations['target'] == 'points_per_game'].head(10)
+    print("\n" + "=" * 80)
+    print("METRICS MOST ASSOCIATED WITH POINTS PER GAME (Spearman, all team-seasons)")
+    print("=" * 80)
+    for _, row in top.iterrows():
+        print(f"{int(row['rank']):2d}. {row['metric']:35s} {row['spearman']:+.3f} "
+              f"(next season {row['lag1']:+.3f}, n={int(row['n'])})")
+
 print("\n" + "=" * 80)
 print("KEY INSIGHTS")
 print("=" * 80)
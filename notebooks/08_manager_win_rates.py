@@ -20,6 +20,14 @@ import seaborn as sns
 from pathlib import Path
 import warnings
 
+from match_results import (MatchLog, ClubResultsAggregator, MATCH_LOG_DIR, MAN_UTD, manager_for_dates,
+                           team_match_rows)
+from league_table import LeagueTableEngine, position_after_games, STATE_PATH as LEAGUE_STATE_PATH
+from rolling_form import cached_rolling_form
+from elo import EloEngine, STATE_PATH as ELO_STATE_PATH
+from resampling import compare_groups
+from plot_colors import MANAGER_COLORS
+
 warnings.filterwarnings('ignore')
 
 sns.set_style("whitegrid")
@@ -69,6 +77,36 @@ season_results = [
 
 df_results = pd.DataFrame(season_results)
 df_results['matches'] = 38
+
+# Prefer match-level results (notebooks/match_results.py) over the literals above.
+# The aggregator keeps a cursor, so only newly ingested matchweeks are processed.
+match_log = MatchLog(MATCH_LOG_DIR)
+club_results = ClubResultsAggregator(state_path=MATCH_LOG_DIR / "man_utd_results_state.json")
+
+if match_log.exists():
+    club_results.update(match_log)
+    from_matches = club_results.season_summary().set_index('season')
+    count_cols = ['wins', 'draws', 'losses', 'points', 'matches']
+    df_results = df_results.set_index('season')
+    df_results = pd.concat([df_results, from_matches.loc[~from_matches.index.isin(df_results.index), count_cols]])
+    df_results.update(from_matches[count_cols])
+    df_results[count_cols] = df_results[count_cols].astype(int)
+    df_results = df_results.rename_axis('season').reset_index()
+    print(f"Using match-level results for {len(from_matches)} seasons (match log v{match_log.version})")
+
+    # League positions reconstructed from the same results (latest matchweek per season)
+    league_tables = LeagueTableEngine(LEAGUE_STATE_PATH)
+    league_tables.update(match_log)
+    standings = league_tables.standings()
+    man_utd_table = standings[standings['team'] == 'Manchester Utd']
+    latest_position = man_utd_table.drop_duplicates('season', keep='last').set_index('season')['position']
+    df_results = df_results.set_index('season')
+    df_results['position'] = latest_position.combine_first(df_results['position'])
+    df_results = df_results.reset_index()
+
+# Manager attribution by match date needs every season in the match log
+use_match_data = match_log.exists() and set(df_results['season']) <= set(club_results.season_summary()['season'])
+
 df_results['win_rate'] = (df_results['wins'] / df_results['matches'] * 100).round(2)
 df_results['points_per_game'] = (df_results['points'] / df_results['matches']).round(3)
 df_results['season_start_year'] = df_results['season'].str[:4].astype(int)
@@ -121,6 +159,22 @@ manager_info = {
         'years': 'Nov 2024 - Present',
         'tenure': '2 months',
         'seasons': ['2024-25']  # Partially
+    },
+    # Interim spells (only appear when match-level data is available)
+    'Giggs': {
+        'years': 'Apr 2014 - May 2014',
+        'tenure': '4 games (interim)',
+        'seasons': ['2013-14']
+    },
+    'Carrick': {
+        'years': 'Nov 2021 - Dec 2021',
+        'tenure': '3 games (interim)',
+        'seasons': ['2021-22']
+    },
+    'Van Nistelrooy': {
+        'years': 'Oct 2024 - Nov 2024',
+        'tenure': '4 games (interim)',
+        'seasons': ['2024-25']
     }
 }
 
@@ -175,6 +229,20 @@ manager_stats = df_results.groupby('primary_manager').agg({
     'season': 'count'
 }).rename(columns={'season': 'seasons'})
 
+# With match-level data, credit every match to the manager in charge that day
+# (split seasons such as 2018-19 and 2021-22 are divided between managers)
+if use_match_data:
+    by_manager = club_results.manager_summary()
+    primary_by_season = club_results.primary_managers()
+    season_positions = df_results.set_index('season')['position']
+    by_manager['position'] = [
+        season_positions.reindex([s for s, m in primary_by_season.items() if m == manager]).mean()
+        for manager in by_manager.index
+    ]
+    manager_stats = by_manager[['wins', 'draws', 'losses', 'points', 'matches',
+                                'win_rate', 'points_per_game', 'position', 'seasons']]
+    df_results['primary_manager'] = df_results['season'].map(primary_by_season)
+
 manager_stats['total_win_rate'] = (manager_stats['wins'] / manager_stats['matches'] * 100).round(2)
 manager_stats['avg_position'] = manager_stats['position'].round(1)
 
@@ -233,17 +301,8 @@ print(f"Saved: {output_dir / '20_manager_win_rates.png'}")
 # ---- PLOT 2: Points Per Season Timeline ----
 fig, ax = plt.subplots(figsize=(20, 10))
 
-# Color code by manager
-manager_colors = {
-    'Ferguson': '#228B22',
-    'Moyes': '#8B4513',
-    'Van Gaal': '#FF8C00',
-    'Mourinho': '#4169E1',
-    'Solskjær': '#DC143C',
-    'Rangnick': '#DC143C',
-    'Ten Hag': '#9932CC',
-    'Amorim': '#FFD700'
-}
+# Color code by manager (plot_colors.py)
+manager_colors = MANAGER_COLORS
 
 for manager in df_results['primary_manager'].unique():
     manager_data = df_results[df_results['primary_manager'] == manager]
@@ -252,6 +311,14 @@ for manager in df_results['primary_manager'].unique():
             color=manager_colors.get(manager, '#999999'),
             label=manager)
 
+# In-season form: rolling 10-game points per game scaled to a 38-game season
+form = cached_rolling_form()
+if not form.empty:
+    man_utd_form = form[form['team'] == 'Manchester Utd']
+    ax.plot(man_utd_form['season_progress_x'], man_utd_form['ppg_r10'] * 38,
+            linewidth=1.2, color='black', alpha=0.35,
+            label='Rolling 10-game points pace (x38)')
+
 # Add Ferguson retirement line
 ax.axvline(x=2013, color='black', linestyle='--', linewidth=2.5, alpha=0.6,
            label='Ferguson Retirement')
@@ -275,7 +342,8 @@ print(f"Saved: {output_dir / '21_manager_points_timeline.png'}")
 # ---- PLOT 3: League Position by Manager ----
 fig, ax = plt.subplots(figsize=(16, 9))
 
-managers_post = [m for m in manager_stats.index if m != 'Ferguson']
+managers_post = [m for m in manager_stats.index
+                 if m != 'Ferguson' and pd.notna(manager_stats.loc[m, 'avg_position'])]
 positions = [manager_stats.loc[m, 'avg_position'] for m in managers_post]
 colors_post = [manager_colors.get(m, '#999999') for m in managers_post]
 
@@ -350,7 +418,8 @@ ax3.invert_yaxis()
 ax3.invert_xaxis()
 ax3.grid(True, alpha=0.3, axis='x')
 for i, v in enumerate(manager_stats['avg_position']):
-    ax3.text(v - 0.3, i, f'#{v:.1f}', va='center', ha='right', fontsize=10, fontweight='bold')
+    if pd.notna(v):
+        ax3.text(v - 0.3, i, f'#{v:.1f}', va='center', ha='right', fontsize=10, fontweight='bold')
 
 # Total Points
 ax4 = fig.add_subplot(gs[1, 1])
@@ -385,12 +454,68 @@ for manager in manager_stats.index:
     print(f"  Seasons: {int(manager_stats.loc[manager, 'seasons'])}")
     print(f"  Win Rate: {manager_stats.loc[manager, 'total_win_rate']}%")
     print(f"  Points Per Game: {manager_stats.loc[manager, 'points_per_game']:.3f}")
-    print(f"  Average Position: #{manager_stats.loc[manager, 'avg_position']:.1f}")
+    if pd.notna(manager_stats.loc[manager, 'avg_position']):
+        print(f"  Average Position: #{manager_stats.loc[manager, 'avg_position']:.1f}")
     print(f"  Total Points: {int(manager_stats.loc[manager, 'points'])}")
     print(f"  Record: {int(manager_stats.loc[manager, 'wins'])}W-"
           f"{int(manager_stats.loc[manager, 'draws'])}D-"
           f"{int(manager_stats.loc[manager, 'losses'])}L")
 
+# Differences to Ferguson with uncertainty (resampling.py): per match when the
+# match log is available, per season otherwise. Run in-process: this script has
+# no __main__ guard for spawned pool workers.
+if use_match_data:
+    tested = team_match_rows(match_log.played())
+    tested = tested[tested['team'] == MAN_UTD].copy()
+    tested['manager'] = manager_for_dates(tested['date'].to_numpy())
+    tested_metric, unit = 'points', 'match'
+else:
+    tested = df_results.assign(manager=df_results['primary_manager'])
+    tested_metric, unit = 'points_per_game', 'season'
+manager_tests = compare_groups(tested, [tested_metric], 'manager', 'Ferguson', n_resamples=10000, workers=1)
+
+print("\n" + "=" * 80)
+print(f"POINTS PER GAME VS FERGUSON (per {unit}; 95% bootstrap CI, permutation p)")
+print("=" * 80)
+for _, row in manager_tests.iterrows():
+    line = f"{row['group']:15s} n={row['n']:4d}  {row['mean']:.3f} [{row['ci_low']:.3f}, {row['ci_high']:.3f}]"
+    if row['group'] != 'Ferguson' and pd.notna(row.get('p_value')):
+        line += (f"  diff {row['diff_vs_baseline']:+.3f} [{row['diff_ci_low']:+.3f}, "
+                 f"{row['diff_ci_high']:+.3f}]  p={row['p_value']:.4f}")
+    print(line)
+
+if use_match_data:
+    # Same point in every season, so partial and full seasons compare fairly
+    n_games = 10
+    early = position_after_games(standings, n_games)
+    early = early[early['team'] == MAN_UTD].set_index('season')
+    # Credit the manager in charge on the date of the Nth game, not the season's
+    # primary manager (in split seasons those differ)
+    utd_games = team_match_rows(match_log.played())
+    utd_games = utd_games[utd_games['team'] == MAN_UTD]
+    nth_game_date = utd_games.groupby('season').nth(n_games - 1).set_index('season')['date']
+    early['manager'] = manager_for_dates(nth_game_date.reindex(early.index).to_numpy())
+
+    print("\n" + "=" * 80)
+    print(f"POSITION AFTER {n_games} GAMES (by manager in charge at game {n_games})")
+    print("=" * 80)
+    for manager, group in early.groupby('manager', sort=False):
+        seasons = ", ".join(f"{season}: #{pos}" for season, pos in group['position'].items())
+        print(f"{manager:15s} avg #{group['position'].mean():.1f}  ({seasons})")
+
+if match_log.exists():
+    # Squad strength inherited vs handed on, from per-match Elo ratings
+    elo = EloEngine(ELO_STATE_PATH)
+    elo.update(match_log)
+    tenures = elo.tenure_report()
+
+    print("\n" + "=" * 80)
+    print("ELO RATING AT APPOINTMENT AND DEPARTURE")
+    print("=" * 80)
+    for _, row in tenures.iterrows():
+        print(f"{row['manager']:15s} inherited {row['rating_at_appointment']:.0f} → "
+              f"left {row['rating_at_departure']:.0f} ({row['rating_change']:+.0f}, {row['matches']} matches)")
+
 print("\n" + "=" * 80)
 print("KEY INSIGHTS")
 print("=" * 80)
@@ -8,6 +8,15 @@ import numpy as np
 import json
 from pathlib import Path
 
+from export_formats import write_columnar_json, write_arrow_ipc
+from export_versions import publish_version, patches_since
+from expected_points import cached_match_xpts, season_xpts, manager_xpts
+from match_results import MatchLog
+
+# Extra export formats written alongside the row-oriented JSON.
+# "columnar_json" dictionary-encodes squad/season; "arrow" needs pyarrow.
+EXPORT_FORMATS = ["columnar_json"]
+
 # ============================================================================
 # LOAD DATA
 # ============================================================================
@@ -39,6 +48,8 @@ latest_data = all_teams[all_teams['season'] == latest_season].copy()
 attacking_data = {
     'attacking_edge': [],
     'performance_vs_expected': [],
+    'expected_points': [],
+    'man_utd_manager_xpts': [],
     'man_utd_timeline': [],
     'rivals_comparison': []
 }
@@ -74,6 +85,31 @@ for _, row in latest_data.iterrows():
             perf = "overperforming" if over_under > 0 else "underperforming"
             print(f"  {row['squad']}: {row['per_90_minutes_xg']:.2f} xG/90, {row['per_90_minutes_gls']:.2f} actual ({perf} by {abs(over_under):.2f})")
 
+# 2b. EXPECTED POINTS: Points vs xPts from match-level xG (needs the match log)
+xpts_rows = cached_match_xpts(MatchLog(f"{output_dir}/match_log"), f"{output_dir}/expected_points.csv")
+if not xpts_rows.empty:
+    print("\nExpected Points (Points vs xPts):")
+    for _, row in season_xpts(xpts_rows).iterrows():
+        attacking_data['expected_points'].append({
+            'squad': row['team'],
+            'season': str(row['season']),
+            'matches': int(row['matches']),
+            'points': int(row['points']),
+            'xpts': float(row['xpts']),
+            'points_minus_xpts': float(row['points_minus_xpts']),
+            'is_man_utd': row['team'] == 'Manchester Utd'
+        })
+        if row['team'] == 'Manchester Utd' and row['season'] == latest_season:
+            print(f"  {row['team']}: {row['points']} pts from {row['xpts']:.1f} xPts ({row['points_minus_xpts']:+.1f})")
+    for _, row in manager_xpts(xpts_rows).iterrows():
+        attacking_data['man_utd_manager_xpts'].append({
+            'manager': row['manager'],
+            'matches': int(row['matches']),
+            'ppg': float(row['ppg']),
+            'xpts_per_game': float(row['xpts_per_game']),
+            'points_minus_xpts': float(row['points_minus_xpts'])
+        })
+
 # 3. MAN UTD TIMELINE: Goals and xG over time
 print("\nMan Utd Timeline (2000-2025):")
 man_utd_data = all_teams[all_teams['squad'] == 'Manchester Utd'].sort_values('season')
@@ -111,5 +147,23 @@ with open(output_file, 'w') as f:
 print(f"\n✅ Attacking analysis saved to: {output_file}")
 print(f"   - Attacking edge: {len(attacking_data['attacking_edge'])} teams")
 print(f"   - Performance vs Expected: {len(attacking_data['performance_vs_expected'])} teams")
+print(f"   - Expected points: {len(attacking_data['expected_points'])} team-seasons")
 print(f"   - Man Utd timeline: {len(attacking_data['man_utd_timeline'])} seasons")
 print(f"   - Rivals comparison: {len(attacking_data['rivals_comparison'])} data points")
+
+# Columnar exports for chart payloads
+if "columnar_json" in EXPORT_FORMATS:
+    columnar_file = write_columnar_json(attacking_data, f"{output_dir}/attacking_analysis.columnar.json")
+    print(f"✅ Columnar export saved to: {columnar_file}")
+if "arrow" in EXPORT_FORMATS:
+    arrow_files = write_arrow_ipc(attacking_data, output_dir, "attacking_analysis")
+    print(f"✅ Arrow IPC export saved: {len(arrow_files)} files")
+
+# Versioned delta export: a row-level patch against the previous run
+pointer, published = publish_version(attacking_data, f"{output_dir}/exports", "attacking_analysis")
+if not published:
+    print(f"⏭️ attacking_analysis unchanged (version {pointer['version']})")
+else:
+    print(f"✅ Published attacking_analysis version {pointer['version']}")
+    if pointer['patches']:
+        print(f"   Latest patch: {patches_since(pointer, pointer['version'] - 1)[0]}")
@@ -0,0 +1,302 @@
+"""
+Local Analytics HTTP API
+========================
+
+Serves the processed all-teams standard stats over HTTP so they can be queried
+without rerunning the notebooks or opening CSVs.
+
+Endpoints (all GET, JSON):
+- /teams                              list of squads and metrics
+- /teams/{squad}/timeline?metrics=..  one club's season-by-season values
+- /seasons/{season}?metrics=..&sort=  cross-section of every club in a season
+- /eras/summary?metric=..&teams=..    per-club averages for each era (as in 03)
+- /rivals?teams=..&metric=..          rival timelines + era change (as in 05/07)
+- /stats                              cache statistics
+
+The CSV is loaded once into an in-memory index (row positions per squad and
+per season). Rendered responses are kept in an LRU cache and carry an ETag
+derived from the data version and body, so clients sending If-None-Match get
+a 304 with no body.
+
+Usage:
+    python notebooks/analytics_api.py --port 8050
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = Path("data/processed/all_teams_standard_stats.csv")
+
+# Same era split as 03_process_and_explore.py
+ERAS = ['Ferguson Era (2000-2013)', 'Post-Ferguson (2013-2020)', 'Recent Years (2020+)']
+
+# Default rival set (07_improved_rival_comparison.py)
+DEFAULT_RIVALS = [
+    'Manchester Utd', 'Manchester City', 'Liverpool', 'Arsenal', 'Chelsea',
+    'Tottenham', 'Leicester City'
+]
+
+DEFAULT_METRICS = ['goals_per_game', 'per_90_minutes_gls', 'per_90_minutes_xg', 'poss']
+
+
+def era_label(season_start_year: int) -> str:
+    """Map a season start year to the era labels used in 03."""
+    if season_start_year <= 2013:
+        return ERAS[0]
+    if season_start_year <= 2020:
+        return ERAS[1]
+    return ERAS[2]
+
+
+class TeamSeasonIndex:
+    """
+    In-memory index over the all-teams standard stats.
+
+    Rows are stored once in a DataFrame; lookups go through precomputed
+    row-position arrays per squad (sorted by season) and per season.
+    """
+
+    def __init__(self, data_path=DATA_PATH):
+        self.data_path = Path(data_path)
+        raw = self.data_path.read_bytes()
+        self.version = hashlib.sha1(raw).hexdigest()[:12]
+
+        df = pd.read_csv(self.data_path)
+        if 'goals_per_game' not in df.columns:
+            df['goals_per_game'] = df['performance_gls'] / df['playing_time_mp']
+        df['era'] = df['season_start_year'].apply(era_label)
+        df = df.sort_values(['season_start_year', 'squad']).reset_index(drop=True)
+        self.frame = df
+
+        self.metrics = [
+            col for col in df.select_dtypes(include=[np.number]).columns
+            if col != 'season_start_year'
+        ]
+        self.squads = sorted(df['squad'].unique())
+        self.seasons = sorted(df['season'].unique())
+
+        self.team_rows = {
+            squad: rows.to_numpy()
+            for squad, rows in df.groupby('squad').groups.items()
+        }
+        self.season_rows = {
+            season: rows.to_numpy()
+            for season, rows in df.groupby('season').groups.items()
+        }
+
+    def _records(self, positions, columns: list) -> list:
+        subset = self.frame.iloc[positions][columns]
+        subset = subset.astype(object).where(subset.notna(), None)
+        return subset.to_dict(orient='records')
+
+    def _check_metrics(self, metrics: list) -> list:
+        unknown = [m for m in metrics if m not in self.metrics]
+        if unknown:
+            raise KeyError(f"Unknown metric(s): {', '.join(unknown)}")
+        return metrics
+
+    def _check_team(self, squad: str) -> np.ndarray:
+        if squad not in self.team_rows:
+            raise KeyError(f"Unknown squad: {squad}")
+        return self.team_rows[squad]
+
+    def team_timeline(self, squad: str, metrics: list) -> dict:
+        positions = self._check_team(squad)
+        metrics = self._check_metrics(metrics)
+        return {
+            'squad': squad,
+            'rows': self._records(positions, ['season', 'season_start_year', 'era'] + metrics),
+        }
+
+    def season_cross_section(self, season: str, metrics: list, sort: str = None) -> dict:
+        if season not in self.season_rows:
+            raise KeyError(f"Unknown season: {season}")
+        metrics = self._check_metrics(metrics)
+        rows = self._records(self.season_rows[season], ['squad'] + metrics)
+        if sort:
+            self._check_metrics([sort])
+            rows.sort(key=lambda r: (r[sort] is None, -(r[sort] or 0)))
+        return {'season': season, 'rows': rows}
+
+    def era_summary(self, metric: str, squads: list) -> dict:
+        self._check_metrics([metric])
+        positions = np.concatenate([self._check_team(s) for s in squads])
+        subset = self.frame.iloc[positions]
+        means = subset.groupby(['squad', 'era'])[metric].mean().unstack('era')
+        means = means.reindex(columns=ERAS)
+        return {
+            'metric': metric,
+            'eras': ERAS,
+            'rows': [
+                {'squad': squad, **{era: (None if pd.isna(v) else float(v)) for era, v in row.items()}}
+                for squad, row in means.iterrows()
+            ],
+        }
+
+    def rival_comparison(self, squads: list, metric: str) -> dict:
+        self._check_metrics([metric])
+        teams = []
+        for squad in squads:
+            positions = self._check_team(squad)
+            subset = self.frame.iloc[positions]
+            ferguson = subset.loc[subset['season_start_year'] <= 2013, metric].mean()
+            post = subset.loc[subset['season_start_year'] > 2013, metric].mean()
+            comparable = pd.notna(ferguson) and pd.notna(post) and ferguson != 0
+            pct_change = ((post / ferguson) - 1) * 100 if comparable else None
+            teams.append({
+                'squad': squad,
+                'ferguson_era_avg': None if pd.isna(ferguson) else float(ferguson),
+                'post_ferguson_avg': None if pd.isna(post) else float(post),
+                'pct_change': None if pct_change is None else float(pct_change),
+                'timeline': self._records(positions, ['season', metric]),
+            })
+        return {'metric': metric, 'teams': teams}
+
+
+def _split(values: list, default: list, name: str) -> list:
+    """Comma-separated query values; `default` when the parameter is absent."""
+    if not values:
+        return list(default)
+    items = [v for value in values for v in value.split(',') if v]
+    if not items:
+        raise ValueError(f"Empty '{name}' list")
+    return items
+
+
+class AnalyticsApp:
+    """Routes requests to the index and caches rendered (body, etag) pairs."""
+
+    def __init__(self, index: TeamSeasonIndex, cache_size: int = 512):
+        self.index = index
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def _render(self, path: str, query: tuple) -> tuple:
+        params = {key: list(values) for key, values in query}
+        parts = [unquote(p) for p in path.strip('/').split('/') if p]
+        index = self.index
+
+        if parts == ['teams']:
+            payload = {'squads': index.squads, 'seasons': index.seasons, 'metrics': index.metrics}
+        elif len(parts) == 3 and parts[0] == 'teams' and parts[2] == 'timeline':
+            payload = index.team_timeline(parts[1], _split(params.get('metrics'), DEFAULT_METRICS, 'metrics'))
+        elif len(parts) == 2 and parts[0] == 'seasons':
+            sort = params.get('sort', [None])[0]
+            metrics = _split(params.get('metrics'), DEFAULT_METRICS, 'metrics')
+            payload = index.season_cross_section(parts[1], metrics, sort)
+        elif parts == ['eras', 'summary']:
+            metric = params.get('metric', ['goals_per_game'])[0]
+            payload = index.era_summary(metric, _split(params.get('teams'), index.squads, 'teams'))
+        elif parts == ['rivals']:
+            metric = params.get('metric', ['goals_per_game'])[0]
+            payload = index.rival_comparison(_split(params.get('teams'), DEFAULT_RIVALS, 'teams'), metric)
+        else:
+            raise LookupError(f"No route for /{'/'.join(parts)}")
+
+        payload['data_version'] = index.version
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        etag = f'"{index.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+        return body, etag
+
+    def cache_stats(self) -> dict:
+        info = self.render.cache_info()
+        return {'hits': info.hits, 'misses': info.misses,
+                'size': info.currsize, 'max_size': info.maxsize,
+                'data_version': self.index.version}
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def make_handler(app: AnalyticsApp):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are separate writes; with Nagle on, delayed ACKs stall
+        # every keep-alive response after the first by ~40 ms
+        disable_nagle_algorithm = True
+
+        def _send(self, status: int, body: bytes = b'', etag: str = None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.rstrip('/') == '/stats':
+                self._send(200, json.dumps(app.cache_stats()).encode())
+                return
+
+            query = tuple(sorted((k, tuple(v)) for k, v in parse_qs(url.query).items()))
+            try:
+                body, etag = app.render(url.path, query)
+            except LookupError as e:
+                # KeyError (unknown squad/season/metric) is a LookupError too
+                self._send(404, json.dumps({'error': e.args[0] if e.args else str(e)}).encode())
+                return
+            except ValueError as e:
+                # Malformed parameters (e.g. an empty teams / metrics list)
+                self._send(400, json.dumps({'error': str(e)}).encode())
+                return
+            except Exception as e:
+                # Answer rather than drop the keep-alive connection
+                self._send(500, json.dumps({'error': f"{type(e).__name__}: {e}"}).encode())
+                return
+
+            if _etag_matches(self.headers.get('If-None-Match'), etag):
+                self._send(304, etag=etag)
+            else:
+                self._send(200, body, etag)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8050,
+                  data_path=DATA_PATH, cache_size: int = 512) -> ThreadingHTTPServer:
+    """Build the index and return a (not yet started) threaded HTTP server."""
+    app = AnalyticsApp(TeamSeasonIndex(data_path), cache_size=cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(app))
+    server.daemon_threads = True
+    server.app = app
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve processed FBRef data over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--data', default=str(DATA_PATH))
+    parser.add_argument('--cache-size', type=int, default=512)
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.data, args.cache_size)
+    index = server.app.index
+    print(f"🟢 Serving {len(index.frame)} rows ({len(index.squads)} squads, "
+          f"{len(index.seasons)} seasons) on http://{args.host}:{args.port}")
+    print(f"   Data version: {index.version}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
@@ -0,0 +1,124 @@
+"""
+Load Test for the Local Analytics API
+=====================================
+
+Fires a mix of timeline / season / era / rival requests at analytics_api.py
+from concurrent clients and reports p50/p99 latency, throughput and the share
+of 304 (ETag) responses.
+
+Each client remembers the ETag it got for a URL and sends it back as
+If-None-Match on the next request for that URL, like a browser would.
+
+Usage:
+    python notebooks/api_load_test.py                      # starts its own server
+    python notebooks/api_load_test.py --url http://127.0.0.1:8050 --clients 32
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+from analytics_api import DEFAULT_RIVALS, create_server
+
+
+def build_request_mix(squads: list, seasons: list) -> list:
+    """Representative set of API paths to sample from."""
+    paths = []
+    for squad in squads:
+        paths.append(f"/teams/{quote(squad)}/timeline")
+        paths.append(f"/teams/{quote(squad)}/timeline?metrics=goals_per_game,per_90_minutes_xg")
+    for season in seasons:
+        paths.append(f"/seasons/{season}?sort=goals_per_game")
+    for metric in ['goals_per_game', 'per_90_minutes_gls', 'per_90_minutes_xg']:
+        paths.append(f"/eras/summary?metric={metric}")
+        paths.append(f"/rivals?metric={metric}")
+    paths.append("/rivals?teams=" + ",".join(quote(s) for s in DEFAULT_RIVALS[:5]))
+    return paths
+
+
+def fetch_catalog(host: str, port: int) -> tuple:
+    """(squads, seasons) from a running server's /teams."""
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request('GET', '/teams')
+    catalog = json.loads(conn.getresponse().read())
+    conn.close()
+    return catalog['squads'], catalog['seasons']
+
+
+def run_client(host: str, port: int, paths: list, n_requests: int, seed: int) -> list:
+    """Issue `n_requests` on one keep-alive connection; return (latency_s, status) pairs."""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags = {}
+    results = []
+    for _ in range(n_requests):
+        path = rng.choice(paths)
+        headers = {'If-None-Match': etags[path]} if path in etags else {}
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        results.append((time.perf_counter() - start, response.status))
+        etag = response.getheader('ETag')
+        if etag:
+            etags[path] = etag
+    conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the analytics API")
+    parser.add_argument('--url', help="Base URL of a running server (default: start one)")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help="Requests per client")
+    args = parser.parse_args()
+
+    if args.url:
+        # Remote mode: no local index or server, the request mix comes from the target
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+        paths = build_request_mix(*fetch_catalog(host, port))
+    else:
+        server = create_server(port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address
+        paths = build_request_mix(server.app.index.squads, server.app.index.seasons)
+
+    print("=" * 80)
+    print("ANALYTICS API LOAD TEST")
+    print("=" * 80)
+    print(f"Target: http://{host}:{port}  |  {args.clients} clients x {args.requests} requests"
+          f"  |  {len(paths)} distinct URLs")
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        futures = [
+            pool.submit(run_client, host, port, paths, args.requests, seed)
+            for seed in range(args.clients)
+        ]
+        results = [r for f in futures for r in f.result()]
+    wall = time.perf_counter() - wall_start
+
+    latencies = np.array([r[0] for r in results]) * 1000
+    statuses = np.array([r[1] for r in results])
+
+    print(f"\nRequests:    {len(results):,} in {wall:.2f}s ({len(results) / wall:,.0f} req/s)")
+    print(f"p50 latency: {np.percentile(latencies, 50):.2f} ms")
+    print(f"p99 latency: {np.percentile(latencies, 99):.2f} ms")
+    print(f"max latency: {latencies.max():.2f} ms")
+    for status in sorted(set(statuses.tolist())):
+        print(f"HTTP {status}:    {(statuses == status).mean() * 100:.1f}%")
+
+    if not args.url:
+        print(f"Cache:       {server.app.cache_stats()}")
+        server.shutdown()
@@ -0,0 +1,242 @@
+"""
+Changepoint Detection Over Team Metric Time Series
+==================================================
+
+03, 04, 05 and 07 assume the decline starts at a hard-coded 2013 cutoff
+(`<= 2013` / `axvline`). This module lets the data say where the regime
+breaks are, for every club and every metric in the metric matrix
+(notebooks/metric_matrix.py).
+
+Method: penalised optimal partitioning with a Gaussian mean-shift cost
+(the exact objective PELT minimises). Each series is standardised by a robust
+noise estimate (MAD of first differences), so one penalty works across metrics.
+Segment costs come from cumulative sums, and the dynamic programme runs over
+all (club, metric) series at once: one NumPy step per season, no per-series
+loop. Series are only ~26 seasons long, so PELT's pruning would save nothing
+over the stacked pass.
+
+Detected breaks are compared with Man Utd manager appointments
+(MANAGER_TENURES) and with the 2013 cutoff used in the notebooks.
+
+Usage:
+    python notebooks/changepoints.py --penalty 2.0
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MAN_UTD, MANAGER_TENURES
+from metric_matrix import MetricMatrix, load_matrix
+
+OUTPUT_PATH = Path("data/processed/changepoints.csv")
+
+# First season after the `season_start_year <= 2013` cutoff used in 03/04/05/07
+CUTOFF_FIRST_SEASON = 2014
+
+
+def _stack_series(values: np.ndarray):
+    """
+    Left-align the observed values of each row (dropping NaN gaps such as
+    relegated seasons).
+
+    Returns:
+        tuple: (padded values, original season index per position, lengths)
+    """
+    observed = ~np.isnan(values)
+    lengths = observed.sum(axis=1)
+    # Stable argsort puts observed positions first, in season order
+    order = np.argsort(~observed, axis=1, kind='stable')
+    padded = np.take_along_axis(values, order, axis=1)
+    padded[np.arange(values.shape[1])[None, :] >= lengths[:, None]] = 0.0
+    return padded, order, lengths
+
+
+def _robust_scale(x: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Noise sd per series from the MAD of first differences (insensitive to mean shifts)."""
+    diffs = np.abs(np.diff(x, axis=1))
+    valid = np.arange(diffs.shape[1])[None, :] < (lengths - 1)[:, None]
+    diffs = np.where(valid, diffs, np.nan)
+    with warnings.catch_warnings():
+        # All-NaN rows (series with fewer than two seasons) are expected
+        warnings.simplefilter('ignore', RuntimeWarning)
+        sigma = np.nanmedian(diffs, axis=1) / (0.6745 * np.sqrt(2))
+        fallback = np.nanstd(np.where(valid, x[:, 1:], np.nan), axis=1)
+    sigma = np.where(sigma > 0, sigma, fallback)
+    return np.where(np.isfinite(sigma) & (sigma > 0), sigma, np.nan)
+
+
+def segment_all(values: np.ndarray, penalty: float = 2.0, min_size: int = 2):
+    """
+    Optimal mean-shift segmentation of many series at once.
+
+    Args:
+        values (np.ndarray): (n_series, n_seasons), NaN where a season is missing.
+        penalty (float): Penalty per changepoint, multiplied by log(n) (BIC-style).
+        min_size (int): Minimum seasons per segment.
+
+    Returns:
+        tuple: (bounds, order, lengths, x) where bounds[i] is the list of segment
+            start positions (excluding 0) for series i in its compressed
+            coordinates, order maps positions back to season indices, and x holds
+            the standardised, left-aligned values.
+    """
+    padded, order, lengths = _stack_series(np.asarray(values, dtype=np.float64))
+    n_series, n_max = padded.shape
+
+    sigma = _robust_scale(padded, lengths)
+    scalable = ~np.isnan(sigma)
+    x = np.where(scalable[:, None], padded / np.where(scalable, sigma, 1.0)[:, None], 0.0)
+
+    cs1 = np.concatenate([np.zeros((n_series, 1)), np.cumsum(x, axis=1)], axis=1)
+    cs2 = np.concatenate([np.zeros((n_series, 1)), np.cumsum(x ** 2, axis=1)], axis=1)
+    beta = penalty * np.log(np.maximum(lengths, 2))
+
+    F = np.full((n_series, n_max + 1), np.inf)
+    F[:, 0] = -beta
+    last = np.zeros((n_series, n_max + 1), dtype=np.int64)
+    for e in range(min_size, n_max + 1):
+        s = np.arange(0, e - min_size + 1)
+        seg_sum = cs1[:, [e]] - cs1[:, s]
+        cost = (cs2[:, [e]] - cs2[:, s]) - seg_sum ** 2 / (e - s)
+        total = F[:, s] + cost + beta[:, None]
+        last[:, e] = total.argmin(axis=1)
+        F[:, e] = total.min(axis=1)
+
+    bounds = []
+    for i in range(n_series):
+        cuts = []
+        e = lengths[i]
+        if scalable[i] and e >= 2 * min_size:
+            while e > 0:
+                e = last[i, e]
+                if e > 0:
+                    cuts.append(int(e))
+        bounds.append(sorted(cuts))
+    return bounds, order, lengths, x
+
+
+def _sse(a: np.ndarray) -> float:
+    return float(((a - a.mean()) ** 2).sum())
+
+
+def appointment_seasons() -> pd.DataFrame:
+    """Season start year each manager first took charge in (July-June seasons)."""
+    starts = pd.to_datetime([t['start'] for t in MANAGER_TENURES])
+    return pd.DataFrame({
+        'manager': [t['manager'] for t in MANAGER_TENURES],
+        'season_start_year': np.where(starts.month >= 7, starts.year, starts.year - 1),
+    })
+
+
+def detect_changepoints(matrix: MetricMatrix, metrics: list = None, penalty: float = 2.0,
+                        min_size: int = 2) -> pd.DataFrame:
+    """
+    Detect regime breaks for every (club, metric) series in the matrix.
+
+    Returns:
+        pd.DataFrame: One row per break with the first season of the new regime,
+            segment means before/after (count metrics per match), and the cost
+            reduction of the split (in units of the series' noise variance).
+    """
+    metrics = metrics or matrix.analysis_metrics()
+    n_seasons = matrix.values.shape[1]
+
+    # (teams, seasons, metrics) -> (teams * metrics, seasons)
+    values = matrix.per_game(metrics).transpose(0, 2, 1).reshape(-1, n_seasons)
+    bounds, order, lengths, x = segment_all(values, penalty, min_size)
+
+    season_years = np.array([int(s[:4]) for s in matrix.seasons])
+    raw = np.take_along_axis(np.nan_to_num(values), order, axis=1)
+
+    rows = []
+    for i, cuts in enumerate(bounds):
+        if not cuts:
+            continue
+        team = matrix.teams[i // len(metrics)]
+        metric = metrics[i % len(metrics)]
+        edges = [0] + cuts + [int(lengths[i])]
+        for k, b in enumerate(cuts):
+            lo, hi = edges[k], edges[k + 2]
+            rows.append({
+                'squad': team,
+                'metric': metric,
+                'season': matrix.seasons[order[i, b]],
+                'season_start_year': int(season_years[order[i, b]]),
+                'break_number': k + 1,
+                'n_breaks': len(cuts),
+                'mean_before': raw[i, lo:b].mean(),
+                'mean_after': raw[i, b:hi].mean(),
+                'cost_reduction': _sse(x[i, lo:hi]) - _sse(x[i, lo:b]) - _sse(x[i, b:hi]),
+            })
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df['change'] = df['mean_after'] - df['mean_before']
+    df['offset_from_cutoff'] = df['season_start_year'] - CUTOFF_FIRST_SEASON
+    return df
+
+
+def match_manager_tenures(breaks: pd.DataFrame, team: str = MAN_UTD) -> pd.DataFrame:
+    """Attach the nearest manager appointment (and offset in seasons) to a club's breaks."""
+    club = breaks[breaks['squad'] == team].copy()
+    appointments = appointment_seasons()
+    appointments = appointments[appointments['season_start_year'] >= 2000]
+    years = appointments['season_start_year'].to_numpy()
+    nearest = np.abs(club['season_start_year'].to_numpy()[:, None] - years[None, :]).argmin(axis=1)
+    club['nearest_appointment'] = appointments['manager'].to_numpy()[nearest]
+    club['seasons_from_appointment'] = club['season_start_year'].to_numpy() - years[nearest]
+    return club
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Changepoint detection over all clubs and metrics")
+    parser.add_argument('--penalty', type=float, default=2.0, help="penalty per break, x log(n)")
+    parser.add_argument('--min-size', type=int, default=2, help="minimum seasons per regime")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("CHANGEPOINT DETECTION")
+    print("=" * 80)
+
+    matrix = load_matrix()
+    start = time.perf_counter()
+    breaks = detect_changepoints(matrix, penalty=args.penalty, min_size=args.min_size)
+    elapsed = (time.perf_counter() - start) * 1000
+    n_metrics = len(matrix.analysis_metrics())
+    print(f"Scanned {len(matrix.teams) * n_metrics:,} series ({len(matrix.teams)} clubs x {n_metrics} metrics) "
+          f"in {elapsed:.1f} ms: {len(breaks):,} breaks")
+
+    breaks.to_csv(OUTPUT_PATH, index=False)
+    print(f"Saved: {OUTPUT_PATH}")
+
+    if breaks.empty:
+        raise SystemExit(0)
+
+    print("\n" + "=" * 80)
+    print("MAN UTD BREAKS VS MANAGER APPOINTMENTS")
+    print("=" * 80)
+    man_utd = match_manager_tenures(breaks).sort_values(['season_start_year', 'cost_reduction'],
+                                                        ascending=[True, False])
+    cols = ['metric', 'season', 'mean_before', 'mean_after', 'cost_reduction',
+            'nearest_appointment', 'seasons_from_appointment']
+    print(man_utd[cols].round(3).to_string(index=False))
+
+    near_cutoff = (man_utd['offset_from_cutoff'].abs() <= 1).mean()
+    near_manager = (man_utd['seasons_from_appointment'].abs() <= 1).mean()
+    print(f"\nMan Utd breaks within 1 season of the 2013 cutoff: {near_cutoff:.0%}")
+    print(f"Man Utd breaks within 1 season of a manager appointment: {near_manager:.0%}")
+
+    print("\n" + "=" * 80)
+    print("BREAKS PER SEASON (all clubs, all metrics)")
+    print("=" * 80)
+    per_season = breaks.groupby('season').agg(breaks=('metric', 'size'), clubs=('squad', 'nunique'))
+    print(per_season.to_string())
@@ -0,0 +1,177 @@
+"""
+Interactive Dashboard (Streamlit)
+=================================
+
+Team, metric and era exploration over the processed all-teams data, building
+on the rival comparisons (05/07) and manager comparisons (04/08).
+
+The dataset is loaded once per server process into a cached resource that
+precomputes every slice the widgets need:
+- per (squad, metric) season series
+- per metric: squad x era averages and per-manager averages for Man Utd
+- per season: squad x metric cross-sections
+
+Widget changes only look up those slices, so no DataFrame is re-filtered on
+interaction. Each render is timed against TARGET_LATENCY_MS.
+
+Usage:
+    streamlit run notebooks/dashboard.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from analytics_api import DATA_PATH, DEFAULT_RIVALS, ERAS, TeamSeasonIndex
+from match_results import season_managers
+from plot_colors import MANAGER_COLORS, TEAM_COLORS
+
+TARGET_LATENCY_MS = 100
+
+
+@st.cache_resource
+def load_slices(data_path: str = str(DATA_PATH)) -> dict:
+    """Load the data once and precompute every slice the widgets read."""
+    index = TeamSeasonIndex(data_path)
+    df = index.frame
+
+    series = {}
+    for squad, positions in index.team_rows.items():
+        team = df.iloc[positions]
+        years = team['season_start_year'].to_numpy()
+        for metric in index.metrics:
+            series[(squad, metric)] = (years, team[metric].to_numpy())
+
+    era_tables = {
+        metric: df.groupby(['squad', 'era'])[metric].mean().unstack('era').reindex(columns=ERAS)
+        for metric in index.metrics
+    }
+
+    season_tables = {
+        season: df.iloc[positions].set_index('squad')[index.metrics]
+        for season, positions in index.season_rows.items()
+    }
+
+    man_utd = df.iloc[index.team_rows['Manchester Utd']].copy()
+    man_utd['manager'] = season_managers(man_utd['season_start_year'])
+    manager_order = list(dict.fromkeys(man_utd['manager'].dropna()))
+    manager_tables = {
+        metric: man_utd.groupby('manager')[metric].agg(['mean', 'count']).reindex(manager_order)
+        for metric in index.metrics
+    }
+
+    return {
+        'index': index,
+        'series': series,
+        'era_tables': era_tables,
+        'season_tables': season_tables,
+        'manager_tables': manager_tables,
+        'season_managers': dict(zip(man_utd['season_start_year'], man_utd['manager'])),
+    }
+
+
+def timeline_figure(slices: dict, squads: list, metric: str, shade_managers: bool) -> go.Figure:
+    fig = go.Figure()
+    for squad in squads:
+        years, values = slices['series'][(squad, metric)]
+        fig.add_trace(go.Scatter(
+            x=years, y=values, mode='lines+markers', name=squad,
+            line=dict(color=TEAM_COLORS.get(squad), width=4 if squad == 'Manchester Utd' else 2),
+        ))
+
+    fig.add_vline(x=2013, line_dash='dash', line_color='black', opacity=0.6,
+                  annotation_text='Ferguson Retirement')
+
+    if shade_managers:
+        spans = {}
+        for year, manager in sorted(slices['season_managers'].items()):
+            start, _ = spans.get(manager, (year, year))
+            spans[manager] = (start, year)
+        for manager, (start, end) in spans.items():
+            if manager == 'Ferguson':
+                continue
+            fig.add_vrect(x0=start - 0.5, x1=end + 0.5, opacity=0.12, line_width=0,
+                          fillcolor=MANAGER_COLORS.get(manager, '#CCCCCC'),
+                          annotation_text=manager, annotation_position='top left')
+
+    fig.update_layout(xaxis_title='Season', yaxis_title=metric, height=550,
+                      legend=dict(orientation='h'))
+    return fig
+
+
+def era_figure(slices: dict, squads: list, metric: str) -> go.Figure:
+    table = slices['era_tables'][metric].reindex(squads)
+    fig = go.Figure()
+    for era in ERAS:
+        fig.add_trace(go.Bar(x=table.index, y=table[era], name=era))
+    fig.update_layout(barmode='group', yaxis_title=metric, height=500)
+    return fig
+
+
+def season_figure(slices: dict, season: str, metric: str) -> go.Figure:
+    column = slices['season_tables'][season][metric].sort_values(ascending=True)
+    fig = go.Figure(go.Bar(
+        x=column.values, y=column.index, orientation='h',
+        marker_color=[TEAM_COLORS.get(s, '#999999') for s in column.index],
+    ))
+    fig.update_layout(xaxis_title=metric, height=650)
+    return fig
+
+
+def manager_figure(slices: dict, metric: str) -> go.Figure:
+    table = slices['manager_tables'][metric]
+    fig = go.Figure(go.Bar(
+        x=table.index, y=table['mean'],
+        marker_color=[MANAGER_COLORS.get(m, '#999999') for m in table.index],
+        text=[f"{int(n)} seasons" for n in table['count']],
+    ))
+    ferguson = table.loc['Ferguson', 'mean'] if 'Ferguson' in table.index else None
+    if ferguson is not None and pd.notna(ferguson):
+        fig.add_hline(y=ferguson, line_dash='dash', line_color='#228B22',
+                      annotation_text=f'Ferguson Average ({ferguson:.2f})')
+    fig.update_layout(yaxis_title=metric, height=500)
+    return fig
+
+
+st.set_page_config(page_title="Man Utd Sucks: Data Explorer", layout='wide')
+st.title("Manchester United vs the Premier League (2000-2025)")
+
+slices = load_slices()
+index = slices['index']
+
+with st.sidebar:
+    metric = st.selectbox('Metric', index.metrics, index=index.metrics.index('goals_per_game'))
+    squads = st.multiselect('Teams', index.squads,
+                            default=[s for s in DEFAULT_RIVALS if s in index.squads])
+    season = st.selectbox('Season', index.seasons, index=len(index.seasons) - 1)
+    shade_managers = st.checkbox('Shade Man Utd manager tenures', value=True)
+    st.caption(f"Data version {index.version}")
+
+render_start = time.perf_counter()
+
+tab_timeline, tab_eras, tab_season, tab_managers = st.tabs(
+    ['Timeline', 'Eras', 'Season', 'Man Utd Managers'])
+
+with tab_timeline:
+    st.plotly_chart(timeline_figure(slices, squads, metric, shade_managers), use_container_width=True)
+
+with tab_eras:
+    st.plotly_chart(era_figure(slices, squads, metric), use_container_width=True)
+    st.dataframe(slices['era_tables'][metric].reindex(squads).round(3))
+
+with tab_season:
+    st.plotly_chart(season_figure(slices, season, metric), use_container_width=True)
+
+with tab_managers:
+    st.plotly_chart(manager_figure(slices, metric), use_container_width=True)
+
+elapsed_ms = (time.perf_counter() - render_start) * 1000
+if elapsed_ms > TARGET_LATENCY_MS:
+    st.warning(f"Render took {elapsed_ms:.0f} ms (target {TARGET_LATENCY_MS} ms)")
+else:
+    st.caption(f"Rendered in {elapsed_ms:.0f} ms")
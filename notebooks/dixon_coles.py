@@ -0,0 +1,262 @@
+"""
+Dixon-Coles Team Strength Ratings
+=================================
+
+Raw goals per game ignore who a club played. This module fits a Dixon-Coles
+model (independent Poisson scores with the low-score correction tau) to every
+season in the match log and writes schedule-adjusted attack and defence
+ratings per club and season next to the standard stats.
+
+Model, per match (home i, away j):
+    log(lambda_home) = mu + home + attack_i - defence_j
+    log(lambda_away) = mu + attack_j - defence_i
+    P(x, y) = tau(x, y) * Poisson(x; lambda_home) * Poisson(y; lambda_away)
+
+Ratings are log-scale and centred on zero each season (attack > 0 scores more
+than average, defence > 0 concedes less than average).
+
+The log-likelihood and its analytic gradient are vectorised over all matches
+(per-team gradients via np.bincount) and minimised with a small L-BFGS, so
+there is no SciPy dependency. Seasons are fitted in parallel.
+
+Usage:
+    python notebooks/dixon_coles.py --workers 8
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, MAN_UTD
+
+RATINGS_PATH = Path("data/processed/all_teams_dixon_coles_ratings.csv")
+
+# Weight of the sum-to-zero penalty on attack and defence ratings
+CENTERING_PENALTY = 10.0
+# Gaussian prior (L2) on ratings: keeps early-season fits finite when a club has
+# not conceded or scored yet; negligible against a full season of matches
+RATING_RIDGE = 0.5
+
+
+# ============================================================================
+# LIKELIHOOD
+# ============================================================================
+
+def _unpack(theta: np.ndarray, n_teams: int):
+    return theta[:n_teams], theta[n_teams:2 * n_teams], theta[-3], theta[-2], theta[-1]
+
+
+def negative_log_likelihood(theta: np.ndarray, home: np.ndarray, away: np.ndarray,
+                            x: np.ndarray, y: np.ndarray, n_teams: int):
+    """
+    Penalised Dixon-Coles negative log-likelihood and its gradient.
+
+    Args:
+        theta (np.ndarray): [attack (n), defence (n), mu, home, rho].
+        home, away (np.ndarray): Team codes per match.
+        x, y (np.ndarray): Home and away goals per match.
+        n_teams (int): Number of clubs.
+
+    Returns:
+        tuple: (value, gradient); value is inf where tau <= 0 (infeasible rho).
+    """
+    attack, defence, mu, home_adv, rho = _unpack(theta, n_teams)
+    log_lam = mu + home_adv + attack[home] - defence[away]
+    log_nu = mu + attack[away] - defence[home]
+    lam, nu = np.exp(log_lam), np.exp(log_nu)
+
+    s00 = (x == 0) & (y == 0)
+    s01 = (x == 0) & (y == 1)
+    s10 = (x == 1) & (y == 0)
+    s11 = (x == 1) & (y == 1)
+    tau = np.ones_like(lam)
+    tau[s00] = 1 - lam[s00] * nu[s00] * rho
+    tau[s01] = 1 + lam[s01] * rho
+    tau[s10] = 1 + nu[s10] * rho
+    tau[s11] = 1 - rho
+    if np.any(tau <= 0):
+        return np.inf, np.zeros_like(theta)
+
+    log_lik = np.log(tau) + x * log_lam - lam + y * log_nu - nu
+
+    # d log L / d log_lam, d log_nu, d rho per match
+    g_lam = x - lam
+    g_nu = y - nu
+    g_rho = np.zeros_like(lam)
+    g_lam[s00] -= lam[s00] * nu[s00] * rho / tau[s00]
+    g_nu[s00] -= lam[s00] * nu[s00] * rho / tau[s00]
+    g_rho[s00] = -lam[s00] * nu[s00] / tau[s00]
+    g_lam[s01] += lam[s01] * rho / tau[s01]
+    g_rho[s01] = lam[s01] / tau[s01]
+    g_nu[s10] += nu[s10] * rho / tau[s10]
+    g_rho[s10] = nu[s10] / tau[s10]
+    g_rho[s11] = -1 / tau[s11]
+
+    grad_attack = (np.bincount(home, g_lam, n_teams) + np.bincount(away, g_nu, n_teams))
+    grad_defence = -(np.bincount(away, g_lam, n_teams) + np.bincount(home, g_nu, n_teams))
+    grad = np.concatenate([grad_attack, grad_defence, [g_lam.sum() + g_nu.sum(), g_lam.sum(), g_rho.sum()]])
+
+    # Ratings are only identified up to a shift; pin both sums to zero
+    penalty = (CENTERING_PENALTY * (attack.sum() ** 2 + defence.sum() ** 2)
+               + RATING_RIDGE * (attack @ attack + defence @ defence))
+    grad = -grad
+    grad[:n_teams] += 2 * CENTERING_PENALTY * attack.sum() + 2 * RATING_RIDGE * attack
+    grad[n_teams:2 * n_teams] += 2 * CENTERING_PENALTY * defence.sum() + 2 * RATING_RIDGE * defence
+    return -log_lik.sum() + penalty, grad
+
+
+def lbfgs(fun, x0: np.ndarray, args: tuple = (), memory: int = 10, max_iter: int = 500,
+          gtol: float = 1e-5) -> dict:
+    """
+    Minimise `fun(x, *args) -> (value, grad)` with L-BFGS and Armijo backtracking.
+
+    Returns:
+        dict: x, value, iterations, converged.
+    """
+    x = x0.astype(np.float64).copy()
+    value, grad = fun(x, *args)
+    s_hist, y_hist = [], []
+    converged = False
+
+    for iteration in range(1, max_iter + 1):
+        if np.max(np.abs(grad)) < gtol:
+            converged = True
+            break
+
+        # Two-loop recursion for the search direction
+        q = grad.copy()
+        alphas = []
+        for s, y in zip(reversed(s_hist), reversed(y_hist)):
+            a = s @ q / (y @ s)
+            alphas.append(a)
+            q -= a * y
+        if s_hist:
+            q *= (s_hist[-1] @ y_hist[-1]) / (y_hist[-1] @ y_hist[-1])
+        for (s, y), a in zip(zip(s_hist, y_hist), reversed(alphas)):
+            q += s * (a - y @ q / (y @ s))
+        direction = -q
+        if grad @ direction >= 0:
+            s_hist, y_hist = [], []
+        if not s_hist:
+            # Steepest descent with a unit-length first step keeps exp() in range
+            direction = -grad / max(1.0, np.linalg.norm(grad))
+
+        step = 1.0
+        while True:
+            x_new = x + step * direction
+            value_new, grad_new = fun(x_new, *args)
+            if value_new <= value + 1e-4 * step * (grad @ direction):
+                break
+            step *= 0.5
+            if step < 1e-12:
+                return {'x': x, 'value': value, 'iterations': iteration, 'converged': False}
+
+        s, y = x_new - x, grad_new - grad
+        if s @ y > 1e-10:
+            s_hist.append(s)
+            y_hist.append(y)
+            if len(s_hist) > memory:
+                s_hist.pop(0)
+                y_hist.pop(0)
+        x, value, grad = x_new, value_new, grad_new
+
+    return {'x': x, 'value': value, 'iterations': iteration, 'converged': converged}
+
+
+# ============================================================================
+# FITTING
+# ============================================================================
+
+def fit_season(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fit one season of played matches.
+
+    Returns:
+        pd.DataFrame: One row per club with attack, defence, overall, matches,
+            plus the season's home_advantage, rho and convergence info.
+    """
+    teams = sorted(set(matches['home']) | set(matches['away']))
+    index = {team: i for i, team in enumerate(teams)}
+    home = matches['home'].map(index).to_numpy()
+    away = matches['away'].map(index).to_numpy()
+    x = matches['home_goals'].to_numpy(dtype=np.float64)
+    y = matches['away_goals'].to_numpy(dtype=np.float64)
+    n = len(teams)
+
+    theta0 = np.zeros(2 * n + 3)
+    theta0[-3] = np.log(max((x.mean() + y.mean()) / 2, 0.1))
+    result = lbfgs(negative_log_likelihood, theta0, args=(home, away, x, y, n))
+    attack, defence, mu, home_adv, rho = _unpack(result['x'], n)
+
+    played = np.bincount(home, minlength=n) + np.bincount(away, minlength=n)
+    return pd.DataFrame({
+        'squad': teams,
+        'season': matches['season'].iloc[0],
+        'dc_attack': attack,
+        'dc_defence': defence,
+        'dc_overall': attack + defence,
+        'dc_matches': played,
+        'dc_home_advantage': home_adv,
+        'dc_rho': rho,
+        'dc_iterations': result['iterations'],
+        'dc_converged': result['converged'],
+    })
+
+
+def fit_all_seasons(played: pd.DataFrame, workers: int = None) -> pd.DataFrame:
+    """Fit every season in parallel and stack the ratings."""
+    groups = [group for _, group in played.groupby('season')]
+    if workers == 1:
+        frames = [fit_season(group) for group in groups]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(fit_season, groups))
+    ratings = pd.concat(frames, ignore_index=True)
+    ratings['season_start_year'] = ratings['season'].str[:4].astype(int)
+    return ratings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit Dixon-Coles ratings for every season in the match log")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("DIXON-COLES TEAM STRENGTH RATINGS")
+    print("=" * 80)
+
+    match_log = MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        print("⚠️ No match log found. Run notebooks/match_results.py first.")
+        raise SystemExit(1)
+
+    played = match_log.played()
+    start = time.perf_counter()
+    ratings = fit_all_seasons(played, args.workers)
+    elapsed = time.perf_counter() - start
+    n_seasons = ratings['season'].nunique()
+    print(f"Fitted {n_seasons} seasons ({len(played):,} matches) in {elapsed:.2f}s")
+    if not ratings['dc_converged'].all():
+        failed = sorted(ratings.loc[~ratings['dc_converged'], 'season'].unique())
+        print(f"⚠️ Did not converge: {failed}")
+
+    ratings.to_csv(RATINGS_PATH, index=False)
+    print(f"Saved: {RATINGS_PATH}")
+
+    print("\n" + "=" * 80)
+    print("MAN UTD STRENGTH BY SEASON (log-scale, 0 = league average)")
+    print("=" * 80)
+    man_utd = ratings[ratings['squad'] == MAN_UTD]
+    print(man_utd[['season', 'dc_attack', 'dc_defence', 'dc_overall']].round(3).to_string(index=False))
+
+    latest = ratings[ratings['season'] == ratings['season'].max()]
+    print(f"\nTop 5, {latest['season'].iloc[0]}:")
+    print(latest.nlargest(5, 'dc_overall')[['squad', 'dc_attack', 'dc_defence', 'dc_overall']]
+          .round(3).to_string(index=False))
@@ -0,0 +1,245 @@
+"""
+Incremental Elo Ratings
+=======================
+
+Per-match strength ratings for every club in the match log, so the manager
+comparisons in 08 can separate what a manager inherited from what they built.
+
+Ratings live in NumPy arrays indexed by team code. Matches are processed in
+date order, one match day at a time: a club plays at most once per day, so all
+of a day's matches update together with array operations. Every team-match
+also records the rating before and after, which gives a rating at any date.
+
+Update rule (World Football Elo style):
+    expected_home = 1 / (1 + 10 ** ((R_away - R_home - HOME_ADVANTAGE) / 400))
+    delta = K * G(goal difference) * (result - expected_home)
+
+The engine keeps a match-log cursor and checkpoints its state to
+data/processed/elo_state.npz. An update only processes newly logged matches;
+Elo depends on order, so a score correction or a backdated match triggers a
+full replay instead.
+
+Usage:
+    python notebooks/elo.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, MAN_UTD, MANAGER_TENURES
+
+STATE_PATH = Path("data/processed/elo_state.npz")
+HISTORY_PATH = Path("data/processed/elo_history.csv")
+TENURES_PATH = Path("data/processed/elo_manager_tenures.csv")
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 65.0
+# Clubs first seen mid-history (promoted) start at this quantile of active ratings
+NEW_TEAM_QUANTILE = 0.15
+
+HISTORY_FIELDS = ['date', 'team', 'opponent', 'rating_before', 'rating_after']
+
+
+def goal_difference_multiplier(goal_diff: np.ndarray) -> np.ndarray:
+    """1 for a one-goal margin, 1.5 for two, (11 + N) / 8 for N >= 3."""
+    n = np.abs(goal_diff)
+    return np.where(n <= 1, 1.0, np.where(n == 2, 1.5, (11 + n) / 8))
+
+
+class EloEngine:
+    """Array-backed Elo state, updated incrementally from the match log."""
+
+    def __init__(self, state_path=None):
+        self.state_path = Path(state_path) if state_path else None
+        self._reset()
+        if self.state_path and self.state_path.exists():
+            with np.load(self.state_path, allow_pickle=False) as state:
+                meta = json.loads(str(state['meta']))
+                self.cursor = meta['cursor']
+                self.teams = meta['teams']
+                self.ratings = state['ratings']
+                self.games = state['games']
+                self.history = {field: [state[f'history_{field}']] for field in HISTORY_FIELDS}
+            self.team_index = {team: i for i, team in enumerate(self.teams)}
+
+    def _reset(self) -> None:
+        self.cursor = 0
+        self.teams = []
+        self.team_index = {}
+        self.ratings = np.zeros(0)
+        self.games = np.zeros(0, dtype=np.int64)
+        self.history = {field: [] for field in HISTORY_FIELDS}
+
+    @property
+    def last_date(self):
+        dates = self.history['date']
+        return max(int(d.max()) for d in dates if len(d)) if any(len(d) for d in dates) else None
+
+    def _team_codes(self, names) -> np.ndarray:
+        new = [name for name in dict.fromkeys(names) if name not in self.team_index]
+        if new:
+            active = self.ratings[self.games > 0]
+            start = np.quantile(active, NEW_TEAM_QUANTILE) if len(active) else INITIAL_RATING
+            for name in new:
+                self.team_index[name] = len(self.teams)
+                self.teams.append(name)
+            self.ratings = np.concatenate([self.ratings, np.full(len(new), start)])
+            self.games = np.concatenate([self.games, np.zeros(len(new), dtype=np.int64)])
+        return np.array([self.team_index[n] for n in names], dtype=np.int64)
+
+    def apply(self, matches: pd.DataFrame) -> int:
+        """Apply played matches (after everything already rated) in date order."""
+        matches = matches.sort_values(['date', 'home'], kind='stable')
+        dates = matches['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+        home = self._team_codes(matches['home'].tolist())
+        away = self._team_codes(matches['away'].tolist())
+        goal_diff = (matches['home_goals'] - matches['away_goals']).to_numpy(dtype=np.float64)
+        result = np.where(goal_diff > 0, 1.0, np.where(goal_diff == 0, 0.5, 0.0))
+        multiplier = goal_difference_multiplier(goal_diff)
+
+        bounds = np.flatnonzero(np.diff(dates)) + 1
+        for day in np.split(np.arange(len(dates)), bounds):
+            h, a = home[day], away[day]
+            before_h, before_a = self.ratings[h], self.ratings[a]
+            expected = 1.0 / (1.0 + 10 ** ((before_a - before_h - HOME_ADVANTAGE) / 400))
+            delta = K_FACTOR * multiplier[day] * (result[day] - expected)
+            self.ratings[h] += delta
+            self.ratings[a] -= delta
+            self.games[h] += 1
+            self.games[a] += 1
+
+            self.history['date'].append(np.concatenate([dates[day], dates[day]]))
+            self.history['team'].append(np.concatenate([h, a]))
+            self.history['opponent'].append(np.concatenate([a, h]))
+            self.history['rating_before'].append(np.concatenate([before_h, before_a]))
+            self.history['rating_after'].append(np.concatenate([before_h + delta, before_a - delta]))
+        return len(matches)
+
+    def update(self, match_log: MatchLog) -> int:
+        """
+        Rate matches logged since the last update.
+
+        Returns:
+            int: Matches processed (a full replay counts every match).
+        """
+        batches = [batch for _, batch in match_log.changes(self.cursor)]
+        processed = 0
+        if batches:
+            batch = pd.concat(batches, ignore_index=True)
+            last = self.last_date
+            earliest = batch['date'].min().to_datetime64().astype('datetime64[D]').astype(np.int64)
+            if (batch['sign'] < 0).any() or (last is not None and earliest < last):
+                # Corrections or backdated results change everything after them
+                self._reset()
+                processed = self.apply(match_log.played())
+            else:
+                processed = self.apply(batch)
+        self.cursor = match_log.version
+        if self.state_path:
+            self.save()
+        return processed
+
+    def _history_arrays(self) -> dict:
+        dtypes = {'date': np.int64, 'team': np.int64, 'opponent': np.int64,
+                  'rating_before': np.float64, 'rating_after': np.float64}
+        arrays = {field: (np.concatenate(self.history[field]) if self.history[field]
+                          else np.zeros(0, dtype=dtypes[field])) for field in HISTORY_FIELDS}
+        # Compact so the next load starts from one array per field
+        self.history = {field: [arrays[field]] for field in HISTORY_FIELDS}
+        return arrays
+
+    def save(self) -> None:
+        meta = {'cursor': self.cursor, 'teams': self.teams}
+        history = self._history_arrays()
+        tmp_path = self.state_path.with_name(self.state_path.stem + '.tmp.npz')
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)), ratings=self.ratings, games=self.games,
+                 **{f'history_{field}': values for field, values in history.items()})
+        tmp_path.replace(self.state_path)
+
+    def history_frame(self) -> pd.DataFrame:
+        """One row per team-match: date, team, opponent, rating_before, rating_after."""
+        arrays = self._history_arrays()
+        names = np.array(self.teams, dtype=object)
+        return pd.DataFrame({
+            'date': arrays['date'].astype('datetime64[D]').astype('datetime64[ns]'),
+            'team': names[arrays['team']] if len(names) else arrays['team'],
+            'opponent': names[arrays['opponent']] if len(names) else arrays['opponent'],
+            'rating_before': arrays['rating_before'],
+            'rating_after': arrays['rating_after'],
+        })
+
+    def current_ratings(self) -> pd.DataFrame:
+        return pd.DataFrame({'team': self.teams, 'rating': self.ratings, 'games': self.games}) \
+            .sort_values('rating', ascending=False).reset_index(drop=True)
+
+    def tenure_report(self, team: str = MAN_UTD) -> pd.DataFrame:
+        """
+        Rating when each manager took over and when they left.
+
+        Appointment = rating before their first logged match; departure = rating
+        after their last. Tenures starting before the match log (Ferguson) begin
+        at the first logged match.
+        """
+        history = self.history_frame()
+        club = history[history['team'] == team]
+        starts = pd.to_datetime([t['start'] for t in MANAGER_TENURES])
+        ends = list(starts[1:]) + [pd.Timestamp.max]
+
+        rows = []
+        for tenure, start, end in zip(MANAGER_TENURES, starts, ends):
+            spell = club[(club['date'] >= start) & (club['date'] < end)]
+            if spell.empty:
+                continue
+            rows.append({
+                'manager': tenure['manager'],
+                'appointed': start.date(),
+                'first_match': spell['date'].iloc[0].date(),
+                'last_match': spell['date'].iloc[-1].date(),
+                'matches': len(spell),
+                'rating_at_appointment': spell['rating_before'].iloc[0],
+                'rating_at_departure': spell['rating_after'].iloc[-1],
+                'peak_rating': spell['rating_after'].max(),
+            })
+        report = pd.DataFrame(rows)
+        if not report.empty:
+            report['rating_change'] = report['rating_at_departure'] - report['rating_at_appointment']
+        return report
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ELO RATINGS")
+    print("=" * 80)
+
+    match_log = MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        print("⚠️ No match log found. Run notebooks/match_results.py first.")
+        raise SystemExit(1)
+
+    engine = EloEngine(STATE_PATH)
+    start = time.perf_counter()
+    processed = engine.update(match_log)
+    print(f"Rated {processed:,} new matches in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"(match log v{match_log.version}, checkpoint {STATE_PATH})")
+
+    engine.history_frame().to_csv(HISTORY_PATH, index=False)
+    tenures = engine.tenure_report()
+    tenures.to_csv(TENURES_PATH, index=False)
+    print(f"Saved: {HISTORY_PATH}, {TENURES_PATH}")
+
+    print("\nCurrent top 10:")
+    print(engine.current_ratings().head(10).round(0).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("MAN UTD RATING AT APPOINTMENT AND DEPARTURE")
+    print("=" * 80)
+    cols = ['manager', 'first_match', 'matches', 'rating_at_appointment', 'rating_at_departure', 'rating_change']
+    print(tenures[cols].round(0).to_string(index=False))
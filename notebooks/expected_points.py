@@ -0,0 +1,174 @@
+"""
+Expected Points (xPts) from xG
+==============================
+
+09 compares goals with xG; this module asks whether the points match the
+chances. For every match in the match log, each side's xG and xG conceded
+are treated as Poisson scoring rates. The (home goals x away goals) score
+matrix gives win / draw / loss probabilities and expected points
+(3 * P(win) + P(draw)).
+
+All matches are handled at once: Poisson pmfs are built as (matches, goals)
+arrays, and the score matrices as one (matches, goals, goals) outer product
+reduced with triangular masks.
+
+Aggregates:
+- per team-season: points, xPts and the difference (luck / finishing)
+- per Man Utd manager tenure (MANAGER_TENURES, by match date)
+
+Match-level xPts are cached to data/processed/expected_points.csv and only
+recomputed when the match log changes.
+
+Usage:
+    python notebooks/expected_points.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import (MatchLog, MATCH_LOG_DIR, MAN_UTD, MANAGER_TENURES,
+                           manager_for_dates, team_match_rows)
+
+CACHE_PATH = Path("data/processed/expected_points.csv")
+
+# Score matrix size; P(> 10 goals) is negligible for league xG values
+MAX_GOALS = 10
+
+
+def poisson_pmf(rates: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """(n, max_goals + 1) Poisson probabilities of 0..max_goals for each rate."""
+    rates = np.asarray(rates, dtype=np.float64)[:, None]
+    k = np.arange(max_goals + 1)
+    # lambda^k / k! as a running product, which avoids factorial overflow
+    terms = np.concatenate([np.ones_like(rates), np.cumprod(rates / k[1:], axis=1)], axis=1)
+    return np.exp(-rates) * terms
+
+
+def outcome_probabilities(xg_for, xg_against, max_goals: int = MAX_GOALS):
+    """
+    Win / draw / loss probabilities from independent Poisson scores.
+
+    Args:
+        xg_for, xg_against: Arrays of scoring rates (NaN allowed).
+        max_goals (int): Largest score in the matrix (probabilities are renormalised).
+
+    Returns:
+        tuple: (p_win, p_draw, p_loss) arrays, NaN where a rate is missing.
+    """
+    xg_for = np.asarray(xg_for, dtype=np.float64)
+    xg_against = np.asarray(xg_against, dtype=np.float64)
+    valid = ~(np.isnan(xg_for) | np.isnan(xg_against))
+
+    scores = poisson_pmf(np.where(valid, xg_for, 0.0), max_goals)[:, :, None] \
+        * poisson_pmf(np.where(valid, xg_against, 0.0), max_goals)[:, None, :]
+    win_mask = np.tril(np.ones((max_goals + 1, max_goals + 1), dtype=bool), k=-1)
+    total = scores.sum(axis=(1, 2))
+    p_win = scores[:, win_mask].sum(axis=1) / total
+    p_draw = np.trace(scores, axis1=1, axis2=2) / total
+    p_loss = 1.0 - p_win - p_draw
+
+    nan = np.full_like(p_win, np.nan)
+    return np.where(valid, p_win, nan), np.where(valid, p_draw, nan), np.where(valid, p_loss, nan)
+
+
+def match_xpts(matches: pd.DataFrame) -> pd.DataFrame:
+    """Team-perspective rows (see `team_match_rows`) with p_win, p_draw, p_loss and xpts."""
+    rows = team_match_rows(matches)
+    p_win, p_draw, p_loss = outcome_probabilities(rows['xg_for'], rows['xg_against'])
+    rows['p_win'] = p_win
+    rows['p_draw'] = p_draw
+    rows['p_loss'] = p_loss
+    rows['xpts'] = 3 * p_win + p_draw
+    return rows
+
+
+def season_xpts(rows: pd.DataFrame) -> pd.DataFrame:
+    """Points vs expected points per team-season (matches with xG only)."""
+    rows = rows.dropna(subset=['xpts'])
+    summary = rows.groupby(['season', 'team']).agg(
+        matches=('xpts', 'size'),
+        points=('points', 'sum'),
+        xpts=('xpts', 'sum'),
+        xg_for=('xg_for', 'sum'),
+        xg_against=('xg_against', 'sum'),
+    ).reset_index()
+    summary['points_minus_xpts'] = summary['points'] - summary['xpts']
+    summary['xpts_per_game'] = summary['xpts'] / summary['matches']
+    return summary.sort_values(['season', 'xpts'], ascending=[True, False]).reset_index(drop=True)
+
+
+def manager_xpts(rows: pd.DataFrame, team: str = MAN_UTD) -> pd.DataFrame:
+    """Points vs expected points per manager tenure (matches with xG only)."""
+    club = rows[(rows['team'] == team)].dropna(subset=['xpts']).copy()
+    club['manager'] = manager_for_dates(club['date'].to_numpy())
+    summary = club.groupby('manager').agg(
+        matches=('xpts', 'size'),
+        points=('points', 'sum'),
+        xpts=('xpts', 'sum'),
+        first_match=('date', 'min'),
+        last_match=('date', 'max'),
+    )
+    summary['ppg'] = summary['points'] / summary['matches']
+    summary['xpts_per_game'] = summary['xpts'] / summary['matches']
+    summary['points_minus_xpts'] = summary['points'] - summary['xpts']
+    order = [t['manager'] for t in MANAGER_TENURES]
+    return summary.reindex([m for m in order if m in summary.index]).reset_index()
+
+
+def cached_match_xpts(match_log: MatchLog = None, cache_path=CACHE_PATH) -> pd.DataFrame:
+    """
+    Match-level xPts for the whole match log, recomputed only when the log changes.
+
+    Returns:
+        pd.DataFrame: As `match_xpts`, or an empty frame if there is no match log.
+    """
+    match_log = match_log or MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        return pd.DataFrame()
+
+    cache_path = Path(cache_path)
+    meta_path = cache_path.with_suffix('.json')
+    key = {'match_log_version': match_log.version, 'max_goals': MAX_GOALS}
+
+    if cache_path.exists() and meta_path.exists():
+        with open(meta_path) as f:
+            if json.load(f) == key:
+                return pd.read_csv(cache_path, parse_dates=['date'])
+
+    rows = match_xpts(match_log.played())
+    rows.to_csv(cache_path, index=False)
+    with open(meta_path, 'w') as f:
+        json.dump(key, f)
+    return rows
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("EXPECTED POINTS (xPts)")
+    print("=" * 80)
+
+    rows = cached_match_xpts()
+    if rows.empty:
+        print("⚠️ No match log found. Run notebooks/match_results.py first.")
+        raise SystemExit(1)
+
+    with_xg = rows['xpts'].notna()
+    print(f"xPts for {with_xg.sum():,} of {len(rows):,} team-matches (xG available)")
+    print(f"Saved: {CACHE_PATH}")
+
+    seasons = season_xpts(rows)
+    latest = seasons[seasons['season'] == seasons['season'].max()]
+    print(f"\nPoints vs xPts, {latest['season'].iloc[0]}:")
+    print(latest[['team', 'matches', 'points', 'xpts', 'points_minus_xpts']].round(1).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("MAN UTD BY MANAGER: POINTS VS xPTS")
+    print("=" * 80)
+    managers = manager_xpts(rows)
+    print(managers[['manager', 'matches', 'ppg', 'xpts_per_game', 'points_minus_xpts']].round(2).to_string(index=False))
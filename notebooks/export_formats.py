@@ -0,0 +1,184 @@
+"""
+Columnar Export Formats for Chart Payloads
+==========================================
+
+The row-oriented JSON written by 09 repeats every key ("squad", "season",
+"goals_per_90", ...) in every record. This module turns each section of that
+payload into a column-oriented object instead:
+
+- Numeric / boolean fields become plain arrays (one per column)
+- `squad` and `season` are dictionary-encoded: a list of unique values plus
+  an integer index per row
+
+The same layout can also be written as Arrow IPC files (one per section) when
+`pyarrow` is installed, with squad and season as Arrow dictionary columns.
+
+Columnar JSON layout:
+
+    {
+      "format": "columnar-v1",
+      "sections": {
+        "attacking_edge": {
+          "length": 20,
+          "columns": {
+            "squad": {"dictionary": ["Arsenal", ...], "indices": [0, 1, ...]},
+            "goals_per_90": [2.0, 1.5, ...],
+            ...
+          }
+        }
+      }
+    }
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+from pathlib import Path
+
+COLUMNAR_FORMAT = "columnar-v1"
+
+# Low-cardinality string columns that are stored as dictionary + indices
+DICTIONARY_COLUMNS = ("squad", "season")
+
+
+def to_columnar(records: list) -> dict:
+    """
+    Convert a list of row dicts into a column-oriented section.
+
+    Args:
+        records (list): Row dicts as produced by 09 (all rows share the same keys,
+            missing keys are treated as null).
+
+    Returns:
+        dict: {"length": n, "columns": {name: values | {"dictionary", "indices"}}}
+    """
+    column_names = []
+    for record in records:
+        for key in record:
+            if key not in column_names:
+                column_names.append(key)
+
+    columns = {}
+    for name in column_names:
+        values = [record.get(name) for record in records]
+        if name in DICTIONARY_COLUMNS:
+            dictionary = []
+            positions = {}
+            indices = []
+            for value in values:
+                if value is None:
+                    indices.append(None)
+                    continue
+                if value not in positions:
+                    positions[value] = len(dictionary)
+                    dictionary.append(value)
+                indices.append(positions[value])
+            columns[name] = {"dictionary": dictionary, "indices": indices}
+        else:
+            columns[name] = values
+
+    return {"length": len(records), "columns": columns}
+
+
+def from_columnar(section: dict) -> list:
+    """
+    Expand a columnar section back into a list of row dicts.
+
+    Args:
+        section (dict): Output of `to_columnar`.
+
+    Returns:
+        list: Row dicts in the original order.
+    """
+    decoded = {}
+    for name, column in section["columns"].items():
+        if isinstance(column, dict) and "dictionary" in column:
+            dictionary = column["dictionary"]
+            decoded[name] = [dictionary[i] if i is not None else None for i in column["indices"]]
+        else:
+            decoded[name] = column
+
+    return [
+        {name: values[i] for name, values in decoded.items()}
+        for i in range(section["length"])
+    ]
+
+
+def write_columnar_json(payload: dict, output_path) -> Path:
+    """
+    Write every section of a row-oriented payload as columnar JSON.
+
+    Args:
+        payload (dict): Mapping of section name -> list of row dicts.
+        output_path: Destination file.
+
+    Returns:
+        Path: The written file.
+    """
+    output_path = Path(output_path)
+    document = {
+        "format": COLUMNAR_FORMAT,
+        "sections": {name: to_columnar(records) for name, records in payload.items()},
+    }
+    with open(output_path, 'w') as f:
+        json.dump(document, f, separators=(',', ':'))
+    return output_path
+
+
+def write_arrow_ipc(payload: dict, output_dir, stem: str) -> list:
+    """
+    Write each section as an Arrow IPC file: `{stem}.{section}.arrow`.
+
+    Requires `pyarrow`. Squad and season columns are dictionary-encoded.
+
+    Args:
+        payload (dict): Mapping of section name -> list of row dicts.
+        output_dir: Directory for the .arrow files.
+        stem (str): File name prefix, e.g. "attacking_analysis".
+
+    Returns:
+        list: Paths of the written files.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Arrow IPC export requires pyarrow (pip install pyarrow)") from e
+
+    output_dir = Path(output_dir)
+    written = []
+    for name, records in payload.items():
+        section = to_columnar(records)
+        arrays = {}
+        for column, values in section["columns"].items():
+            if isinstance(values, dict):
+                arrays[column] = pa.DictionaryArray.from_arrays(
+                    pa.array(values["indices"], type=pa.int32()),
+                    pa.array(values["dictionary"], type=pa.string()),
+                )
+            else:
+                arrays[column] = pa.array(values)
+
+        table = pa.table(arrays)
+        path = output_dir / f"{stem}.{name}.arrow"
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        written.append(path)
+
+    return written
+
+
+if __name__ == "__main__":
+    source = Path("data/processed/attacking_analysis.json")
+
+    with open(source) as f:
+        payload = json.load(f)
+
+    target = write_columnar_json(payload, source.with_name("attacking_analysis.columnar.json"))
+
+    row_bytes = len(json.dumps(payload, separators=(',', ':')))
+    col_bytes = target.stat().st_size
+    print(f"✅ Columnar export saved to: {target}")
+    print(f"   Row-oriented (compact): {row_bytes:,} bytes")
+    print(f"   Columnar:               {col_bytes:,} bytes ({(col_bytes / row_bytes - 1) * 100:+.1f}%)")
@@ -0,0 +1,209 @@
+"""
+Versioned Delta Exports
+=======================
+
+Instead of clients re-downloading the full attacking_analysis.json after every
+matchweek, each run of 09 publishes:
+
+- `snapshots/NNNNNN.json` full payload at version N (for new clients)
+- `patches/NNNNNN.json`   row-level diff from version N-1 to N (immutable)
+- `latest.json`           small version pointer naming the current snapshot
+                          and listing the available patches
+
+A client holding version N fetches `latest.json`, then only the patches with
+`to_version > N`, and applies them in order with `apply_patch`. Runs that
+produce an identical payload do not create a new version.
+
+Every file is written to a temp file and renamed into place, and the pointer
+is replaced last, so a reader always sees a complete snapshot and patch list
+for the version it names. The previous version's snapshot is kept for readers
+that loaded the old pointer mid-publish; older ones are removed.
+
+Rows are matched by a per-section key (e.g. squad + season), so a matchweek
+that only moves the 2025-26 rows produces a patch containing only those rows.
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Columns identifying a row within each section of the attacking export
+SECTION_KEYS = {
+    'attacking_edge': ('squad', 'season'),
+    'performance_vs_expected': ('squad', 'season'),
+    'expected_points': ('squad', 'season'),
+    'man_utd_manager_xpts': ('manager',),
+    'man_utd_timeline': ('season',),
+    'rivals_comparison': ('squad', 'season'),
+}
+
+
+def _row_key(row: dict, key_cols: tuple) -> tuple:
+    return tuple(row.get(col) for col in key_cols)
+
+
+def _content_hash(payload: dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def diff_payloads(old: dict, new: dict) -> dict:
+    """
+    Compute a row-level diff between two payloads.
+
+    Args:
+        old (dict): Previous payload (section -> list of rows).
+        new (dict): Current payload.
+
+    Returns:
+        dict: section -> {"key", "upsert", "delete"}; unchanged sections are omitted.
+            Sections without a configured key are sent whole as {"replace": rows}.
+    """
+    sections = {}
+    for name in sorted(set(old) | set(new)):
+        old_rows = old.get(name, [])
+        new_rows = new.get(name, [])
+        if old_rows == new_rows:
+            continue
+
+        key_cols = SECTION_KEYS.get(name)
+        if key_cols is None:
+            sections[name] = {"replace": new_rows}
+            continue
+
+        old_index = {_row_key(row, key_cols): row for row in old_rows}
+        new_keys = set()
+        upsert = []
+        for row in new_rows:
+            key = _row_key(row, key_cols)
+            new_keys.add(key)
+            if old_index.get(key) != row:
+                upsert.append(row)
+        delete = [list(key) for key in old_index if key not in new_keys]
+
+        sections[name] = {"key": list(key_cols), "upsert": upsert, "delete": delete}
+
+    return sections
+
+
+def apply_patch(payload: dict, patch: dict) -> dict:
+    """
+    Apply one patch to a payload (client side).
+
+    Updated rows keep their position; new rows are appended to the section.
+
+    Args:
+        payload (dict): Payload at `patch["from_version"]`.
+        patch (dict): Patch document.
+
+    Returns:
+        dict: Payload at `patch["to_version"]`.
+    """
+    result = {name: list(rows) for name, rows in payload.items()}
+    for name, change in patch["sections"].items():
+        if "replace" in change:
+            result[name] = change["replace"]
+            continue
+
+        key_cols = tuple(change["key"])
+        deleted = {tuple(key) for key in change["delete"]}
+        rows = [row for row in result.get(name, []) if _row_key(row, key_cols) not in deleted]
+        positions = {_row_key(row, key_cols): i for i, row in enumerate(rows)}
+        for row in change["upsert"]:
+            key = _row_key(row, key_cols)
+            if key in positions:
+                rows[positions[key]] = row
+            else:
+                positions[key] = len(rows)
+                rows.append(row)
+        result[name] = rows
+
+    return result
+
+
+def _write_json(path: Path, obj, **kwargs) -> None:
+    """Write JSON via a temp file + rename, so `path` is never seen half-written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, **kwargs)
+    tmp_path.replace(path)
+
+
+def load_pointer(export_dir) -> dict:
+    """Read `latest.json` for an export directory (None if nothing published yet)."""
+    pointer_path = Path(export_dir) / "latest.json"
+    if not pointer_path.exists():
+        return None
+    with open(pointer_path) as f:
+        return json.load(f)
+
+
+def publish_version(payload: dict, export_root, name: str) -> tuple:
+    """
+    Publish `payload` as the next version of export `name` if it changed.
+
+    Args:
+        payload (dict): Section -> list of rows.
+        export_root: Directory holding one sub-directory per export.
+        name (str): Export name, e.g. "attacking_analysis".
+
+    Returns:
+        tuple: (version pointer after the call, published flag: False when the
+            payload was unchanged and the existing version was kept).
+    """
+    export_dir = Path(export_root) / name
+    snapshot_dir = export_dir / "snapshots"
+    for directory in (snapshot_dir, export_dir / "patches"):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    pointer = load_pointer(export_dir)
+    content_hash = _content_hash(payload)
+    if pointer is not None and pointer["content_hash"] == content_hash:
+        return pointer, False
+
+    published_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    if pointer is None:
+        version = 1
+        patches = []
+    else:
+        with open(export_dir / pointer["snapshot"]) as f:
+            previous = json.load(f)
+        version = pointer["version"] + 1
+        patch = {
+            "from_version": pointer["version"],
+            "to_version": version,
+            "published_at": published_at,
+            "sections": diff_payloads(previous, payload),
+        }
+        patch_name = f"patches/{version:06d}.json"
+        _write_json(export_dir / patch_name, patch, separators=(',', ':'))
+        patches = pointer["patches"] + [{"to_version": version, "path": patch_name}]
+
+    snapshot_name = f"snapshots/{version:06d}.json"
+    _write_json(export_dir / snapshot_name, payload, separators=(',', ':'))
+
+    pointer = {
+        "version": version,
+        "content_hash": content_hash,
+        "published_at": published_at,
+        "snapshot": snapshot_name,
+        "patches": patches,
+    }
+    # Write the pointer last so readers never see a version without its files
+    _write_json(export_dir / "latest.json", pointer, indent=2)
+
+    for old in snapshot_dir.glob("*.json"):
+        if old.stem.isdigit() and int(old.stem) < version - 1:
+            old.unlink()
+
+    return pointer, True
+
+
+def patches_since(pointer: dict, client_version: int) -> list:
+    """Return the patch paths a client at `client_version` still has to fetch."""
+    return [p["path"] for p in pointer["patches"] if p["to_version"] > client_version]
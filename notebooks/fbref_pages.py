@@ -0,0 +1,191 @@
+"""
+FBRef Competition Pages and Table Extraction
+============================================
+
+The pieces of 02_scrape_fbref_all_seasons.py that every scraper needs: the
+table keys and their div ids, the competitions we scrape, page URLs, where
+each competition's CSVs live, and the extraction of a table from a page
+(FBRef hides most tables inside HTML comments).
+
+Storage is partitioned by competition: the Premier League keeps the original
+data/raw/fbref_{table}_{season}.csv layout that 03-09 read, other competitions
+go to data/raw/{competition}/ with the same file names, so
+`fbref_tables.load_table(table, competition_dir(competition))` works for any
+league.
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import random
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from bs4 import BeautifulSoup, Comment
+
+BASE_URL = "https://fbref.com"
+COMPETITION_URL_TEMPLATE = "{base_url}/en/comps/{comp_id}/{season_id}/{page}{season_str}-{comp_name}-Stats"
+RAW_DIR = Path("data/raw")
+SEASONS = list(range(2000, 2026))  # 2000 to 2025
+CURRENT_SEASON = SEASONS[-1]
+
+# key -> FBRef comp id, name used in URLs, scheduling rank (lower goes first)
+COMPETITIONS = {
+    'premier_league': {'id': 9, 'name': 'Premier-League', 'rank': 0},
+    'championship': {'id': 10, 'name': 'Championship', 'rank': 1},
+    'la_liga': {'id': 12, 'name': 'La-Liga', 'rank': 2},
+    'serie_a': {'id': 11, 'name': 'Serie-A', 'rank': 3},
+    'bundesliga': {'id': 20, 'name': 'Bundesliga', 'rank': 4},
+    'ligue_1': {'id': 13, 'name': 'Ligue-1', 'rank': 5},
+}
+DEFAULT_COMPETITION = 'premier_league'
+
+# Tables we want to scrape
+TABLES = {
+    "squad_standard": "Squad Standard Stats",
+    "squad_shooting": "Squad Shooting",
+    "squad_passing": "Squad Pass Types",
+    "squad_goal_shot_creation": "Squad Goal and Shot Creation",
+    "squad_defensive": "Squad Defensive Actions",
+    "squad_possession": "Squad Possession",
+    "squad_playing_time": "Squad Playing Time",
+    "squad_misc": "Squad Miscellaneous Stats",
+    "squad_goalkeeping": "Squad Goalkeeping",
+    "squad_adv_goalkeeping": "Squad Advanced Goalkeeping",
+    "league_table": "League Table",
+}
+
+DIV_ID_MAP = {
+    "squad_standard": "all_stats_squads_standard",
+    "squad_shooting": "all_stats_squads_shooting",
+    "squad_passing": "all_stats_squads_passing",
+    "squad_goal_shot_creation": "all_stats_squads_gca",
+    "squad_defensive": "all_stats_squads_defense",
+    "squad_possession": "all_stats_squads_possession",
+    "squad_playing_time": "all_stats_squads_playing_time",
+    "squad_misc": "all_stats_squads_misc",
+    "squad_goalkeeping": "all_stats_keeper_squads",
+    "squad_adv_goalkeeping": "all_stats_keeper_adv_squads",
+    "league_table": "all_stats_league_table",
+}
+
+# Dedicated stats sub-page carrying each table (None = the season overview page).
+# The overview embeds every table and is several times larger than one
+# sub-page, so a partial refresh only fetches the sub-pages it needs.
+TABLE_PAGES = {
+    "squad_standard": "stats",
+    "squad_shooting": "shooting",
+    "squad_passing": "passing",
+    "squad_goal_shot_creation": "gca",
+    "squad_defensive": "defense",
+    "squad_possession": "possession",
+    "squad_playing_time": "playingtime",
+    "squad_misc": "misc",
+    "squad_goalkeeping": "keepers",
+    "squad_adv_goalkeeping": "keepersadv",
+    "league_table": None,
+}
+# From this many missing tables in a season, one overview request is cheaper
+# (in requests and bytes) than the individual sub-pages
+OVERVIEW_MIN_TABLES = 4
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+]
+
+
+def season_str(season: int) -> str:
+    """2023 -> '2023-24' (file names and the `season` column)."""
+    return f"{season}-{(season + 1) % 100:02d}"
+
+
+def page_url(competition: str, season: int, page: str = None, base_url: str = BASE_URL) -> str:
+    """Season overview page for a competition, or one of its stats sub-pages (TABLE_PAGES)."""
+    comp = COMPETITIONS[competition]
+    return COMPETITION_URL_TEMPLATE.format(
+        base_url=base_url, comp_id=comp['id'], comp_name=comp['name'], page=f"{page}/" if page else "",
+        season_id=f"{season}-{season + 1}", season_str=season_str(season))
+
+
+def pages_for(tables: list, overview_min: int = OVERVIEW_MIN_TABLES) -> dict:
+    """
+    Group one season's table keys by the page to fetch them from: {page: [tables]}.
+
+    Few missing tables map to their sub-pages; `overview_min` or more are all
+    taken from the season overview (page None) in a single request.
+    """
+    if len(tables) >= overview_min:
+        return {None: list(tables)}
+    pages = {}
+    for table in tables:
+        pages.setdefault(TABLE_PAGES[table], []).append(table)
+    return pages
+
+
+def response_bytes(response) -> int:
+    """Bytes on the wire (Content-Length, i.e. compressed size) or the body size if absent."""
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else len(response.content)
+
+
+def competition_dir(competition: str, raw_dir=RAW_DIR) -> Path:
+    """Partition holding one competition's CSVs (the Premier League stays at the top level)."""
+    raw_dir = Path(raw_dir)
+    return raw_dir if competition == DEFAULT_COMPETITION else raw_dir / competition
+
+
+def table_path(competition: str, table: str, season: int, raw_dir=RAW_DIR) -> Path:
+    return competition_dir(competition, raw_dir) / f"fbref_{table}_{season_str(season)}.csv"
+
+
+def make_session():
+    """requests.Session with browser-like headers (one per worker thread)."""
+    import requests
+
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": random.choice(USER_AGENTS),
+        "Referer": "https://fbref.com/en/comps/9/Premier-League-Stats",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    })
+    return session
+
+
+def extract_tables(html: str, keys: list) -> dict:
+    """
+    Pull the requested tables out of a page.
+
+    Returns:
+        dict: key -> DataFrame, or None when the div/table is not on the page.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    tables = {}
+    for key in keys:
+        tables[key] = None
+        table_div = soup.find("div", id=DIV_ID_MAP[key])
+        if not table_div:
+            continue
+        comment = next((c for c in table_div.children if isinstance(c, Comment)), None)
+        table_soup = BeautifulSoup(comment, "html.parser") if comment else table_div
+        table = table_soup.find("table")
+        if table:
+            try:
+                tables[key] = pd.read_html(StringIO(str(table)))[0]
+            except Exception as e:
+                print(f"⚠️ Error processing {key} ({TABLES[key]}): {e}")
+    return tables
+
+
+def write_table(df: pd.DataFrame, competition: str, table: str, season: int, raw_dir=RAW_DIR) -> Path:
+    """Save one extracted table the way 02 always has (two-row header, `season` column)."""
+    path = table_path(competition, table, season, raw_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = df.copy()
+    df["season"] = season_str(season)
+    df.to_csv(path, index=False)
+    return path
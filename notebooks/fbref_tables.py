@@ -0,0 +1,130 @@
+"""
+Shared Loader for Raw FBRef Squad Tables
+========================================
+
+02 writes one CSV per table per season (data/raw/fbref_{table}_{season}.csv)
+with FBRef's two-row headers. 03 and 06 each flatten those headers inline; this
+module does the same flattening once so any table can be loaded, combined
+across seasons and joined with the others on (squad, season).
+
+Usage:
+    from fbref_tables import load_table, load_tables
+
+    defensive = load_table('squad_defensive')
+    wide = load_tables(['squad_standard', 'squad_shooting', 'squad_defensive'])
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import glob
+from pathlib import Path
+
+import pandas as pd
+
+RAW_DIR = Path("data/raw")
+
+# Table keys as written by 02_scrape_fbref_all_seasons.py
+SQUAD_TABLES = [
+    'squad_standard', 'squad_shooting', 'squad_passing', 'squad_goal_shot_creation',
+    'squad_defensive', 'squad_possession', 'squad_playing_time', 'squad_misc',
+    'squad_goalkeeping', 'squad_adv_goalkeeping', 'league_table',
+]
+
+KEY_COLUMNS = ['squad', 'season']
+
+
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten FBRef's two-level header the way 03/06 do (e.g. 'performance_gls', 'tkl_int')."""
+    new_cols = []
+    for col in df.columns.values:
+        # If second level is unnamed, use first level only
+        if 'Unnamed' in str(col[1]):
+            new_cols.append(col[0])
+        # If first level is unnamed, use second level only
+        elif 'Unnamed' in str(col[0]):
+            new_cols.append(col[1])
+        # If both have values, combine them
+        elif col[1] != '' and col[1] != col[0]:
+            new_cols.append(f"{col[0]}_{col[1]}")
+        else:
+            new_cols.append(col[0])
+
+    df.columns = new_cols
+    df.columns = (df.columns
+                  .str.replace(r'Unnamed: \d+_level_0', '', regex=True)
+                  .str.strip('_')
+                  .str.lower()
+                  .str.replace(' ', '_')
+                  .str.replace('-', '_')
+                  .str.replace('+', '_')
+                  .str.replace('/', '_'))
+    return df
+
+
+def table_files(table: str, raw_dir=RAW_DIR) -> list:
+    return sorted(glob.glob(str(Path(raw_dir) / f"fbref_{table}_*.csv")))
+
+
+def load_table(table: str, raw_dir=RAW_DIR) -> pd.DataFrame:
+    """
+    All seasons of one raw table with flat columns.
+
+    Numeric-looking columns are converted, rows without a squad dropped, and
+    `season_start_year` added.
+
+    Returns:
+        pd.DataFrame: Empty if no files exist for the table.
+    """
+    frames = []
+    for file in table_files(table, raw_dir):
+        # league_table has a single header row; the squad tables have two
+        header = [0] if table == 'league_table' else [0, 1]
+        try:
+            df = pd.read_csv(file, header=header)
+        except Exception as e:
+            print(f"Error loading {file}: {e}")
+            continue
+        if len(header) == 2:
+            df = flatten_columns(df)
+        else:
+            df.columns = df.columns.str.lower().str.replace(' ', '_').str.replace('/', '_')
+        frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.dropna(subset=['squad'])
+    df = df[df['squad'] != 'Squad']  # repeated header rows
+    for col in df.columns:
+        if col not in KEY_COLUMNS:
+            converted = pd.to_numeric(df[col], errors='coerce')
+            if converted.notna().sum() >= df[col].notna().sum() * 0.9:
+                df[col] = converted
+    df['season_start_year'] = df['season'].str[:4].astype(int)
+    return df.reset_index(drop=True)
+
+
+def load_tables(tables: list = None, raw_dir=RAW_DIR) -> pd.DataFrame:
+    """
+    Outer-join several tables on (squad, season).
+
+    Columns other than the keys are prefixed with the table name minus
+    'squad_' (e.g. 'defensive__tkl_int'), so tables sharing column names
+    ('90s', '#_pl', ...) do not collide.
+    """
+    wide = None
+    for table in tables or SQUAD_TABLES:
+        df = load_table(table, raw_dir)
+        if df.empty:
+            continue
+        prefix = table.replace('squad_', '')
+        df = df.drop(columns=['season_start_year']).drop_duplicates(KEY_COLUMNS)
+        df = df.rename(columns={c: f"{prefix}__{c}" for c in df.columns if c not in KEY_COLUMNS})
+        wide = df if wide is None else wide.merge(df, on=KEY_COLUMNS, how='outer')
+
+    if wide is None:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    wide['season_start_year'] = wide['season'].str[:4].astype(int)
+    return wide.sort_values(['season', 'squad']).reset_index(drop=True)
@@ -0,0 +1,278 @@
+"""
+Compressed Raw-HTML Archive
+===========================
+
+Every page the scrapers fetch (02, scrape_scheduler.py) is kept once,
+compressed, so tables can be re-extracted after a TABLES addition or a parser
+fix without hitting FBRef again.
+
+Layout (data/html_archive/):
+- pages.pack        append-only concatenation of compressed pages
+- pages.idx.jsonl   append-only index, one JSON line per fetch:
+                    url, fetched_at, offset, length, size, sha1, codec and
+                    the competition / season / page it belongs to
+
+A page whose content is unchanged since its last fetch gets a new index line
+pointing at the existing blob, so re-fetches cost no pack space. Pages are
+zstd-compressed when `zstandard` is installed, zlib otherwise; the codec is
+recorded per page, so an archive can mix both.
+
+The index is written after the page, so an interrupted write leaves at most
+some unreferenced bytes at the end of the pack. One process writes at a time
+(threads share one HtmlArchive); any number of processes read.
+
+Usage:
+    python notebooks/html_archive.py status
+    python notebooks/html_archive.py extract --tables squad_shooting,squad_misc --workers 8
+    python notebooks/html_archive.py extract --tables all --competitions all
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fbref_pages import (COMPETITIONS, DEFAULT_COMPETITION, RAW_DIR, TABLE_PAGES, TABLES, extract_tables,
+                         season_str, write_table)
+
+ARCHIVE_DIR = Path("data/html_archive")
+PACK_NAME = "pages.pack"
+INDEX_NAME = "pages.idx.jsonl"
+
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+
+# ============================================================================
+# COMPRESSION
+# ============================================================================
+
+def default_codec() -> str:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return 'zlib'
+    return 'zstd'
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(blob: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Page was archived with zstd; reading it requires zstandard "
+                              "(pip install zstandard)") from e
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+# ============================================================================
+# ARCHIVE
+# ============================================================================
+
+class HtmlArchive:
+    """Append-only pack of compressed pages with a URL / fetch-time index."""
+
+    def __init__(self, directory=ARCHIVE_DIR, codec: str = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.pack_path = self.directory / PACK_NAME
+        self.index_path = self.directory / INDEX_NAME
+        self.codec = codec or default_codec()
+        self.lock = threading.Lock()
+        self.records = self._load_index()
+        self.latest = {}
+        for record in self.records:
+            self.latest[record['url']] = record
+
+    def _load_index(self) -> list:
+        if not self.index_path.exists():
+            return []
+        pack_size = self.pack_path.stat().st_size if self.pack_path.exists() else 0
+        records = []
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted write
+                if record['offset'] + record['length'] <= pack_size:
+                    records.append(record)
+        return records
+
+    def put(self, url: str, html: str, competition: str = None, season: int = None,
+            page: str = None, fetched_at: float = None) -> dict:
+        """Archive one fetched page; unchanged content only adds an index line."""
+        data = html.encode('utf-8')
+        sha1 = hashlib.sha1(data).hexdigest()
+        record = {
+            'url': url, 'fetched_at': fetched_at or time.time(),
+            'competition': competition, 'season': season, 'page': page,
+        }
+        with self.lock:
+            previous = self.latest.get(url)
+            if previous is not None and previous['sha1'] == sha1:
+                record.update({k: previous[k] for k in ('offset', 'length', 'size', 'sha1', 'codec')})
+            else:
+                blob = compress(data, self.codec)
+                with open(self.pack_path, 'ab') as pack:
+                    offset = pack.seek(0, 2)
+                    pack.write(blob)
+                record.update({'offset': offset, 'length': len(blob), 'size': len(data),
+                               'sha1': sha1, 'codec': self.codec})
+            with open(self.index_path, 'a', encoding='utf-8') as index:
+                index.write(json.dumps(record) + "\n")
+            self.records.append(record)
+            self.latest[url] = record
+        return record
+
+    def get(self, record: dict) -> str:
+        return read_page(self.pack_path, record)
+
+    def lookup(self, url: str, at: float = None) -> dict:
+        """Latest record for `url` fetched at or before `at` (default: the latest), or None."""
+        if at is None:
+            return self.latest.get(url)
+        matches = [r for r in self.records if r['url'] == url and r['fetched_at'] <= at]
+        return max(matches, key=lambda r: r['fetched_at']) if matches else None
+
+    def latest_pages(self) -> dict:
+        """(competition, season, page) -> latest record, for pages archived with their origin."""
+        pages = {}
+        for record in self.records:
+            if record.get('competition') is None:
+                continue
+            key = (record['competition'], record['season'], record['page'])
+            if key not in pages or record['fetched_at'] >= pages[key]['fetched_at']:
+                pages[key] = record
+        return pages
+
+    def stats(self) -> dict:
+        blobs = {(r['offset'], r['length']): r['size'] for r in self.records}
+        return {
+            'fetches': len(self.records),
+            'urls': len(self.latest),
+            'blobs': len(blobs),
+            'raw_bytes': sum(blobs.values()),
+            'packed_bytes': sum(length for _, length in blobs),
+            'codecs': sorted({r['codec'] for r in self.records}),
+        }
+
+
+def read_page(pack_path, record: dict) -> str:
+    with open(pack_path, 'rb') as pack:
+        pack.seek(record['offset'])
+        blob = pack.read(record['length'])
+    return decompress(blob, record['codec']).decode('utf-8')
+
+
+# ============================================================================
+# OFFLINE RE-EXTRACTION
+# ============================================================================
+
+def extraction_plan(archive: HtmlArchive, tables: list, competitions: list = None,
+                    seasons: list = None) -> list:
+    """
+    One task per archived page to parse: (record, table keys).
+
+    Each table comes from the most recent archived page that carries it: its
+    stats sub-page or the season overview.
+    """
+    pages = archive.latest_pages()
+    origins = sorted({(c, s) for c, s, _ in pages
+                      if (competitions is None or c in competitions) and (seasons is None or s in seasons)})
+    tasks = {}
+    for competition, season in origins:
+        for table in tables:
+            candidates = [pages.get((competition, season, TABLE_PAGES[table])),
+                          pages.get((competition, season, None))]
+            candidates = [r for r in candidates if r is not None]
+            if not candidates:
+                continue
+            record = max(candidates, key=lambda r: r['fetched_at'])
+            key = (record['offset'], record['length'], competition, season)
+            tasks.setdefault(key, (record, []))[1].append(table)
+    return list(tasks.values())
+
+
+def _extract_task(task: tuple) -> tuple:
+    pack_path, raw_dir, record, keys = task
+    tables = extract_tables(read_page(pack_path, record), keys)
+    found, missing = [], []
+    for key, df in tables.items():
+        if df is None:
+            missing.append(key)
+        else:
+            write_table(df, record['competition'], key, record['season'], raw_dir)
+            found.append(key)
+    return record['competition'], record['season'], record['page'], found, missing
+
+
+def reextract(archive: HtmlArchive, tables: list, competitions: list = None, seasons: list = None,
+              raw_dir=RAW_DIR, workers: int = None) -> list:
+    """
+    Rebuild table CSVs from archived pages in parallel, without network access.
+
+    Returns:
+        list: (competition, season, page, found tables, missing tables) per page.
+    """
+    plan = extraction_plan(archive, tables, competitions, seasons)
+    tasks = [(str(archive.pack_path), str(raw_dir), record, keys) for record, keys in plan]
+    if workers == 1:
+        return [_extract_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_extract_task, tasks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive of fetched FBRef pages and offline re-extraction")
+    parser.add_argument('--archive-dir', default=str(ARCHIVE_DIR))
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help="archive size and compression")
+    extract = sub.add_parser('extract', help="rebuild table CSVs from archived pages")
+    extract.add_argument('--tables', default='all', help="comma-separated table keys or 'all'")
+    extract.add_argument('--competitions', default=DEFAULT_COMPETITION,
+                         help=f"comma-separated keys or 'all' ({', '.join(COMPETITIONS)})")
+    extract.add_argument('--seasons', default=None, help="comma-separated start years (default: all archived)")
+    extract.add_argument('--raw-dir', default=str(RAW_DIR))
+    extract.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("FBREF HTML ARCHIVE")
+    print("=" * 80)
+
+    archive = HtmlArchive(args.archive_dir)
+    if args.command == 'extract':
+        tables = list(TABLES) if args.tables == 'all' else args.tables.split(',')
+        competitions = list(COMPETITIONS) if args.competitions == 'all' else args.competitions.split(',')
+        seasons = [int(s) for s in args.seasons.split(',')] if args.seasons else None
+        start = time.perf_counter()
+        results = reextract(archive, tables, competitions, seasons, args.raw_dir, args.workers)
+        elapsed = time.perf_counter() - start
+        for competition, season, page, found, missing in results:
+            if missing:
+                print(f"⚠️ {competition} {season_str(season)} {page or 'overview'}: "
+                      f"not on page: {', '.join(missing)}")
+        n_found = sum(len(r[3]) for r in results)
+        print(f"\n{n_found} table(s) rebuilt from {len(results)} archived page(s) in {elapsed:.1f}s")
+
+    stats = archive.stats()
+    ratio = stats['raw_bytes'] / stats['packed_bytes'] if stats['packed_bytes'] else 0
+    print(f"\n{stats['fetches']} fetch(es) of {stats['urls']} URL(s), {stats['blobs']} stored page(s)")
+    print(f"{stats['raw_bytes'] / 1e6:.1f} MB of HTML in {stats['packed_bytes'] / 1e6:.2f} MB "
+          f"({ratio:.1f}x, {', '.join(stats['codecs']) or 'empty'})")
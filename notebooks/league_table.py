@@ -0,0 +1,216 @@
+"""
+Incremental League Table Reconstruction
+=======================================
+
+Rebuilds full Premier League standings after every matchweek from the match
+log (notebooks/match_results.py) instead of scraping a finished table.
+
+Per season the engine keeps per-(team, matchweek) increments for played, W/D/L,
+goals for/against and points. Standings after every matchweek are a cumulative
+sum along the matchweek axis plus one lexicographic sort (points, goal
+difference, goals scored, then name) across all matchweeks at once.
+
+New matches are applied as signed increments (see `MatchLog.changes`), so an
+update only touches the affected seasons and never replays the whole history.
+
+Note: rounds follow FBRef's scheduled "Wk", so a postponed match counts towards
+the matchweek it was scheduled in. `position_after_games` uses each club's own
+game count, which is the fairer basis for comparing managers.
+
+Usage:
+    python notebooks/league_table.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, team_match_rows
+
+STATE_PATH = Path("data/processed/league_table_state.npz")
+STANDINGS_PATH = Path("data/processed/league_table_by_matchweek.csv")
+
+STATS = ['played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points']
+
+
+class SeasonTable:
+    """Per-matchweek increments for one season; arrays grow as teams/rounds appear."""
+
+    def __init__(self, season: str, teams: list = None, increments: np.ndarray = None):
+        self.season = season
+        self.teams = list(teams or [])
+        self.team_index = {team: i for i, team in enumerate(self.teams)}
+        self.increments = increments if increments is not None else np.zeros((len(STATS), 0, 0), dtype=np.int32)
+
+    def _team_codes(self, names) -> np.ndarray:
+        for name in names:
+            if name not in self.team_index:
+                self.team_index[name] = len(self.teams)
+                self.teams.append(name)
+        return np.array([self.team_index[n] for n in names], dtype=np.int64)
+
+    def _grow(self, n_teams: int, n_rounds: int) -> None:
+        _, t, r = self.increments.shape
+        if n_teams > t or n_rounds > r:
+            grown = np.zeros((len(STATS), max(n_teams, t), max(n_rounds, r)), dtype=np.int32)
+            grown[:, :t, :r] = self.increments
+            self.increments = grown
+
+    def apply(self, matches: pd.DataFrame) -> None:
+        """Add (signed) played matches to the increments."""
+        unscheduled = matches['matchweek'].isna()
+        if unscheduled.any():
+            # No round to credit them to; guessing one would shift every later table
+            print(f"⚠️ {self.season}: skipping {int(unscheduled.sum())} match(es) without a matchweek")
+            matches = matches[~unscheduled]
+            if matches.empty:
+                return
+        rows = team_match_rows(matches)
+        sign = rows['sign'].to_numpy() if 'sign' in rows.columns else np.ones(len(rows), dtype=int)
+        teams = self._team_codes(rows['team'].tolist())
+        rounds = rows['matchweek'].to_numpy(dtype=np.int64) - 1
+        self._grow(len(self.teams), int(rounds.max()) + 1)
+
+        points = rows['points'].to_numpy()
+        values = np.stack([
+            np.ones(len(rows), dtype=np.int64),
+            points == 3,
+            points == 1,
+            points == 0,
+            rows['goals_for'].to_numpy(dtype=np.int64),
+            rows['goals_against'].to_numpy(dtype=np.int64),
+            points,
+        ]).astype(np.int64) * sign
+        for k in range(len(STATS)):
+            np.add.at(self.increments[k], (teams, rounds), values[k])
+
+    def standings(self) -> pd.DataFrame:
+        """Long table: one row per (matchweek, team) with cumulative stats and position."""
+        n_stats, n_teams, n_rounds = self.increments.shape
+        if n_teams == 0:
+            return pd.DataFrame(columns=['season', 'matchweek', 'team', 'position', 'goal_difference'] + STATS)
+
+        totals = self.increments.cumsum(axis=2)                    # (stats, teams, rounds)
+        flat = totals.transpose(0, 2, 1).reshape(n_stats, -1)       # (stats, rounds * teams)
+        stat = dict(zip(STATS, flat))
+        goal_diff = stat['goals_for'] - stat['goals_against']
+
+        round_ids = np.repeat(np.arange(n_rounds), n_teams)
+        team_ids = np.tile(np.arange(n_teams), n_rounds)
+        name_rank = np.argsort(np.argsort(np.array(self.teams, dtype=object)))[team_ids]
+
+        # lexsort: last key is primary -> round, then points, GD, GF (desc), then name
+        order = np.lexsort((name_rank, -stat['goals_for'], -goal_diff, -stat['points'], round_ids))
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.tile(np.arange(1, n_teams + 1), n_rounds)
+
+        df = pd.DataFrame({
+            'season': self.season,
+            'matchweek': round_ids + 1,
+            'team': np.array(self.teams, dtype=object)[team_ids],
+            'position': position,
+            'goal_difference': goal_diff,
+            **{name: stat[name] for name in STATS},
+        })
+        return df.sort_values(['matchweek', 'position']).reset_index(drop=True)
+
+
+class LeagueTableEngine:
+    """All seasons' tables, updated incrementally from the match log."""
+
+    def __init__(self, state_path=None):
+        self.state_path = Path(state_path) if state_path else None
+        self.cursor = 0
+        self.seasons = {}
+        if self.state_path and self.state_path.exists():
+            with np.load(self.state_path, allow_pickle=False) as state:
+                meta = json.loads(str(state['meta']))
+                self.cursor = meta['cursor']
+                for i, (season, teams) in enumerate(meta['seasons']):
+                    self.seasons[season] = SeasonTable(season, teams, state[f'season_{i}'])
+
+    def apply(self, matches: pd.DataFrame) -> set:
+        """Apply played matches (optionally with a `sign` column); returns seasons touched."""
+        touched = set()
+        for season, group in matches.groupby('season'):
+            table = self.seasons.setdefault(season, SeasonTable(season))
+            table.apply(group)
+            touched.add(season)
+        return touched
+
+    def update(self, match_log: MatchLog) -> set:
+        """Consume matchweeks appended since the last update."""
+        # Increments are additive, so pending matchweeks can be applied in one pass
+        batches = [batch for _, batch in match_log.changes(self.cursor)]
+        touched = self.apply(pd.concat(batches, ignore_index=True)) if batches else set()
+        self.cursor = match_log.version
+        if self.state_path:
+            self.save()
+        return touched
+
+    def save(self) -> None:
+        ordered = sorted(self.seasons.items())
+        meta = {'cursor': self.cursor, 'seasons': [[s, t.teams] for s, t in ordered]}
+        arrays = {f'season_{i}': t.increments for i, (_, t) in enumerate(ordered)}
+        np.savez(self.state_path, meta=np.array(json.dumps(meta)), **arrays)
+
+    def standings(self, seasons: list = None) -> pd.DataFrame:
+        selected = seasons or sorted(self.seasons)
+        frames = [self.seasons[s].standings() for s in selected if s in self.seasons]
+        if not frames:
+            return SeasonTable('').standings()
+        return pd.concat(frames, ignore_index=True)
+
+    def final_table(self, season: str) -> pd.DataFrame:
+        table = self.seasons[season].standings()
+        return table[table['matchweek'] == table['matchweek'].max()].reset_index(drop=True)
+
+
+def position_after_games(standings: pd.DataFrame, n_games: int) -> pd.DataFrame:
+    """
+    Each club's league position at the first matchweek where it had played `n_games`.
+
+    Returns:
+        pd.DataFrame: season, team, matchweek, position, points (clubs that never
+        reached n_games in a season are omitted).
+    """
+    reached = standings[standings['played'] >= n_games].sort_values('matchweek')
+    first = reached.drop_duplicates(['season', 'team'], keep='first')
+    first = first.sort_values(['season', 'position'])
+    return first[['season', 'team', 'matchweek', 'position', 'points']].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("LEAGUE TABLE RECONSTRUCTION")
+    print("=" * 80)
+
+    match_log = MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        print("⚠️ No match log found. Run notebooks/match_results.py first.")
+        raise SystemExit(1)
+
+    engine = LeagueTableEngine(STATE_PATH)
+    start = time.perf_counter()
+    touched = engine.update(match_log)
+    update_ms = (time.perf_counter() - start) * 1000
+    print(f"Updated {len(touched)} season(s) in {update_ms:.1f} ms (match log v{match_log.version})")
+
+    start = time.perf_counter()
+    standings = engine.standings()
+    print(f"Standings for {standings['season'].nunique()} seasons x every matchweek "
+          f"({len(standings):,} rows) in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    standings.to_csv(STANDINGS_PATH, index=False)
+    print(f"Saved: {STANDINGS_PATH}")
+
+    latest = max(engine.seasons)
+    print(f"\nCurrent table ({latest}):")
+    print(engine.final_table(latest)[['position', 'team', 'played', 'points', 'goal_difference']]
+          .head(20).to_string(index=False))
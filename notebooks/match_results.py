@@ -0,0 +1,515 @@
+"""
+Match-Level Results Ingestion
+=============================
+
+Ingests Premier League fixtures and scores (FBRef "Scores & Fixtures" pages or
+a local CSV) into an append-only columnar match log, and derives Man Utd
+season and manager stats from it instead of hard-coded literals.
+
+Match log layout (data/processed/match_log/):
+- `manifest.json`         team and season dictionaries + ordered segment list
+- `segment_NNNNNN.npz`    one columnar batch per ingest (int codes + floats)
+
+Segments are never rewritten. A fixture is keyed by (season, home, away); when
+it is re-ingested with a score (or a corrected score) the newer row wins.
+Unchanged rows are not re-appended, so refreshing a season after one matchweek
+appends only that matchweek's results.
+
+Downstream aggregates keep a cursor (number of segments consumed) and call
+`MatchLog.changes(cursor)`, which yields one matchweek at a time. Rows carry a
+`sign` column: +1 for a new result, -1 for a result it supersedes, so additive
+aggregates stay correct when FBRef corrects a score.
+
+Usage:
+    python notebooks/match_results.py --seasons 2024 2025
+    python notebooks/match_results.py --file fixtures.csv --season-label 2025-26
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_URL = "https://fbref.com"
+FIXTURES_URL_TEMPLATE = (BASE_URL + "/en/comps/9/{season_id}/schedule/"
+                         "{season_id}-Premier-League-Scores-and-Fixtures")
+MATCH_LOG_DIR = Path("data/processed/match_log")
+MAN_UTD = 'Manchester Utd'
+
+MATCH_COLUMNS = ['season', 'matchweek', 'date', 'home', 'away',
+                 'home_goals', 'away_goals', 'home_xg', 'away_xg']
+FIXTURE_KEY = ['season', 'home', 'away']
+
+# Man Utd managers by first day in charge; a tenure runs until the next start.
+# Interim spells are listed so their matches are not credited to anyone else.
+MANAGER_TENURES = [
+    {'manager': 'Ferguson', 'start': '1986-11-06'},
+    {'manager': 'Moyes', 'start': '2013-07-01'},
+    {'manager': 'Giggs', 'start': '2014-04-22'},
+    {'manager': 'Van Gaal', 'start': '2014-07-16'},
+    {'manager': 'Mourinho', 'start': '2016-05-27'},
+    {'manager': 'Solskjær', 'start': '2018-12-19'},
+    {'manager': 'Carrick', 'start': '2021-11-21'},
+    {'manager': 'Rangnick', 'start': '2021-12-03'},
+    {'manager': 'Ten Hag', 'start': '2022-05-23'},
+    {'manager': 'Van Nistelrooy', 'start': '2024-10-28'},
+    {'manager': 'Amorim', 'start': '2024-11-11'},
+]
+
+
+def season_label(season_start_year: int) -> str:
+    """2024 -> '2024-25' (the season format used across data/processed)."""
+    return f"{season_start_year}-{(season_start_year + 1) % 100:02d}"
+
+
+def manager_for_dates(dates) -> np.ndarray:
+    """Attribute each match date to the Man Utd manager in charge that day."""
+    starts = np.array([t['start'] for t in MANAGER_TENURES], dtype='datetime64[D]')
+    names = np.array([t['manager'] for t in MANAGER_TENURES], dtype=object)
+    positions = np.searchsorted(starts, np.asarray(dates, dtype='datetime64[D]'), side='right') - 1
+    return names[np.clip(positions, 0, None)]
+
+
+def season_managers(season_start_years) -> np.ndarray:
+    """
+    Manager of each season for season-level stats: the one in charge on
+    1 January, midway through the season (who took most of its matches).
+    """
+    years = np.asarray(season_start_years, dtype=int)
+    return manager_for_dates(np.array([f"{year + 1}-01-01" for year in years], dtype='datetime64[D]'))
+
+
+# ============================================================================
+# PARSING
+# ============================================================================
+
+def parse_fixtures_table(raw: pd.DataFrame, season: str) -> pd.DataFrame:
+    """
+    Normalise an FBRef Scores & Fixtures table into MATCH_COLUMNS.
+
+    Handles repeated header rows, spacer rows and unplayed fixtures (no score).
+
+    Args:
+        raw (pd.DataFrame): Table as returned by pd.read_html.
+        season (str): Season label, e.g. "2024-25".
+
+    Returns:
+        pd.DataFrame: One row per fixture.
+    """
+    df = raw.rename(columns={'Wk': 'matchweek', 'Date': 'date', 'Home': 'home', 'Away': 'away',
+                             'xG': 'home_xg', 'xG.1': 'away_xg', 'Score': 'score'})
+    df = df[df['home'].notna() & (df['home'] != 'Home')].copy()
+
+    goals = (df['score'].astype(str)
+             .str.replace('–', '-', regex=False)
+             .str.extract(r'^\s*(\d+)\s*-\s*(\d+)'))
+    df['home_goals'] = pd.to_numeric(goals[0], errors='coerce')
+    df['away_goals'] = pd.to_numeric(goals[1], errors='coerce')
+
+    for col in ['home_xg', 'away_xg']:
+        df[col] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else np.nan
+
+    df['season'] = season
+    df['matchweek'] = pd.to_numeric(df['matchweek'], errors='coerce')
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df = df.dropna(subset=['date'])
+    return df[MATCH_COLUMNS].reset_index(drop=True)
+
+
+def load_fixtures_file(path, season: str = None) -> pd.DataFrame:
+    """
+    Load fixtures from a local CSV, either already in MATCH_COLUMNS form or an
+    FBRef Scores & Fixtures export (Wk/Date/Home/Score/Away columns).
+    """
+    raw = pd.read_csv(path)
+    if set(MATCH_COLUMNS) <= set(raw.columns):
+        df = raw[MATCH_COLUMNS].copy()
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+    if season is None:
+        raise ValueError(f"{path} is an FBRef export; pass the season label it belongs to")
+    return parse_fixtures_table(raw, season)
+
+
+def fetch_fixtures(season_start_year: int, session=None) -> pd.DataFrame:
+    """
+    Download and parse one season's Premier League Scores & Fixtures page.
+
+    Args:
+        season_start_year (int): e.g. 2024 for 2024-25.
+        session: Optional requests.Session (shared headers/retries).
+
+    Returns:
+        pd.DataFrame: Fixtures in MATCH_COLUMNS form.
+    """
+    import requests
+    from bs4 import BeautifulSoup
+
+    season_id = f"{season_start_year}-{season_start_year + 1}"
+    url = FIXTURES_URL_TEMPLATE.format(season_id=season_id)
+    http = session or requests.Session()
+    response = http.get(url, timeout=15, headers=None if session else {"User-Agent": "Mozilla/5.0"})
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch fixtures. Status code: {response.status_code}")
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+    table = soup.find("table", id=lambda x: x and x.startswith("sched_"))
+    if table is None:
+        raise Exception(f"Couldn't find the fixtures table on {url}")
+
+    # pandas >= 2.1 reads literal HTML only from a file-like object
+    raw = pd.read_html(StringIO(str(table)))[0]
+    return parse_fixtures_table(raw, season_label(season_start_year))
+
+
+# ============================================================================
+# APPEND-ONLY COLUMNAR LOG
+# ============================================================================
+
+class MatchLog:
+    """Append-only columnar store of fixtures/results (latest row per fixture wins)."""
+
+    def __init__(self, root=MATCH_LOG_DIR):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'teams': [], 'seasons': [], 'segments': []}
+
+    def exists(self) -> bool:
+        return bool(self.manifest['segments'])
+
+    @property
+    def version(self) -> int:
+        """Number of segments; doubles as the cursor after consuming everything."""
+        return len(self.manifest['segments'])
+
+    @property
+    def teams(self) -> list:
+        return self.manifest['teams']
+
+    def _encode(self, values, dictionary: list) -> np.ndarray:
+        positions = {name: i for i, name in enumerate(dictionary)}
+        for value in values:
+            if value not in positions:
+                positions[value] = len(dictionary)
+                dictionary.append(value)
+        return np.array([positions[v] for v in values], dtype=np.int16)
+
+    def _load_segment(self, entry: dict) -> dict:
+        with np.load(self.root / entry['file']) as segment:
+            return {name: segment[name] for name in segment.files}
+
+    def read(self, start: int = 0, stop: int = None, seasons=None) -> pd.DataFrame:
+        """
+        Decode segments [start, stop) into one DataFrame, in append order.
+
+        Includes `segment` and `row` columns identifying each physical row.
+        With `seasons`, only rows of those seasons are returned, and segments
+        whose manifest entry lists none of them are not loaded at all.
+        """
+        entries = list(enumerate(self.manifest['segments'][start:stop], start))
+        codes = None
+        if seasons is not None:
+            codes = {i for i, label in enumerate(self.manifest['seasons']) if label in set(seasons)}
+            entries = [(i, e) for i, e in entries if 'seasons' not in e or codes & set(e['seasons'])]
+        if not entries:
+            empty = pd.DataFrame(columns=MATCH_COLUMNS + ['segment', 'row'])
+            empty['date'] = pd.to_datetime(empty['date'])
+            return empty
+
+        teams = np.array(self.manifest['teams'], dtype=object)
+        labels = np.array(self.manifest['seasons'], dtype=object)
+        frames = []
+        for position, entry in entries:
+            columns = self._load_segment(entry)
+            rows = np.arange(len(columns['season']))
+            if codes is not None:
+                keep = np.isin(columns['season'], list(codes))
+                columns = {name: values[keep] for name, values in columns.items()}
+                rows = rows[keep]
+            frame = pd.DataFrame({
+                'season': labels[columns['season']],
+                'matchweek': columns['matchweek'].astype(float),
+                'date': columns['date'].astype('datetime64[D]').astype('datetime64[ns]'),
+                'home': teams[columns['home']],
+                'away': teams[columns['away']],
+                'home_goals': columns['home_goals'].astype(float),
+                'away_goals': columns['away_goals'].astype(float),
+                'home_xg': columns['home_xg'].astype(float),
+                'away_xg': columns['away_xg'].astype(float),
+            })
+            frame['segment'] = position
+            frame['row'] = rows
+            frames.append(frame)
+        frame = pd.concat(frames, ignore_index=True)
+        frame['matchweek'] = frame['matchweek'].replace(-1, np.nan)
+        return frame
+
+    def current(self) -> pd.DataFrame:
+        """Latest version of every fixture (played or not)."""
+        df = self.read()
+        return df.drop_duplicates(FIXTURE_KEY, keep='last').reset_index(drop=True)
+
+    def played(self) -> pd.DataFrame:
+        """Latest version of every fixture that has a score, in date order."""
+        df = self.current()
+        df = df.dropna(subset=['home_goals', 'away_goals'])
+        return df.sort_values(['date', 'home']).reset_index(drop=True)
+
+    def append(self, fixtures: pd.DataFrame) -> int:
+        """
+        Append fixtures that are new or changed since their latest logged version.
+
+        Args:
+            fixtures (pd.DataFrame): Rows in MATCH_COLUMNS form.
+
+        Returns:
+            int: Number of rows appended (0 means nothing changed, no segment written).
+        """
+        fixtures = fixtures[MATCH_COLUMNS].copy()
+        fixtures['date'] = pd.to_datetime(fixtures['date']).dt.floor('D')
+        # Round-trip through the stored dtypes so unchanged rows compare equal
+        for col in ['home_goals', 'away_goals', 'home_xg', 'away_xg']:
+            fixtures[col] = fixtures[col].astype(np.float32).astype(float)
+
+        if self.exists():
+            latest = self.current()[MATCH_COLUMNS]
+            merged = fixtures.merge(latest, on=FIXTURE_KEY, how='left',
+                                    suffixes=('', '_old'), indicator=True)
+            changed = merged['_merge'] == 'left_only'
+            for col in set(MATCH_COLUMNS) - set(FIXTURE_KEY):
+                new, old = merged[col], merged[f'{col}_old']
+                changed |= ~((new == old) | (new.isna() & old.isna()))
+            fixtures = fixtures[changed.to_numpy()]
+
+        if fixtures.empty:
+            return 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        segment_name = f"segment_{self.version + 1:06d}.npz"
+        season_codes = self._encode(fixtures['season'].tolist(), self.manifest['seasons'])
+        np.savez(
+            self.root / segment_name,
+            season=season_codes,
+            matchweek=fixtures['matchweek'].fillna(-1).to_numpy(dtype=np.int16),
+            date=fixtures['date'].to_numpy().astype('datetime64[D]').astype(np.int32),
+            home=self._encode(fixtures['home'].tolist(), self.manifest['teams']),
+            away=self._encode(fixtures['away'].tolist(), self.manifest['teams']),
+            home_goals=fixtures['home_goals'].to_numpy(dtype=np.float32),
+            away_goals=fixtures['away_goals'].to_numpy(dtype=np.float32),
+            home_xg=fixtures['home_xg'].to_numpy(dtype=np.float32),
+            away_xg=fixtures['away_xg'].to_numpy(dtype=np.float32),
+        )
+        self.manifest['segments'].append({
+            'file': segment_name,
+            'rows': len(fixtures),
+            # Lets changes() skip segments of other seasons without loading them
+            'seasons': sorted(set(season_codes.tolist())),
+            'appended_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        })
+
+        tmp_path = self.manifest_path.with_name('manifest.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+        return len(fixtures)
+
+    def changes(self, cursor: int = 0):
+        """
+        Yield played-result changes since `cursor`, one (season, matchweek) at a time.
+
+        Each batch has MATCH_COLUMNS plus `sign`: +1 for a newly logged result,
+        -1 for an earlier result of the same fixture that it replaces.
+
+        Args:
+            cursor (int): Segments already consumed (0 = from the beginning).
+
+        Yields:
+            tuple: ((season, matchweek), batch DataFrame)
+        """
+        if cursor >= self.version:
+            return
+
+        # Only the new segments, plus earlier segments of the seasons they touch
+        new_rows = self.read(cursor)
+        history = self.read(0, cursor, seasons=set(new_rows['season']))
+
+        # Last version of each fixture logged before its first new row
+        history = history.drop_duplicates(FIXTURE_KEY, keep='last')
+        new_last = new_rows.drop_duplicates(FIXTURE_KEY, keep='last')
+
+        retracted = history.merge(new_last[FIXTURE_KEY], on=FIXTURE_KEY)
+        retracted = retracted.dropna(subset=['home_goals', 'away_goals']).assign(sign=-1)
+        added = new_last.dropna(subset=['home_goals', 'away_goals']).assign(sign=1)
+
+        batch = pd.concat([retracted, added], ignore_index=True)
+        batch = batch.sort_values(['season', 'matchweek', 'date', 'sign'])
+        for key, group in batch.groupby(['season', 'matchweek'], sort=False, dropna=False):
+            yield key, group[MATCH_COLUMNS + ['sign']].reset_index(drop=True)
+
+
+def team_match_rows(matches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Expand matches into one row per team per match (team perspective).
+
+    Columns: season, matchweek, date, team, opponent, venue, goals_for,
+    goals_against, xg_for, xg_against, points (+ sign if present).
+    """
+    extra = ['sign'] if 'sign' in matches.columns else []
+    base = matches[['season', 'matchweek', 'date'] + extra]
+    home = base.assign(
+        team=matches['home'], opponent=matches['away'], venue='Home',
+        goals_for=matches['home_goals'], goals_against=matches['away_goals'],
+        xg_for=matches['home_xg'], xg_against=matches['away_xg'])
+    away = base.assign(
+        team=matches['away'], opponent=matches['home'], venue='Away',
+        goals_for=matches['away_goals'], goals_against=matches['home_goals'],
+        xg_for=matches['away_xg'], xg_against=matches['home_xg'])
+    rows = pd.concat([home, away], ignore_index=True)
+    rows['points'] = np.select(
+        [rows['goals_for'] > rows['goals_against'], rows['goals_for'] == rows['goals_against']],
+        [3, 1], default=0)
+    return rows.sort_values(['date', 'team'], kind='stable').reset_index(drop=True)
+
+
+# ============================================================================
+# INCREMENTAL MAN UTD AGGREGATES
+# ============================================================================
+
+class ClubResultsAggregator:
+    """
+    Incremental W/D/L/points totals for one club per (manager, season).
+
+    Consumes `MatchLog.changes()` one matchweek at a time and remembers its
+    cursor, so a refresh only processes newly appended segments. Season and
+    manager summaries are sums over the (manager, season) cells, which is how
+    split seasons such as 2018-19 or 2021-22 get credited to each manager.
+    """
+
+    COUNTS = ['matches', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points']
+
+    def __init__(self, team: str = MAN_UTD, state_path=None):
+        self.team = team
+        self.state_path = Path(state_path) if state_path else None
+        self.cursor = 0
+        self.cells = {}
+        if self.state_path and self.state_path.exists():
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state['team'] == team:
+                self.cursor = state['cursor']
+                self.cells = state['cells']
+
+    def consume(self, batch: pd.DataFrame) -> None:
+        rows = team_match_rows(batch)
+        rows = rows[rows['team'] == self.team]
+        if rows.empty:
+            return
+        rows = rows.assign(
+            manager=manager_for_dates(rows['date'].to_numpy()),
+            matches=1,
+            wins=(rows['points'] == 3).astype(int),
+            draws=(rows['points'] == 1).astype(int),
+            losses=(rows['points'] == 0).astype(int),
+        )
+        signed = rows[self.COUNTS].mul(rows['sign'], axis=0)
+        for (manager, season), totals in signed.groupby([rows['manager'], rows['season']]).sum().iterrows():
+            cell = self.cells.setdefault(f"{manager}|{season}", {c: 0 for c in self.COUNTS})
+            for col, value in totals.items():
+                cell[col] += int(value)
+
+    def update(self, match_log: MatchLog) -> int:
+        """Consume all matchweeks appended since the last update; returns batches consumed."""
+        consumed = 0
+        for _, batch in match_log.changes(self.cursor):
+            self.consume(batch)
+            consumed += 1
+        self.cursor = match_log.version
+        if self.state_path:
+            with open(self.state_path, 'w') as f:
+                json.dump({'team': self.team, 'cursor': self.cursor, 'cells': self.cells}, f, indent=2)
+        return consumed
+
+    def cell_frame(self) -> pd.DataFrame:
+        """One row per (manager, season) with raw counts."""
+        if not self.cells:
+            return pd.DataFrame(columns=['manager', 'season'] + self.COUNTS)
+        df = pd.DataFrame.from_dict(self.cells, orient='index', columns=self.COUNTS)
+        keys = df.index.str.split('|', n=1)
+        df.insert(0, 'season', keys.str[1])
+        df.insert(0, 'manager', keys.str[0])
+        return df[df['matches'] > 0].reset_index(drop=True)
+
+    def _with_rates(self, df: pd.DataFrame) -> pd.DataFrame:
+        df['win_rate'] = (df['wins'] / df['matches'] * 100).round(2)
+        df['points_per_game'] = (df['points'] / df['matches']).round(3)
+        return df
+
+    def season_summary(self) -> pd.DataFrame:
+        df = self.cell_frame().groupby('season')[self.COUNTS].sum()
+        return self._with_rates(df).sort_index().reset_index()
+
+    def manager_summary(self) -> pd.DataFrame:
+        cells = self.cell_frame()
+        df = cells.groupby('manager')[self.COUNTS].sum()
+        df['seasons'] = cells.groupby('manager')['season'].nunique()
+        order = [t['manager'] for t in MANAGER_TENURES]
+        return self._with_rates(df).reindex([m for m in order if m in df.index])
+
+    def primary_managers(self) -> dict:
+        """Season -> manager in charge for the most matches that season."""
+        cells = self.cell_frame().sort_values('matches', ascending=False, kind='stable')
+        return cells.drop_duplicates('season').set_index('season')['manager'].to_dict()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest Premier League fixtures into the match log")
+    parser.add_argument('--seasons', type=int, nargs='*', default=[],
+                        help="Season start years to fetch from FBRef, e.g. 2024 2025")
+    parser.add_argument('--file', help="Local fixtures CSV instead of FBRef")
+    parser.add_argument('--season-label', help="Season label for an FBRef-format --file, e.g. 2025-26")
+    parser.add_argument('--log-dir', default=str(MATCH_LOG_DIR))
+    args = parser.parse_args()
+
+    match_log = MatchLog(args.log_dir)
+    print("=" * 80)
+    print("MATCH RESULTS INGESTION")
+    print("=" * 80)
+
+    if args.file:
+        fixtures = load_fixtures_file(args.file, args.season_label)
+        appended = match_log.append(fixtures)
+        print(f"📄 {args.file}: {len(fixtures)} fixtures, {appended} new/changed rows appended")
+
+    for i, season in enumerate(args.seasons):
+        if i:
+            time.sleep(random.uniform(4.0, 7.0))
+        print(f"🔍 Fetching fixtures for {season_label(season)}...")
+        try:
+            fixtures = fetch_fixtures(season)
+        except Exception as e:
+            print(f"⚠️ {season_label(season)}: {e}")
+            continue
+        appended = match_log.append(fixtures)
+        print(f"✅ {season_label(season)}: {len(fixtures)} fixtures, {appended} new/changed rows appended")
+
+    aggregator = ClubResultsAggregator(state_path=Path(args.log_dir) / "man_utd_results_state.json")
+    batches = aggregator.update(match_log)
+    print(f"\nMatch log version {match_log.version}: {len(match_log.played())} played matches, "
+          f"{batches} matchweek batches consumed")
+
+    if aggregator.cells:
+        print("\nMan Utd record by manager (from match data):")
+        print(aggregator.manager_summary().to_string())
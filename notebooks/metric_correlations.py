@@ -0,0 +1,320 @@
+"""
+All-Pairs Metric Correlation Explorer
+=====================================
+
+Instead of guessing which columns to plot, correlate every numeric column of
+every FBRef table with every other one, and rank the metrics most associated
+with league points and position.
+
+Inputs:
+- all 11 raw tables joined on (squad, season) via fbref_tables.load_tables
+  (falls back to all_teams_standard_stats.csv when data/raw is absent)
+- targets: points per game and final position from the league_table raw
+  table, or rebuilt from the match log (league_table.LeagueTableEngine)
+
+Matrices (pairwise-complete: each pair uses the team-seasons where both
+columns are present, since the advanced tables start in 2017-18):
+- pearson   metric vs metric, same season
+- spearman  Pearson on ranks, each pair ranked over the rows where both
+            columns are present (as DataFrame.corr(method='spearman'))
+- lag1      metric in season t vs metric in season t + 1 for the same club
+
+Each correlation block is a handful of matrix products over the masked data
+(counts, sums, sums of squares and cross-products), so column blocks are
+computed independently across processes. Spearman blocks group columns by
+missingness pattern: every pair across two groups shares the same rows, so
+each group is ranked once per partner group rather than once per pair. The matrices are cached in
+data/processed/metric_correlations.npz keyed by the dataset version (raw file
+signature + match log version); the ranking is written to
+data/processed/metric_correlations_ranked.csv.
+
+Usage:
+    python notebooks/metric_correlations.py --workers 8
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fbref_tables import RAW_DIR, KEY_COLUMNS, SQUAD_TABLES, load_tables, table_files
+from league_table import LeagueTableEngine
+from match_results import MatchLog, MATCH_LOG_DIR
+
+CACHE_PATH = Path("data/processed/metric_correlations.npz")
+RANKED_PATH = Path("data/processed/metric_correlations_ranked.csv")
+FALLBACK_PATH = Path("data/processed/all_teams_standard_stats.csv")
+
+TARGETS = ['points_per_game', 'position']
+MATRICES = ['pearson', 'spearman', 'lag1']
+# Columns per block; each task correlates one block of columns with another
+BLOCK_SIZE = 64
+# Pairs observed together in fewer team-seasons than this are left as NaN
+MIN_PAIRS = 20
+# Bumped when a matrix definition changes, so older caches are recomputed
+MATRIX_VERSION = 2
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def dataset_version(raw_dir=RAW_DIR, match_log: MatchLog = None) -> str:
+    """Signature of every input, so the cache is rebuilt when anything changes."""
+    files = [f for table in SQUAD_TABLES for f in table_files(table, raw_dir)] or [str(FALLBACK_PATH)]
+    stats = [(f, Path(f).stat().st_size, Path(f).stat().st_mtime_ns) for f in files]
+    log_version = match_log.version if match_log is not None and match_log.exists() else None
+    return hashlib.sha1(json.dumps([stats, log_version, MATRIX_VERSION]).encode()).hexdigest()[:16]
+
+
+def match_log_targets(match_log: MatchLog) -> pd.DataFrame:
+    """Points per game and position from the latest standings of each season."""
+    engine = LeagueTableEngine()
+    engine.update(match_log)
+    frames = [engine.final_table(season) for season in sorted(engine.seasons)]
+    table = pd.concat(frames, ignore_index=True)
+    return pd.DataFrame({
+        'squad': table['team'],
+        'season': table['season'],
+        'points_per_game': table['points'] / table['played'],
+        'position': table['position'],
+    })
+
+
+def correlation_frame(raw_dir=RAW_DIR, match_log: MatchLog = None) -> pd.DataFrame:
+    """One row per team-season: every numeric column plus the targets (if available)."""
+    wide = load_tables(SQUAD_TABLES, raw_dir)
+    if wide.empty:
+        wide = pd.read_csv(FALLBACK_PATH)
+    wide = wide.drop(columns=['season_start_year'])
+
+    if {'league_table__pts', 'league_table__mp', 'league_table__rk'} <= set(wide.columns):
+        wide['points_per_game'] = wide['league_table__pts'] / wide['league_table__mp']
+        wide['position'] = wide['league_table__rk']
+    elif match_log is not None and match_log.exists():
+        wide = wide.merge(match_log_targets(match_log), on=KEY_COLUMNS, how='left')
+
+    numeric = wide.select_dtypes(include=[np.number])
+    numeric = numeric.loc[:, (numeric.notna().sum() >= MIN_PAIRS) & (numeric.std() > 0)]
+    return pd.concat([wide[KEY_COLUMNS], numeric], axis=1).sort_values(KEY_COLUMNS).reset_index(drop=True)
+
+
+def next_season_rows(frame: pd.DataFrame, columns: list) -> np.ndarray:
+    """Values of `columns` for the same club one season later (NaN if not in the data)."""
+    seasons = sorted(frame['season'].unique())
+    position = {season: i for i, season in enumerate(seasons)}
+    index = pd.MultiIndex.from_arrays([frame['squad'], frame['season'].map(position)])
+    lookup = pd.DataFrame(frame[columns].to_numpy(), index=index, columns=columns)
+    following = pd.MultiIndex.from_arrays([frame['squad'], frame['season'].map(position) + 1])
+    return lookup.reindex(following).to_numpy(dtype=np.float64)
+
+
+def column_ranks(X: np.ndarray) -> np.ndarray:
+    """Average ranks per column (X without missing values)."""
+    return pd.DataFrame(X).rank(method='average').to_numpy()
+
+
+def missing_pattern_blocks(X: np.ndarray) -> list:
+    """Column index arrays sharing one missingness pattern, split to BLOCK_SIZE."""
+    groups = {}
+    for col in range(X.shape[1]):
+        groups.setdefault(np.isnan(X[:, col]).tobytes(), []).append(col)
+    return [np.array(cols[start:start + BLOCK_SIZE])
+            for cols in groups.values() for start in range(0, len(cols), BLOCK_SIZE)]
+
+
+# ============================================================================
+# BLOCKWISE CORRELATION
+# ============================================================================
+
+def pairwise_correlation(X: np.ndarray, Y: np.ndarray) -> tuple:
+    """
+    Pairwise-complete Pearson correlation of every column of X with every column of Y.
+
+    Returns:
+        tuple: (correlations (p, q), pair counts (p, q)); NaN below MIN_PAIRS.
+    """
+    mx, my = ~np.isnan(X), ~np.isnan(Y)
+    x0, y0 = np.where(mx, X, 0.0), np.where(my, Y, 0.0)
+    fx, fy = mx.astype(np.float64), my.astype(np.float64)
+
+    n = fx.T @ fy
+    sx, sy = x0.T @ fy, fx.T @ y0
+    sxx, syy = (x0 * x0).T @ fy, fx.T @ (y0 * y0)
+    sxy = x0.T @ y0
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < MIN_PAIRS) | ~(var > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n.astype(np.int64)
+
+
+def pairwise_spearman(X: np.ndarray, Y: np.ndarray) -> tuple:
+    """
+    Spearman correlation of every column of X with every column of Y.
+
+    The columns of X share one missingness pattern, as do those of Y, so the
+    pairwise-complete rows are the same for every pair and both sides are
+    ranked once over them.
+
+    Returns:
+        tuple: (correlations (p, q), pair counts (p, q)); NaN below MIN_PAIRS.
+    """
+    rows = ~np.isnan(X[:, 0]) & ~np.isnan(Y[:, 0])
+    return pairwise_correlation(column_ranks(X[rows]), column_ranks(Y[rows]))
+
+
+_BLOCK_DATA = {}
+
+
+def _init_worker(arrays: dict) -> None:
+    _BLOCK_DATA.update(arrays)
+
+
+def _block_task(task: tuple) -> tuple:
+    name, left, right, i, j = task
+    correlate = pairwise_spearman if name == 'spearman' else pairwise_correlation
+    corr, n = correlate(_BLOCK_DATA[left][:, i], _BLOCK_DATA[right][:, j])
+    return name, i, j, corr, n
+
+
+def correlation_matrices(frame: pd.DataFrame, workers: int = None) -> dict:
+    """pearson, spearman and lag1 matrices (plus pair counts) over all numeric columns."""
+    columns = [c for c in frame.columns if c not in KEY_COLUMNS]
+    X = frame[columns].to_numpy(dtype=np.float64)
+    arrays = {'X': X, 'L': next_season_rows(frame, columns)}
+    specs = {'pearson': ('X', 'X'), 'spearman': ('X', 'X'), 'lag1': ('X', 'L')}
+
+    m = len(columns)
+    blocks = [np.arange(start, min(start + BLOCK_SIZE, m)) for start in range(0, m, BLOCK_SIZE)]
+    tasks = []
+    for name, (left, right) in specs.items():
+        name_blocks = missing_pattern_blocks(X) if name == 'spearman' else blocks
+        for a, i in enumerate(name_blocks):
+            for b, j in enumerate(name_blocks):
+                # Same-season matrices are symmetric: upper-triangle blocks only
+                if left == right and b < a:
+                    continue
+                tasks.append((name, left, right, i, j))
+
+    result = {name: np.full((m, m), np.nan) for name in specs}
+    result.update({f'{name}_n': np.zeros((m, m), dtype=np.int64) for name in specs})
+    if workers == 1:
+        _init_worker(arrays)
+        outputs = [_block_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(arrays,)) as pool:
+            outputs = list(pool.map(_block_task, tasks))
+    for name, i, j, corr, n in outputs:
+        result[name][np.ix_(i, j)] = corr
+        result[f'{name}_n'][np.ix_(i, j)] = n
+        if specs[name][0] == specs[name][1]:
+            result[name][np.ix_(j, i)] = corr.T
+            result[f'{name}_n'][np.ix_(j, i)] = n.T
+    result['columns'] = columns
+    return result
+
+
+def cached_correlations(raw_dir=RAW_DIR, match_log: MatchLog = None, cache_path=CACHE_PATH,
+                        workers: int = None) -> tuple:
+    """
+    Correlation matrices for the current dataset version, computed only when it changes.
+
+    Returns:
+        tuple: (matrices dict, recomputed flag).
+    """
+    cache_path = Path(cache_path)
+    version = dataset_version(raw_dir, match_log)
+    if cache_path.exists():
+        with np.load(cache_path, allow_pickle=False) as cached:
+            meta = json.loads(str(cached['meta']))
+            if meta['version'] == version:
+                result = {name: cached[name] for name in cached.files if name != 'meta'}
+                result['columns'] = meta['columns']
+                return result, False
+
+    result = correlation_matrices(correlation_frame(raw_dir, match_log), workers)
+    meta = {'version': version, 'columns': result['columns']}
+    tmp_path = cache_path.with_name(cache_path.stem + '.tmp.npz')
+    np.savez(tmp_path, meta=np.array(json.dumps(meta)),
+             **{name: values for name, values in result.items() if name != 'columns'})
+    tmp_path.replace(cache_path)
+    return result, True
+
+
+def rank_against_targets(result: dict, targets: list = TARGETS) -> pd.DataFrame:
+    """
+    Metrics ranked by |Spearman| with each target.
+
+    League-table columns (points, wins, goal difference, ...) are excluded: they
+    define the targets rather than explain them. `lag1` is the correlation of
+    the metric with the target one season later.
+    """
+    columns = result['columns']
+    index = {c: i for i, c in enumerate(columns)}
+    candidates = [c for c in columns if c not in TARGETS and not c.startswith('league_table__')]
+    rows = []
+    for target in targets:
+        if target not in index:
+            continue
+        t = index[target]
+        for metric in candidates:
+            m = index[metric]
+            rows.append({
+                'target': target,
+                'metric': metric,
+                'pearson': result['pearson'][m, t],
+                'spearman': result['spearman'][m, t],
+                'lag1': result['lag1'][m, t],
+                'n': result['pearson_n'][m, t],
+            })
+    ranked = pd.DataFrame(rows, columns=['target', 'metric', 'pearson', 'spearman', 'lag1', 'n'])
+    ranked = ranked.dropna(subset=['spearman'])
+    ranked['abs_spearman'] = ranked['spearman'].abs()
+    ranked = ranked.sort_values(['target', 'abs_spearman'], ascending=[True, False])
+    ranked['rank'] = ranked.groupby('target').cumcount() + 1
+    return ranked.drop(columns='abs_spearman').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correlate every metric with every other and rank them against points")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("ALL-PAIRS METRIC CORRELATIONS")
+    print("=" * 80)
+
+    match_log = MatchLog(MATCH_LOG_DIR)
+    start = time.perf_counter()
+    result, recomputed = cached_correlations(match_log=match_log, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    m = len(result['columns'])
+    print(f"{m} columns -> {m * m:,} pairs x {len(MATRICES)} matrices "
+          f"({'computed' if recomputed else 'cached'}, {elapsed:.2f}s)")
+
+    ranked = rank_against_targets(result)
+    if ranked.empty:
+        print("⚠️ No points/position target (need the raw league_table or the match log).")
+        raise SystemExit(1)
+    ranked.to_csv(RANKED_PATH, index=False)
+    print(f"Saved: {CACHE_PATH}, {RANKED_PATH}")
+
+    for target in TARGETS:
+        top = ranked[ranked['target'] == target].head(15)
+        if top.empty:
+            continue
+        print("\n" + "=" * 80)
+        print(f"METRICS MOST ASSOCIATED WITH {target.upper().replace('_', ' ')}")
+        print("=" * 80)
+        print(top[['rank', 'metric', 'spearman', 'pearson', 'lag1', 'n']].round(3).to_string(index=False))
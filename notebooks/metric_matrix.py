@@ -0,0 +1,251 @@
+"""
+Memory-Mapped Team-Season-Metric Matrix
+=======================================
+
+Build step that turns all_teams_standard_stats.csv into a dense float64 array
+of shape (teams, seasons, metrics) saved as a .npy file, plus a small JSON
+file with the index metadata (team, season and metric names).
+
+Worker processes attach with `MetricMatrix.attach()`, which memory-maps the
+.npy file read-only: no CSV parsing, no copy. All workers share the same
+page-cache pages, so resident memory stays flat as workers are added.
+
+Usage:
+    python notebooks/metric_matrix.py            # build + attach benchmark
+    python notebooks/metric_matrix.py --workers 8
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = Path("data/processed/all_teams_standard_stats.csv")
+MATRIX_PATH = Path("data/processed/metric_matrix.npy")
+
+# Season totals that analyses divide by matches played, so the in-progress
+# season is comparable; playing-time columns only measure season length.
+COUNT_PREFIXES = ('performance_', 'expected_', 'progression_')
+SEASON_LENGTH_PREFIXES = ('playing_time_',)
+
+
+def _meta_path(matrix_path: Path) -> Path:
+    return matrix_path.with_suffix('.json')
+
+
+def build_matrix(data_path=DATA_PATH, matrix_path=MATRIX_PATH) -> Path:
+    """
+    Write the (team, season, metric) matrix and its index metadata.
+
+    Missing team-seasons (e.g. relegated clubs) are NaN.
+
+    Args:
+        data_path: Source CSV (all-teams standard stats).
+        matrix_path: Destination .npy file; metadata goes next to it as .json.
+
+    Returns:
+        Path: The matrix file.
+    """
+    data_path = Path(data_path)
+    matrix_path = Path(matrix_path)
+
+    df = pd.read_csv(data_path)
+    if 'goals_per_game' not in df.columns:
+        df['goals_per_game'] = df['performance_gls'] / df['playing_time_mp']
+
+    metrics = [
+        col for col in df.select_dtypes(include=[np.number]).columns
+        if col != 'season_start_year'
+    ]
+    teams = sorted(df['squad'].unique())
+    seasons = sorted(df['season'].unique())
+
+    team_idx = pd.Index(teams).get_indexer(df['squad'])
+    season_idx = pd.Index(seasons).get_indexer(df['season'])
+
+    tmp_path = matrix_path.with_name(matrix_path.name + '.tmp')
+    matrix = np.lib.format.open_memmap(
+        tmp_path, mode='w+', dtype=np.float64,
+        shape=(len(teams), len(seasons), len(metrics)))
+    matrix[:] = np.nan
+    matrix[team_idx, season_idx, :] = df[metrics].to_numpy(dtype=np.float64)
+    matrix.flush()
+    del matrix
+
+    # Matrix first, metadata last: the metadata names the matrix build it
+    # describes (its mtime survives the rename), so readers can detect a pair
+    # caught between the two swaps
+    build_mtime_ns = tmp_path.stat().st_mtime_ns
+    tmp_path.replace(matrix_path)
+
+    meta = {
+        'teams': teams,
+        'seasons': seasons,
+        'metrics': metrics,
+        'shape': [len(teams), len(seasons), len(metrics)],
+        'dtype': 'float64',
+        'source': str(data_path),
+        'source_sha1': hashlib.sha1(data_path.read_bytes()).hexdigest(),
+        'matrix_mtime_ns': build_mtime_ns,
+    }
+    meta_path = _meta_path(matrix_path)
+    tmp_meta_path = meta_path.with_name(meta_path.name + '.tmp')
+    with open(tmp_meta_path, 'w') as f:
+        json.dump(meta, f)
+    tmp_meta_path.replace(meta_path)
+
+    return matrix_path
+
+
+def _map_npy(path: Path) -> tuple:
+    """
+    Read-only memory map of a .npy file plus the mtime of the file actually
+    mapped (fstat on the same handle, so a concurrent swap cannot pair the
+    mapped bytes with another build's mtime).
+    """
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        values = np.memmap(f, dtype=dtype, mode='r', shape=shape, offset=f.tell(),
+                           order='F' if fortran_order else 'C')
+    return values, mtime_ns
+
+
+class MetricMatrix:
+    """Read-only view over a built metric matrix."""
+
+    def __init__(self, values: np.ndarray, meta: dict):
+        self.values = values
+        self.meta = meta
+        self.teams = meta['teams']
+        self.seasons = meta['seasons']
+        self.metrics = meta['metrics']
+        self.team_index = {name: i for i, name in enumerate(self.teams)}
+        self.season_index = {name: i for i, name in enumerate(self.seasons)}
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+
+    @classmethod
+    def attach(cls, matrix_path=MATRIX_PATH) -> 'MetricMatrix':
+        """Memory-map a built matrix (no parsing, no copy)."""
+        matrix_path = Path(matrix_path)
+        with open(_meta_path(matrix_path)) as f:
+            meta = json.load(f)
+        values, mtime_ns = _map_npy(matrix_path)
+        if meta.get('matrix_mtime_ns', mtime_ns) != mtime_ns:
+            raise ValueError(f"{matrix_path} is mid-rebuild (metadata describes another build); attach again")
+        if list(values.shape) != meta['shape']:
+            raise ValueError(f"Matrix shape {values.shape} does not match metadata {meta['shape']}")
+        return cls(values, meta)
+
+    def get(self, team: str, season: str, metric: str) -> float:
+        return float(self.values[self.team_index[team], self.season_index[season], self.metric_index[metric]])
+
+    def series(self, team: str, metric: str) -> np.ndarray:
+        """One club's values for a metric across all seasons (view, NaN where absent)."""
+        return self.values[self.team_index[team], :, self.metric_index[metric]]
+
+    def cross_section(self, season: str, metric: str) -> np.ndarray:
+        """Every club's value for a metric in one season (view, NaN where absent)."""
+        return self.values[:, self.season_index[season], self.metric_index[metric]]
+
+    def analysis_metrics(self) -> list:
+        """Metrics worth modelling over time (everything except season-length columns)."""
+        return [m for m in self.metrics if not m.startswith(SEASON_LENGTH_PREFIXES)]
+
+    def per_game(self, metrics: list) -> np.ndarray:
+        """(teams, seasons, len(metrics)) copy with count metrics divided by matches played."""
+        cube = np.array(self.values[:, :, [self.metric_index[m] for m in metrics]])
+        counts = [i for i, m in enumerate(metrics) if m.startswith(COUNT_PREFIXES)]
+        cube[:, :, counts] /= self.values[:, :, [self.metric_index['playing_time_mp']]]
+        return cube
+
+
+def load_matrix(data_path=DATA_PATH, matrix_path=MATRIX_PATH) -> MetricMatrix:
+    """
+    Attach the matrix, rebuilding it first if missing, built from an older CSV
+    or left without matching metadata by an interrupted build.
+    """
+    data_path, matrix_path = Path(data_path), Path(matrix_path)
+    if matrix_path.exists():
+        try:
+            matrix = MetricMatrix.attach(matrix_path)
+        except (FileNotFoundError, ValueError):
+            matrix = None
+        if matrix is not None and matrix.meta.get('source_sha1') == hashlib.sha1(data_path.read_bytes()).hexdigest():
+            return matrix
+    return MetricMatrix.attach(build_matrix(data_path, matrix_path))
+
+
+def _rss_kb() -> dict:
+    """Resident memory split into file-backed and anonymous pages (Linux only)."""
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS', 'RssAnon', 'RssFile')):
+                key, value = line.split(':')
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def _worker(matrix_path: str, results) -> None:
+    before = _rss_kb()
+    start = time.perf_counter()
+    matrix = MetricMatrix.attach(matrix_path)
+    total = float(matrix.values.sum())  # touch every page without a temporary copy
+    elapsed = time.perf_counter() - start
+    after = _rss_kb()
+    results.put({
+        'attach_ms': elapsed * 1000,
+        'anon_delta_kb': after.get('RssAnon', 0) - before.get('RssAnon', 0),
+        'checksum': total,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and benchmark the memory-mapped metric matrix")
+    parser.add_argument('--data', default=str(DATA_PATH))
+    parser.add_argument('--out', default=str(MATRIX_PATH))
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("METRIC MATRIX BUILD")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    path = build_matrix(args.data, args.out)
+    matrix = MetricMatrix.attach(path)
+    print(f"Built {path} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"Shape: {matrix.values.shape} (teams, seasons, metrics), "
+          f"{path.stat().st_size / 1024:.0f} KB")
+
+    start = time.perf_counter()
+    pd.read_csv(args.data)
+    print(f"\nBaseline pd.read_csv: {(time.perf_counter() - start) * 1000:.1f} ms per worker")
+
+    ctx = mp.get_context('spawn')
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_worker, args=(str(path), results)) for _ in range(args.workers)]
+    for w in workers:
+        w.start()
+    stats = [results.get() for _ in workers]
+    for w in workers:
+        w.join()
+
+    attach_ms = [s['attach_ms'] for s in stats]
+    print(f"Attach across {args.workers} workers: median {np.median(attach_ms):.2f} ms, "
+          f"max {max(attach_ms):.2f} ms")
+    print(f"Private (anonymous) memory added per worker: "
+          f"{max(s['anon_delta_kb'] for s in stats)} KB max")
@@ -0,0 +1,207 @@
+"""
+All-Clubs Pairwise Comparison Engine
+====================================
+
+05 and 07 compare five to seven hard-coded rivals with per-team loops. This
+module computes every club against every other club, for every metric, in a
+few broadcast operations over the metric matrix (metric_matrix.py), so a rival
+set is a slice instead of a new script.
+
+Arrays (float32, NaN where a club has no seasons in a period):
+- means     (teams, periods, metrics)       average per-season value per period
+- change    (teams, periods - 1, metrics)   era-over-era change, next - previous
+- pct_change(teams, periods - 1, metrics)   the same as a percentage
+- gap       (teams, teams, metrics) per period: means[i] - means[j]
+- change_gap(teams, teams, metrics): change[i] - change[j] between the first
+  and last period ("who declined more than whom")
+
+Counts are per game (MetricMatrix.per_game), so the in-progress season is
+comparable. Periods default to the three eras of 03 / analytics_api;
+FERGUSON_SPLIT is the two-period split used by 05.
+
+The arrays and their index maps are cached in
+data/processed/pairwise_comparison.npz and rebuilt when the stats CSV changes.
+
+Usage:
+    python notebooks/pairwise_comparison.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics_api import ERAS, DEFAULT_RIVALS
+from metric_matrix import DATA_PATH, MATRIX_PATH, load_matrix
+
+CACHE_PATH = Path("data/processed/pairwise_comparison.npz")
+
+# label -> (first season start year, last season start year), inclusive
+ERA_PERIODS = {ERAS[0]: (2000, 2013), ERAS[1]: (2014, 2020), ERAS[2]: (2021, 2100)}
+# 05_rival_comparison.py: Ferguson era vs everything after
+FERGUSON_SPLIT = {'Ferguson Era (2000-2013)': (2000, 2013), 'Post-Ferguson Era (2014-2025)': (2014, 2100)}
+
+
+class PairwiseComparison:
+    """Era means, era-over-era changes and club-vs-club gaps for every metric."""
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.arrays = arrays
+        self.meta = meta
+        self.teams = meta['teams']
+        self.metrics = meta['metrics']
+        self.periods = meta['periods']
+        self.team_index = {name: i for i, name in enumerate(self.teams)}
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+        self.period_index = {name: i for i, name in enumerate(self.periods)}
+
+    @classmethod
+    def build(cls, matrix, periods: dict = None) -> 'PairwiseComparison':
+        """Compute every array from a MetricMatrix."""
+        periods = periods or ERA_PERIODS
+        metrics = matrix.analysis_metrics()
+        cube = matrix.per_game(metrics)  # (teams, seasons, metrics)
+        years = np.array([int(s[:4]) for s in matrix.seasons])
+
+        # (periods, seasons) membership; NaN-aware mean over the season axis
+        member = np.array([(years >= lo) & (years <= hi) for lo, hi in periods.values()], dtype=np.float64)
+        present = ~np.isnan(cube)
+        totals = np.einsum('ps,tsm->tpm', member, np.where(present, cube, 0.0))
+        counts = np.einsum('ps,tsm->tpm', member, present.astype(np.float64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = totals / counts
+            change = means[:, 1:] - means[:, :-1]
+            pct_change = (means[:, 1:] / means[:, :-1] - 1) * 100
+            overall = means[:, -1] - means[:, 0]
+
+        arrays = {
+            'means': means.astype(np.float32),
+            'seasons': counts[:, :, 0].astype(np.int16),
+            'change': change.astype(np.float32),
+            'pct_change': pct_change.astype(np.float32),
+            # Club i minus club j, broadcast over (teams, 1, metrics) - (1, teams, metrics)
+            'change_gap': (overall[:, None, :] - overall[None, :, :]).astype(np.float32),
+        }
+        for p, label in enumerate(periods):
+            arrays[f'gap_{p}'] = (means[:, None, p, :] - means[None, :, p, :]).astype(np.float32)
+
+        meta = {
+            'teams': matrix.teams,
+            'metrics': metrics,
+            'periods': list(periods),
+            'period_years': list(periods.values()),
+            'source_sha1': matrix.meta.get('source_sha1'),
+        }
+        return cls(arrays, meta)
+
+    def save(self, path=CACHE_PATH) -> None:
+        path = Path(path)
+        tmp_path = path.with_name(path.stem + '.tmp.npz')
+        np.savez_compressed(tmp_path, meta=np.array(json.dumps(self.meta)), **self.arrays)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path=CACHE_PATH) -> 'PairwiseComparison':
+        with np.load(path, allow_pickle=False) as saved:
+            meta = json.loads(str(saved['meta']))
+            arrays = {name: saved[name] for name in saved.files if name != 'meta'}
+        return cls(arrays, meta)
+
+    # ------------------------------------------------------------------
+    # Slices
+    # ------------------------------------------------------------------
+
+    def _indices(self, index: dict, names: list, kind: str) -> list:
+        unknown = [n for n in names if n not in index]
+        if unknown:
+            raise KeyError(f"Unknown {kind}(s): {', '.join(unknown)}")
+        return [index[n] for n in names]
+
+    def gap(self, period: str = None, squads: list = None, metrics: list = None,
+            against: list = None) -> np.ndarray:
+        """(squads, against, metrics) sub-array of club-vs-club gaps in one period (default: latest)."""
+        p = self.period_index[period] if period else len(self.periods) - 1
+        return self._slice(self.arrays[f'gap_{p}'], squads, against, metrics)
+
+    def change_gap(self, squads: list = None, metrics: list = None, against: list = None) -> np.ndarray:
+        """(squads, against, metrics) difference in first-to-last-period change."""
+        return self._slice(self.arrays['change_gap'], squads, against, metrics)
+
+    def _slice(self, cube: np.ndarray, squads, against, metrics) -> np.ndarray:
+        against = against or squads
+        rows = self._indices(self.team_index, squads, 'squad') if squads else range(cube.shape[0])
+        cols = self._indices(self.team_index, against, 'squad') if against else range(cube.shape[1])
+        mets = self._indices(self.metric_index, metrics, 'metric') if metrics else range(cube.shape[2])
+        return cube[np.ix_(rows, cols, mets)]
+
+    def gap_frame(self, metric: str, squads: list, period: str = None) -> pd.DataFrame:
+        """Club x club gap table for one metric (row minus column)."""
+        values = self.gap(period, squads, [metric])[:, :, 0]
+        return pd.DataFrame(values, index=squads, columns=squads)
+
+    def era_means(self, metric: str, squads: list) -> pd.DataFrame:
+        rows = self._indices(self.team_index, squads, 'squad')
+        m = self.metric_index[metric]
+        return pd.DataFrame(self.arrays['means'][rows, :, m], index=squads, columns=self.periods)
+
+    def era_change(self, metric: str, squads: list, pct: bool = True, step: int = -1) -> pd.Series:
+        """
+        Change between consecutive periods for each squad.
+
+        Args:
+            step (int): Which transition (0 = first -> second, -1 = the last one).
+        """
+        rows = self._indices(self.team_index, squads, 'squad')
+        values = self.arrays['pct_change' if pct else 'change'][rows, step, self.metric_index[metric]]
+        return pd.Series(values.astype(np.float64), index=squads, name=metric)
+
+
+def load_comparison(periods: dict = None, data_path=DATA_PATH, matrix_path=MATRIX_PATH,
+                    cache_path=CACHE_PATH) -> PairwiseComparison:
+    """Cached comparison for `periods`, rebuilt when the stats CSV or the periods change."""
+    periods = periods or ERA_PERIODS
+    matrix = load_matrix(data_path, matrix_path)
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        cached = PairwiseComparison.load(cache_path)
+        if (cached.meta['source_sha1'] == matrix.meta.get('source_sha1')
+                and cached.periods == list(periods)
+                and [tuple(y) for y in cached.meta['period_years']] == list(periods.values())):
+            return cached
+    comparison = PairwiseComparison.build(matrix, periods)
+    comparison.save(cache_path)
+    return comparison
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ALL-CLUBS PAIRWISE COMPARISON")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    comparison = load_comparison()
+    elapsed = (time.perf_counter() - start) * 1000
+    n_teams, n_metrics = len(comparison.teams), len(comparison.metrics)
+    size_kb = sum(a.nbytes for a in comparison.arrays.values()) / 1024
+    print(f"{n_teams} clubs x {n_teams} clubs x {n_metrics} metrics x {len(comparison.periods)} periods "
+          f"({size_kb:.0f} KB) in {elapsed:.1f} ms")
+    print(f"Saved: {CACHE_PATH}")
+
+    rivals = [r for r in DEFAULT_RIVALS if r in comparison.team_index]
+    print("\nGoals per game by era:")
+    print(comparison.era_means('goals_per_game', rivals).round(2).to_string())
+
+    print(f"\nGoals per game gap, {comparison.periods[-1]} (row minus column):")
+    print(comparison.gap_frame('goals_per_game', rivals).round(2).to_string())
+
+    print("\n" + "=" * 80)
+    print(f"CHANGE IN GOALS PER GAME, {comparison.periods[0]} -> {comparison.periods[-1]}")
+    print("=" * 80)
+    change_gap = comparison.change_gap(['Manchester Utd'], ['goals_per_game'], against=rivals)[0, :, 0]
+    for team, value in zip(rivals[1:], change_gap[1:]):
+        print(f"Man Utd vs {team:15s}: {value:+.3f} goals per game")
@@ -0,0 +1,32 @@
+"""
+Shared Plot Colours
+===================
+
+Manager colours for 04, 08 and the dashboard, keyed by the manager names in
+match_results.MANAGER_TENURES, and 07's club colour scheme keyed by FBRef
+squad name (used by the dashboard; 07 itself keys it by display name).
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+MANAGER_COLORS = {
+    'Ferguson': '#228B22',
+    'Moyes': '#8B4513',
+    'Van Gaal': '#FF8C00',
+    'Mourinho': '#4169E1',
+    'Solskjær': '#DC143C',
+    'Rangnick': '#DC143C',
+    'Ten Hag': '#9932CC',
+    'Amorim': '#FFD700',
+}
+
+TEAM_COLORS = {
+    'Manchester Utd': '#DA291C',
+    'Manchester City': '#6CABDD',
+    'Liverpool': '#00B2A9',
+    'Arsenal': '#FF8C00',
+    'Chelsea': '#034694',
+    'Tottenham': '#132257',
+    'Leicester City': '#0053A0',
+}
@@ -0,0 +1,354 @@
+"""
+Adaptive Request Rate Control
+=============================
+
+The scrapers used fixed random sleeps (4-7s per page, 5-10s per season,
+60-90s after an error) plus urllib3's Retry(backoff_factor=10): too slow when
+FBRef is healthy, not slow enough when it is throttling. This module spaces
+requests from the server's own signals instead.
+
+- RateLimiter: fixed spacing (+ jitter) shared by every worker thread; honours
+  Retry-After and backs off after errors.
+- AdaptiveRateLimiter: the same, with the spacing adjusted by AIMD on the
+  request rate:
+    * additive increase: every healthy response adds `increase` requests/s
+    * multiplicative decrease: 429 / 5xx / connection errors multiply the
+      rate by DECREASE_FACTOR; responses much slower than the baseline
+      latency by SLOW_FACTOR (at most once per hold period, so one burst of
+      throttling is one decrease)
+  always within [min_interval, max_interval] (the politeness bounds). The
+  learned spacing and latency baseline persist in
+  data/scrape_rate_state.json, so the next run starts where this one ended.
+- polite_get: one GET through a limiter, retrying 429 / 5xx like the old
+  Retry adapter, but waiting on the limiter instead of a fixed backoff.
+
+Usage:
+    python notebooks/rate_control.py status
+    python notebooks/rate_control.py self-check   # against a local throttling server
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+STATE_PATH = Path("data/scrape_rate_state.json")
+
+# Politeness bounds (seconds between requests across all workers) and the
+# spacing used when there is no learned state yet
+MIN_INTERVAL = 4.0
+MAX_INTERVAL = 120.0
+INITIAL_INTERVAL = 6.0
+# Random extra spacing, as a share of the interval (4-7s at the minimum, as in 02)
+JITTER_SHARE = 0.75
+ERROR_BACKOFF = 60.0
+
+# AIMD on the request rate (requests per second)
+INCREASE = 0.005
+DECREASE_FACTOR = 0.5
+SLOW_FACTOR = 0.8
+# A response this many times slower than the baseline latency counts as congestion
+LATENCY_FACTOR = 3.0
+LATENCY_ALPHA = 0.3
+BASELINE_ALPHA = 0.05
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+FETCH_ATTEMPTS = 4  # the old Retry(total=3): one try plus three retries
+SAVE_EVERY = 10
+
+
+def retry_after_seconds(response) -> float:
+    """Retry-After as seconds (delta-seconds or HTTP date), None if absent or invalid."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================================
+# LIMITERS
+# ============================================================================
+
+class RateLimiter:
+    """Spaces requests from all workers at least `interval` (+ jitter) seconds apart."""
+
+    def __init__(self, interval: float = MIN_INTERVAL):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_time = time.monotonic()
+        self.waited = 0.0
+
+    def wait(self) -> float:
+        """Block until this caller's slot; returns the seconds slept."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_time)
+            self.next_time = slot + self.interval * (1 + random.uniform(0, JITTER_SHARE))
+            self.waited += slot - now
+        time.sleep(max(0.0, slot - now))
+        return slot - now
+
+    def backoff(self, seconds: float) -> None:
+        """Push every worker's next request back (errors, throttling)."""
+        with self.lock:
+            self.next_time = max(self.next_time, time.monotonic() + seconds)
+
+    def record(self, status: int, latency: float, retry_after: float = None) -> None:
+        """
+        Outcome of one request (status None: connection error or timeout).
+
+        The fixed limiter only backs off: Retry-After when the server sends it,
+        ERROR_BACKOFF otherwise.
+        """
+        if status is None or status in RETRY_STATUSES:
+            self.backoff(retry_after if retry_after is not None else ERROR_BACKOFF)
+
+    def save(self) -> None:
+        pass
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """RateLimiter whose spacing follows AIMD on 429s, errors and latency."""
+
+    def __init__(self, interval: float = INITIAL_INTERVAL, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, increase: float = INCREASE,
+                 state_path=STATE_PATH, state: dict = None):
+        super().__init__(min(max(interval, min_interval), max_interval))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.increase = increase
+        self.state_path = Path(state_path) if state_path else None
+        state = state or {}
+        self.latency = state.get('latency')
+        self.baseline = state.get('baseline')
+        self.counts = {'requests': 0, 'throttled': 0, 'errors': 0, 'slow': 0, 'decreases': 0}
+        self.hold_until = 0.0
+        self.since_save = 0
+
+    @classmethod
+    def load(cls, state_path=STATE_PATH, **kwargs) -> 'AdaptiveRateLimiter':
+        """Start from the spacing learned by the previous run (clamped to the current bounds)."""
+        state = {}
+        if state_path and Path(state_path).exists():
+            try:
+                state = json.loads(Path(state_path).read_text())
+            except (OSError, json.JSONDecodeError):
+                print(f"⚠️ Ignoring unreadable rate state: {state_path}")
+        if 'interval' in state:
+            kwargs['interval'] = state['interval']
+        return cls(state_path=state_path, state=state, **kwargs)
+
+    def _set_rate(self, rate: float) -> None:
+        self.interval = min(max(1.0 / rate, self.min_interval), self.max_interval)
+
+    def _decrease(self, factor: float, now: float) -> bool:
+        if now < self.hold_until:
+            return False
+        self._set_rate(factor / self.interval)
+        # One decrease per burst: hold until the new spacing has been tried
+        self.hold_until = now + 2 * self.interval
+        self.counts['decreases'] += 1
+        return True
+
+    def record(self, status: int, latency: float, retry_after: float = None) -> None:
+        now = time.monotonic()
+        decreased = False
+        with self.lock:
+            self.counts['requests'] += 1
+            if status is None or status in RETRY_STATUSES:
+                self.counts['throttled' if status == 429 else 'errors'] += 1
+                decreased = self._decrease(DECREASE_FACTOR, now)
+                delay = retry_after if retry_after is not None else self.interval
+                self.next_time = max(self.next_time, now + delay)
+            else:
+                self.latency = latency if self.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency)
+                slow = self.baseline is not None and self.latency > LATENCY_FACTOR * self.baseline
+                # The baseline keeps moving (slowly), so a lasting change in latency is absorbed
+                self.baseline = latency if self.baseline is None else (
+                    BASELINE_ALPHA * latency + (1 - BASELINE_ALPHA) * self.baseline)
+                if slow:
+                    self.counts['slow'] += 1
+                    decreased = self._decrease(SLOW_FACTOR, now)
+                elif now >= self.hold_until:
+                    self._set_rate(1.0 / self.interval + self.increase)
+            self.since_save += 1
+            save = decreased or self.since_save >= SAVE_EVERY
+        if save:
+            self.save()
+
+    def state(self) -> dict:
+        return {'interval': self.interval, 'latency': self.latency, 'baseline': self.baseline,
+                'updated_at': time.strftime("%Y-%m-%d %H:%M:%S"), **self.counts}
+
+    def save(self) -> None:
+        """Persist the learned spacing (atomic replace)."""
+        if self.state_path is None:
+            return
+        with self.lock:
+            state = self.state()
+            self.since_save = 0
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(state, indent=2))
+        tmp_path.replace(self.state_path)
+
+
+def polite_get(session, url: str, limiter: RateLimiter, timeout: float = 15,
+               attempts: int = FETCH_ATTEMPTS):
+    """
+    GET `url` through `limiter`, retrying 429 / 5xx / connection errors.
+
+    Every attempt waits for its slot and reports its outcome to the limiter,
+    so retries slow down every worker, not just this one.
+
+    Raises:
+        requests.RequestException: the last error once `attempts` are used up.
+    """
+    import requests
+
+    for attempt in range(attempts):
+        limiter.wait()
+        start = time.monotonic()
+        try:
+            response = session.get(url, timeout=timeout)
+        except requests.RequestException:
+            limiter.record(None, time.monotonic() - start)
+            if attempt == attempts - 1:
+                raise
+            continue
+        limiter.record(response.status_code, time.monotonic() - start, retry_after_seconds(response))
+        if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+            response.raise_for_status()
+            return response
+
+
+# ============================================================================
+# SELF-CHECK AGAINST A LOCAL THROTTLING SERVER
+# ============================================================================
+
+def throttling_server(min_gap: float, retry_after: int = 1, latency: float = 0.01):
+    """
+    Local stand-in for FBRef that answers 429 + Retry-After to requests closer
+    than `min_gap` seconds to the last one it served.
+
+    Returns:
+        tuple: (server, counters dict with 'ok' and 'throttled').
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    counters = {'ok': 0, 'throttled': 0, 'last': 0.0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                now = time.monotonic()
+                throttled = now - counters['last'] < min_gap
+                if not throttled:
+                    counters['last'] = now
+                counters['throttled' if throttled else 'ok'] += 1
+            if throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', str(retry_after))
+                self.end_headers()
+                return
+            time.sleep(latency)
+            body = b"<html><body>ok</body></html>"
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counters
+
+
+def self_check(requests_count: int = 80, min_gap: float = 0.2, workers: int = 2) -> bool:
+    """
+    Drive an AdaptiveRateLimiter against a throttling server (times scaled
+    down ~20x) and check that it finds the server's limit and keeps it.
+    """
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    import requests
+
+    server, counters = throttling_server(min_gap)
+    url = f"http://127.0.0.1:{server.server_address[1]}/page"
+    state_path = Path(tempfile.mkdtemp()) / "rate_state.json"
+    # Starts 10x too slow, may go 4x too fast; the server allows one request per min_gap
+    limiter = AdaptiveRateLimiter(interval=min_gap * 10, min_interval=min_gap / 4, max_interval=min_gap * 50,
+                                  increase=1.0, state_path=state_path)
+    local = threading.local()
+
+    def fetch(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return polite_get(local.session, url, limiter, timeout=5, attempts=6).status_code
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        statuses = list(pool.map(fetch, range(requests_count)))
+    elapsed = time.monotonic() - start
+    limiter.save()
+    server.shutdown()
+
+    reloaded = AdaptiveRateLimiter.load(state_path, min_interval=min_gap / 4, max_interval=min_gap * 50)
+    throttled_share = counters['throttled'] / (counters['ok'] + counters['throttled'])
+    # Mean spacing including jitter (interval x (1 + JITTER_SHARE / 2))
+    spacing = limiter.interval * (1 + JITTER_SHARE / 2)
+    checks = {
+        'every request eventually succeeded': all(s == 200 for s in statuses),
+        'sped up from the initial spacing': limiter.interval < min_gap * 10 / 2,
+        'settled near the server limit': min_gap / 2 <= spacing <= min_gap * 4,
+        'throttled responses under 25%': throttled_share < 0.25,
+        'learned spacing persisted': abs(reloaded.interval - limiter.interval) < 1e-9,
+    }
+    print(f"{requests_count} requests in {elapsed:.1f}s; server limit {min_gap:.2f}s, "
+          f"learned interval {limiter.interval:.3f}s (mean spacing {spacing:.3f}s)")
+    print(f"Server: {counters['ok']} ok, {counters['throttled']} throttled ({throttled_share:.0%}); "
+          f"limiter: {limiter.counts}")
+    for name, passed in checks.items():
+        print(f"  {'✅' if passed else '❌'} {name}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive (AIMD) request spacing for the FBRef scrapers")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help="show the persisted rate state")
+    check = sub.add_parser('self-check', help="run against a local server that injects 429s")
+    check.add_argument('--requests', type=int, default=80)
+    check.add_argument('--min-gap', type=float, default=0.2)
+    check.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("ADAPTIVE RATE CONTROL")
+    print("=" * 80)
+
+    if args.command == 'status':
+        if STATE_PATH.exists():
+            print(STATE_PATH.read_text())
+        else:
+            print(f"⚠️ No rate state yet ({STATE_PATH}); the first run starts at {INITIAL_INTERVAL:.0f}s")
+    else:
+        raise SystemExit(0 if self_check(args.requests, args.min_gap, args.workers) else 1)
@@ -0,0 +1,238 @@
+"""
+Bootstrap and Permutation Testing for Era / Manager / Club Comparisons
+======================================================================
+
+03 reports the Ferguson -> post-Ferguson `goals_change` and 08 ranks managers
+on raw means. This module puts uncertainty on those comparisons:
+
+- Bootstrap confidence intervals for each group's mean and for the difference
+  to a baseline group (e.g. Ferguson)
+- Two-sided permutation test p-values for that difference
+
+Resamples are drawn as (B, n) index / permutation matrices, so each test is a
+handful of NumPy calls. Every (metric, group) task gets its own RNG stream
+spawned from one SeedSequence, and tasks run across a process pool; results
+are identical for a given seed regardless of worker count.
+
+Usage:
+    python notebooks/resampling.py --resamples 20000 --workers 8
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, manager_for_dates, season_managers, team_match_rows
+
+OUTPUT_PATH = Path("data/processed/resampling_results.csv")
+
+# Rows per resampling block, bounds memory at BLOCK x n floats per task
+BLOCK = 2000
+
+
+def bootstrap_means(values: np.ndarray, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Means of `n_resamples` bootstrap samples of `values`."""
+    n = len(values)
+    out = np.empty(n_resamples)
+    for start in range(0, n_resamples, BLOCK):
+        size = min(BLOCK, n_resamples - start)
+        out[start:start + size] = values[rng.integers(0, n, size=(size, n))].mean(axis=1)
+    return out
+
+
+def permutation_pvalue(a: np.ndarray, b: np.ndarray, n_permutations: int,
+                       rng: np.random.Generator) -> float:
+    """Two-sided permutation p-value for mean(a) - mean(b)."""
+    pooled = np.concatenate([a, b])
+    observed = abs(a.mean() - b.mean())
+    n_a = len(a)
+    extreme = 0
+    for start in range(0, n_permutations, BLOCK):
+        size = min(BLOCK, n_permutations - start)
+        shuffled = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+        diffs = shuffled[:, :n_a].mean(axis=1) - shuffled[:, n_a:].mean(axis=1)
+        extreme += int((np.abs(diffs) >= observed - 1e-12).sum())
+    return (extreme + 1) / (n_permutations + 1)
+
+
+def _compare_task(task: tuple) -> dict:
+    metric, group, values, baseline, baseline_values, n_resamples, ci, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    alpha = (1 - ci) / 2
+
+    boot = bootstrap_means(values, n_resamples, rng)
+    row = {
+        'metric': metric,
+        'group': group,
+        'n': len(values),
+        'mean': values.mean(),
+        'ci_low': np.quantile(boot, alpha),
+        'ci_high': np.quantile(boot, 1 - alpha),
+        'baseline': baseline,
+    }
+
+    if group != baseline and len(values) and len(baseline_values):
+        base_boot = bootstrap_means(baseline_values, n_resamples, rng)
+        diff = boot - base_boot
+        row.update({
+            'diff_vs_baseline': values.mean() - baseline_values.mean(),
+            'diff_ci_low': np.quantile(diff, alpha),
+            'diff_ci_high': np.quantile(diff, 1 - alpha),
+            'p_value': permutation_pvalue(values, baseline_values, n_resamples, rng),
+        })
+    return row
+
+
+def comparison_tasks(df: pd.DataFrame, metrics: list, group_col: str, baseline: str,
+                     n_resamples: int = 10000, ci: float = 0.95, seed=2013) -> list:
+    """
+    One test task per (metric, group) vs a baseline group; run with `run_comparisons`.
+
+    Tasks from several comparisons can be run together in one pool.
+
+    Args:
+        df (pd.DataFrame): One row per observation (season or match).
+        metrics (list): Numeric columns to test.
+        group_col (str): Grouping column, e.g. 'era', 'manager', 'squad'.
+        baseline (str): Group every other group is compared with.
+        n_resamples (int): Bootstrap resamples and permutations per test.
+        ci (float): Confidence level.
+        seed: Root seed (int or sequence of ints); each task gets an independent spawned stream.
+
+    Returns:
+        list: Task tuples.
+    """
+    groups = list(dict.fromkeys(df[group_col].dropna()))
+    tasks = []
+    for metric in metrics:
+        clean = df[[group_col, metric]].dropna()
+        baseline_values = clean.loc[clean[group_col] == baseline, metric].to_numpy(dtype=float)
+        for group in groups:
+            values = clean.loc[clean[group_col] == group, metric].to_numpy(dtype=float)
+            if len(values):
+                tasks.append([metric, group, values, baseline, baseline_values, n_resamples, ci])
+
+    streams = np.random.SeedSequence(seed).spawn(len(tasks))
+    return [tuple(task + [stream]) for task, stream in zip(tasks, streams)]
+
+
+def run_comparisons(tasks: list, workers: int = None) -> list:
+    """Result rows for `tasks`, in order (workers: None = all cores, 1 = in-process)."""
+    if workers == 1:
+        return [_compare_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compare_task, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def compare_groups(df: pd.DataFrame, metrics: list, group_col: str, baseline: str,
+                   n_resamples: int = 10000, ci: float = 0.95, seed=2013,
+                   workers: int = None) -> pd.DataFrame:
+    """
+    Bootstrap CIs and permutation tests for every metric x group vs a baseline group.
+
+    Args are as for `comparison_tasks`; workers is the process pool size
+    (None = all cores, 1 = in-process).
+
+    Returns:
+        pd.DataFrame: One row per (metric, group).
+    """
+    tasks = comparison_tasks(df, metrics, group_col, baseline, n_resamples, ci, seed)
+    return pd.DataFrame(run_comparisons(tasks, workers))
+
+
+def era_label(season_start_year: int) -> str:
+    """Ferguson vs post-Ferguson split used in 03 (start year <= 2013)."""
+    return 'Ferguson Era' if season_start_year <= 2013 else 'Post-Ferguson'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap / permutation tests for era and manager comparisons")
+    parser.add_argument('--resamples', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=2013)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("RESAMPLING: ERA, MANAGER AND CLUB COMPARISONS")
+    print("=" * 80)
+
+    df_all = pd.read_csv('data/processed/all_teams_standard_stats.csv')
+    df_all['goals_per_game'] = df_all['performance_gls'] / df_all['playing_time_mp']
+    df_all['assists_per_game'] = df_all['performance_ast'] / df_all['playing_time_mp']
+    df_all['goal_contribution_per_game'] = df_all['performance_g_a'] / df_all['playing_time_mp']
+    df_all['era'] = df_all['season_start_year'].apply(era_label)
+
+    season_metrics = ['goals_per_game', 'assists_per_game', 'goal_contribution_per_game',
+                      'per_90_minutes_gls', 'per_90_minutes_xg', 'poss']
+
+    man_utd = df_all[df_all['squad'] == 'Manchester Utd'].copy()
+    man_utd['manager'] = season_managers(man_utd['season_start_year'])
+
+    results = []
+    start = time.perf_counter()
+
+    # 1. Era comparison (03's goals_change with a CI and p-value)
+    era = compare_groups(man_utd, season_metrics, 'era', 'Ferguson Era',
+                         args.resamples, seed=args.seed, workers=args.workers)
+    results.append(era.assign(comparison='man_utd_era'))
+
+    # 2. Managers vs Ferguson (season-level, as in 04)
+    managers = compare_groups(man_utd, season_metrics, 'manager', 'Ferguson',
+                              args.resamples, seed=args.seed + 1, workers=args.workers)
+    results.append(managers.assign(comparison='man_utd_manager_seasons'))
+
+    # 3. Every club's post-Ferguson change (club-era groups vs the same club's Ferguson era),
+    #    all clubs' tests in one pool
+    club_tasks, club_squads = [], []
+    for i, (squad, club) in enumerate(df_all.groupby('squad')):
+        if club['era'].nunique() == 2:
+            tasks = comparison_tasks(club, ['goals_per_game'], 'era', 'Ferguson Era',
+                                     args.resamples, seed=[args.seed, 2, i])
+            club_tasks.extend(tasks)
+            club_squads.extend([squad] * len(tasks))
+    clubs = pd.DataFrame(run_comparisons(club_tasks, args.workers))
+    results.append(clubs.assign(comparison='club_era', squad=club_squads))
+
+    # 4. Match-level points per game by manager, when match data is ingested
+    match_log = MatchLog(MATCH_LOG_DIR)
+    if match_log.exists():
+        rows = team_match_rows(match_log.played())
+        rows = rows[rows['team'] == 'Manchester Utd'].copy()
+        rows['manager'] = manager_for_dates(rows['date'].to_numpy())
+        match_level = compare_groups(rows, ['points', 'goals_for', 'goals_against'], 'manager', 'Ferguson',
+                                     args.resamples, seed=args.seed + 3, workers=args.workers)
+        results.append(match_level.assign(comparison='man_utd_manager_matches'))
+
+    elapsed = time.perf_counter() - start
+    output = pd.concat(results, ignore_index=True)
+    output.to_csv(OUTPUT_PATH, index=False)
+
+    n_tests = len(output)
+    print(f"{n_tests} tests x {args.resamples:,} resamples in {elapsed:.2f}s")
+    print(f"Saved: {OUTPUT_PATH}")
+
+    print("\n" + "=" * 80)
+    print("FERGUSON ERA -> POST-FERGUSON (Man Utd)")
+    print("=" * 80)
+    # xG / possession only exist post-2017, so they have no Ferguson-era baseline
+    post = era[era['group'] == 'Post-Ferguson'].dropna(subset=['p_value'])
+    for _, row in post.iterrows():
+        print(f"{row['metric']:28s} diff {row['diff_vs_baseline']:+.3f} "
+              f"[{row['diff_ci_low']:+.3f}, {row['diff_ci_high']:+.3f}]  p={row['p_value']:.4f}")
+
+    print("\n" + "=" * 80)
+    print("MANAGERS VS FERGUSON: goals_per_game (season level)")
+    print("=" * 80)
+    for _, row in managers[managers['metric'] == 'goals_per_game'].iterrows():
+        extra = "" if row['group'] == 'Ferguson' else (
+            f"  diff {row['diff_vs_baseline']:+.3f} [{row['diff_ci_low']:+.3f}, {row['diff_ci_high']:+.3f}]"
+            f"  p={row['p_value']:.4f}")
+        print(f"{row['group']:18s} n={row['n']:2d}  mean {row['mean']:.3f} "
+              f"[{row['ci_low']:.3f}, {row['ci_high']:.3f}]{extra}")
@@ -0,0 +1,138 @@
+"""
+Rolling Form Metrics
+====================
+
+Rolling points per game, goals, xG for/against and goal difference over
+configurable match windows, for every club at once.
+
+Each metric is computed with one global cumulative sum over the team-match
+rows (sorted by team, season, date). A window's sum is the difference of two
+cumulative-sum entries, clipped at the start of the team's group, so there are
+no per-team Python loops. Missing xG (pre-2017) is skipped via a parallel
+cumulative count, so xG windows average over the matches that have xG.
+
+Results are cached to data/processed/rolling_form.csv together with the match
+log version and windows they were built from.
+
+Usage:
+    python notebooks/rolling_form.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, team_match_rows
+
+CACHE_PATH = Path("data/processed/rolling_form.csv")
+DEFAULT_WINDOWS = (5, 10)
+
+# output name -> team-match column averaged over the window
+ROLLING_METRICS = {
+    'ppg': 'points',
+    'goals_for': 'goals_for',
+    'goals_against': 'goals_against',
+    'goal_diff': 'goal_diff',
+    'xg_for': 'xg_for',
+    'xg_against': 'xg_against',
+}
+
+
+def rolling_form(matches: pd.DataFrame, windows=DEFAULT_WINDOWS, reset_each_season: bool = True) -> pd.DataFrame:
+    """
+    Compute rolling per-match averages for every club.
+
+    Args:
+        matches (pd.DataFrame): Played matches (MATCH_COLUMNS).
+        windows: Window sizes in matches, e.g. (5, 10).
+        reset_each_season (bool): Start a fresh window each season (in-season form)
+            instead of carrying form over the summer.
+
+    Returns:
+        pd.DataFrame: One row per team-match with `game_number`, `season_progress_x`
+            and `{metric}_r{window}` columns.
+    """
+    rows = team_match_rows(matches)
+    rows['goal_diff'] = rows['goals_for'] - rows['goals_against']
+    group_cols = ['team', 'season'] if reset_each_season else ['team']
+    rows = rows.sort_values(group_cols + ['date'], kind='stable').reset_index(drop=True)
+
+    n = len(rows)
+    idx = np.arange(n)
+    new_group = np.ones(n, dtype=bool)
+    if n:
+        keys = rows[group_cols].to_numpy()
+        new_group[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    group_start = np.maximum.accumulate(np.where(new_group, idx, 0))
+
+    rows['game_number'] = idx - group_start + 1
+    games_in_season = rows.groupby(['team', 'season'])['game_number'].transform('max')
+    rows['season_progress_x'] = (rows['season'].str[:4].astype(int) - 0.5
+                                 + (rows['game_number'] - 0.5) / games_in_season)
+
+    for name, column in ROLLING_METRICS.items():
+        values = rows[column].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+        value_cs = np.concatenate([[0.0], np.cumsum(np.where(present, values, 0.0))])
+        count_cs = np.concatenate([[0], np.cumsum(present)])
+        for window in windows:
+            lo = np.maximum(idx + 1 - window, group_start)
+            total = value_cs[idx + 1] - value_cs[lo]
+            count = count_cs[idx + 1] - count_cs[lo]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rows[f'{name}_r{window}'] = np.where(count > 0, total / count, np.nan)
+
+    return rows
+
+
+def cached_rolling_form(match_log: MatchLog = None, windows=DEFAULT_WINDOWS,
+                        cache_path=CACHE_PATH) -> pd.DataFrame:
+    """
+    Rolling form for the whole match log, recomputed only when the log changes.
+
+    Returns:
+        pd.DataFrame: As `rolling_form`, or an empty frame if there is no match log.
+    """
+    match_log = match_log or MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        return pd.DataFrame()
+
+    cache_path = Path(cache_path)
+    meta_path = cache_path.with_suffix('.json')
+    key = {'match_log_version': match_log.version, 'windows': list(windows)}
+
+    if cache_path.exists() and meta_path.exists():
+        with open(meta_path) as f:
+            if json.load(f) == key:
+                return pd.read_csv(cache_path, parse_dates=['date'])
+
+    form = rolling_form(match_log.played(), windows)
+    form.to_csv(cache_path, index=False)
+    with open(meta_path, 'w') as f:
+        json.dump(key, f)
+    return form
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("ROLLING FORM METRICS")
+    print("=" * 80)
+
+    form = cached_rolling_form()
+    if form.empty:
+        print("⚠️ No match log found. Run notebooks/match_results.py first.")
+        raise SystemExit(1)
+
+    print(f"Rolling form for {form['team'].nunique()} clubs, {len(form):,} team-matches")
+    print(f"Saved: {CACHE_PATH}")
+
+    man_utd = form[form['team'] == 'Manchester Utd']
+    latest = man_utd[man_utd['season'] == man_utd['season'].max()]
+    cols = ['date', 'opponent', 'venue', 'goals_for', 'goals_against', 'ppg_r5', 'ppg_r10', 'xg_for_r10', 'xg_against_r10']
+    print(f"\nMan Utd form, {latest['season'].iloc[0]}:")
+    print(latest[cols].tail(10).round(2).to_string(index=False))
@@ -0,0 +1,286 @@
+"""
+Pipelined FBRef Scraping
+========================
+
+02 fetches a page, parses it, writes its CSVs and only then requests the next
+page, so BeautifulSoup / read_html time adds to the crawl time. This module
+runs the same work as three overlapping stages:
+
+    fetch (threads, one shared rate limiter: rate_control.py)
+      -> pages queue (bounded) ->
+    parse (driver threads submitting to a process pool)
+      -> results queue (bounded) ->
+    write (one thread: HTML archive, CSVs, log rows)
+
+Both queues are bounded, so a slow stage blocks the one feeding it
+(backpressure) rather than holding every page in memory; at most
+`parse_workers` pages are parsed at once. A stage never stops on a failed
+item: the error goes into that page's log row and the stage keeps consuming
+until the end marker, so no upstream thread is left blocked on a full queue. Each stage records items, busy
+time, time waiting for input and time blocked on its output, so the report
+shows which stage limits the run. With enough parse workers the total runtime
+is the rate-limited fetch time.
+
+Usage:
+    python notebooks/scrape_pipeline.py --competitions premier_league --parse-workers 4
+    python notebooks/02_scrape_fbref_all_seasons.py --pipeline
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fbref_pages import (BASE_URL, COMPETITIONS, DEFAULT_COMPETITION, RAW_DIR, SEASONS, TABLES, extract_tables,
+                         make_session, page_url, pages_for, response_bytes, season_str, table_path, write_table)
+from html_archive import HtmlArchive
+from rate_control import MIN_INTERVAL, AdaptiveRateLimiter, RateLimiter, polite_get
+
+QUEUE_SIZE = 4
+_DONE = object()
+
+
+# ============================================================================
+# STAGE METRICS
+# ============================================================================
+
+class StageMetrics:
+    """Per-stage counters, safe to update from every thread of the stage."""
+
+    FIELDS = ['items', 'busy', 'waiting', 'blocked', 'max_queue']
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.values = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **increments) -> None:
+        with self.lock:
+            for field, value in increments.items():
+                self.values[field] += value
+
+    def queue_depth(self, depth: int) -> None:
+        with self.lock:
+            self.values['max_queue'] = max(self.values['max_queue'], depth)
+
+    def row(self) -> dict:
+        return {'stage': self.name, **self.values}
+
+
+def timed_get(q: queue.Queue, metrics: StageMetrics):
+    start = time.perf_counter()
+    item = q.get()
+    metrics.add(waiting=time.perf_counter() - start)
+    return item
+
+
+def timed_put(q: queue.Queue, item, metrics: StageMetrics) -> None:
+    """Blocking put; time spent here is backpressure from the next stage."""
+    start = time.perf_counter()
+    q.put(item)
+    metrics.add(blocked=time.perf_counter() - start)
+    metrics.queue_depth(q.qsize())
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def plan_pages(competitions: list, seasons: list, tables: list, raw_dir=RAW_DIR) -> list:
+    """(competition, season, page, table keys) for every page carrying missing tables."""
+    pages = []
+    for competition in competitions:
+        for season in seasons:
+            missing = [t for t in tables if not table_path(competition, t, season, raw_dir).exists()]
+            pages.extend((competition, season, page, keys) for page, keys in pages_for(missing).items())
+    return pages
+
+
+class ScrapePipeline:
+    """Fetch, parse and write stages joined by bounded queues."""
+
+    def __init__(self, limiter: RateLimiter, raw_dir=RAW_DIR, base_url: str = BASE_URL,
+                 archive: HtmlArchive = None, fetch_workers: int = 1, parse_workers: int = 2,
+                 queue_size: int = QUEUE_SIZE, timeout: float = 15):
+        self.limiter = limiter
+        self.raw_dir = raw_dir
+        self.base_url = base_url
+        self.archive = archive
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.local = threading.local()
+        self.metrics = {name: StageMetrics(name) for name in ('fetch', 'parse', 'write')}
+        self.lock = threading.Lock()
+        self.throttled = 0.0
+        self.bytes = 0
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = make_session()
+        return self.local.session
+
+    def _fetch(self, todo: queue.Queue, pages: queue.Queue, results: queue.Queue) -> None:
+        metrics = self.metrics['fetch']
+        while True:
+            try:
+                competition, season, page, keys = todo.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            url = None
+            try:
+                url = page_url(competition, season, page, self.base_url)
+                response = polite_get(self._session(), url, self.limiter, self.timeout)
+                html, nbytes = response.text, response_bytes(response)
+            except Exception as e:
+                # Busy time includes the limiter wait until report() takes it out
+                metrics.add(items=1, busy=time.perf_counter() - start)
+                # Errors skip the parse stage
+                timed_put(results, (competition, season, page, keys, url, None, 0, str(e)), metrics)
+                continue
+            metrics.add(items=1, busy=time.perf_counter() - start)
+            with self.lock:
+                self.bytes += nbytes
+            timed_put(pages, (competition, season, page, keys, url, html, nbytes), metrics)
+
+    def _parse(self, pool, pages: queue.Queue, results: queue.Queue) -> None:
+        metrics = self.metrics['parse']
+        while True:
+            item = timed_get(pages, metrics)
+            if item is _DONE:
+                return
+            competition, season, page, keys, url, html, nbytes = item
+            start = time.perf_counter()
+            try:
+                tables, error = pool.submit(extract_tables, html, keys).result(), None
+            except Exception as e:
+                tables, error = None, str(e)
+            metrics.add(items=1, busy=time.perf_counter() - start)
+            timed_put(results, (competition, season, page, keys, url, html, nbytes, error, tables), metrics)
+
+    def _write(self, results: queue.Queue, log: list) -> None:
+        metrics = self.metrics['write']
+        while True:
+            item = timed_get(results, metrics)
+            if item is _DONE:
+                return
+            competition, season, page, keys, url, html, nbytes, error, *parsed = item
+            start = time.perf_counter()
+            row = {'competition': competition, 'season': season_str(season), 'page': page or 'overview',
+                   'bytes': nbytes, 'error': error, **dict.fromkeys(keys, 'error')}
+            try:
+                if html is not None and self.archive is not None:
+                    self.archive.put(url, html, competition, season, page)
+                tables = parsed[0] if parsed else None
+                for key in keys:
+                    if tables is None:
+                        continue
+                    if tables.get(key) is None:
+                        row[key] = 'missing'
+                    else:
+                        write_table(tables[key], competition, key, season, self.raw_dir)
+                        row[key] = 'yes'
+            except Exception as e:
+                # Keep draining results: parsers and fetchers block on a full queue otherwise
+                row['error'] = f"write failed: {e}"
+            error = row['error']
+            log.append(row)
+            metrics.add(items=1, busy=time.perf_counter() - start)
+            status = f"🔥 {error}" if error else f"✅ {sum(row[k] == 'yes' for k in keys)} table(s)"
+            print(f"{competition} {season_str(season)} {page or 'overview'}: {status}")
+
+    def run(self, jobs: list) -> list:
+        """
+        Fetch, parse and save every (competition, season, page, keys) job.
+
+        Returns:
+            list: one log row per page (table statuses, bytes, error).
+        """
+        todo = queue.Queue()
+        for job in jobs:
+            todo.put(job)
+        pages = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+        log = []
+        waited_before = self.limiter.waited
+
+        # 02 is a flat script: a spawned worker would re-run it, so fork where the
+        # platform has it (02 refuses --pipeline otherwise), and start the workers
+        # before any stage thread exists
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=context) as pool:
+            pool.submit(int).result()
+            fetchers = [threading.Thread(target=self._fetch, args=(todo, pages, results))
+                        for _ in range(self.fetch_workers)]
+            parsers = [threading.Thread(target=self._parse, args=(pool, pages, results))
+                       for _ in range(self.parse_workers)]
+            writer = threading.Thread(target=self._write, args=(results, log))
+            for thread in fetchers + parsers + [writer]:
+                thread.start()
+            for thread in fetchers:
+                thread.join()
+            for _ in parsers:
+                pages.put(_DONE)
+            for thread in parsers:
+                thread.join()
+            results.put(_DONE)
+            writer.join()
+        self.throttled += self.limiter.waited - waited_before
+        self.limiter.save()
+        return log
+
+    def report(self, elapsed: float) -> list:
+        """Stage metrics as rows, plus the fetch stage's rate-limit wait."""
+        rows = [m.row() for m in self.metrics.values()]
+        rows[0]['busy'] -= self.throttled
+        rows[0]['throttled'] = self.throttled
+        print(f"\n{'stage':6s} {'items':>6s} {'busy s':>8s} {'waiting s':>10s} {'blocked s':>10s} {'max queue':>10s}")
+        for row in rows:
+            print(f"{row['stage']:6s} {row['items']:6d} {row['busy']:8.1f} {row['waiting']:10.1f} "
+                  f"{row['blocked']:10.1f} {row['max_queue']:10d}")
+        print(f"fetch stage rate-limit wait: {self.throttled:.1f}s; total {elapsed:.1f}s; "
+              f"{self.bytes / 1024:.0f} KB transferred")
+        return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pipelined fetch / parse / write scrape of missing FBRef tables")
+    parser.add_argument('--competitions', default=DEFAULT_COMPETITION,
+                        help=f"comma-separated keys or 'all' ({', '.join(COMPETITIONS)})")
+    parser.add_argument('--first-season', type=int, default=SEASONS[0])
+    parser.add_argument('--last-season', type=int, default=SEASONS[-1])
+    parser.add_argument('--tables', default='all', help="comma-separated table keys or 'all'")
+    parser.add_argument('--fetch-workers', type=int, default=1)
+    parser.add_argument('--parse-workers', type=int, default=2)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--interval', type=float, default=MIN_INTERVAL,
+                        help="minimum seconds between requests (the fixed spacing with --fixed-rate)")
+    parser.add_argument('--fixed-rate', action='store_true', help="don't adapt the spacing (AIMD) to the server")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--no-archive', action='store_true', help="don't keep fetched pages in the HTML archive")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("PIPELINED FBREF SCRAPE")
+    print("=" * 80)
+
+    competitions = list(COMPETITIONS) if args.competitions == 'all' else args.competitions.split(',')
+    tables = list(TABLES) if args.tables == 'all' else args.tables.split(',')
+    jobs = plan_pages(competitions, range(args.first_season, args.last_season + 1), tables)
+    print(f"{len(jobs)} page(s) to fetch")
+
+    limiter = RateLimiter(args.interval) if args.fixed_rate else AdaptiveRateLimiter.load(min_interval=args.interval)
+    pipeline = ScrapePipeline(limiter, base_url=args.base_url,
+                              archive=None if args.no_archive else HtmlArchive(),
+                              fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+                              queue_size=args.queue_size)
+    start = time.perf_counter()
+    pipeline.run(jobs)
+    pipeline.report(time.perf_counter() - start)
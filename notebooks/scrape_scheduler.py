@@ -0,0 +1,308 @@
+"""
+Multi-Competition Scrape Scheduler
+==================================
+
+02 scrapes one league with one loop. This scheduler covers the Premier League,
+Championship, La Liga, Serie A, Bundesliga and Ligue 1 (fbref_pages.COMPETITIONS)
+through a persistent job queue and one shared, rate-limited worker pool.
+
+- Jobs are (competition, season, table) rows in a SQLite file
+  (data/scrape_jobs.sqlite) with a status, attempt count and priority.
+  Planning only adds jobs whose CSV is missing, so re-running is cheap and an
+  interrupted run resumes where it stopped.
+- Priority: current season first, then newer before older, then by
+  competition rank (Premier League first).
+- Jobs for the same page are claimed together, so each page is fetched once
+  for all of its missing tables. A season missing only a few tables is
+  fetched from the small stats sub-pages (fbref_pages.TABLE_PAGES) rather
+  than the full overview; bytes transferred are reported per run.
+- Workers are threads (the work is network-bound) sharing one rate limiter
+  (rate_control.py), so adding workers overlaps parsing and disk writes with
+  the politeness wait but never raises the request rate against FBRef. The
+  spacing adapts to 429s / Retry-After and latency unless run with
+  --fixed-rate.
+- Output is partitioned by competition (fbref_pages.competition_dir).
+- Fetched pages are kept in the HTML archive (html_archive.py), unless run
+  with --no-archive.
+
+Usage:
+    python notebooks/scrape_scheduler.py plan --competitions all
+    python notebooks/scrape_scheduler.py run --workers 3
+    python notebooks/scrape_scheduler.py status
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fbref_pages import (BASE_URL, COMPETITIONS, CURRENT_SEASON, RAW_DIR, SEASONS, TABLES,
+                         extract_tables, make_session, page_url, pages_for, response_bytes, season_str, table_path,
+                         write_table)
+from html_archive import HtmlArchive
+from rate_control import MIN_INTERVAL, AdaptiveRateLimiter, RateLimiter, polite_get
+
+JOBS_PATH = Path("data/scrape_jobs.sqlite")
+
+MAX_ATTEMPTS = 3
+
+
+# ============================================================================
+# JOB STORE
+# ============================================================================
+
+def job_priority(competition: str, season: int) -> int:
+    """Lower runs first: current season, then newer seasons, then competition rank."""
+    return (CURRENT_SEASON - season) * 10 + COMPETITIONS[competition]['rank']
+
+
+class JobStore:
+    """SQLite-backed job queue, safe to share between worker threads."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            competition TEXT NOT NULL,
+            season INTEGER NOT NULL,
+            table_key TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            updated_at REAL,
+            PRIMARY KEY (competition, season, table_key)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority);
+    """
+
+    def __init__(self, path=JOBS_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.executescript(self.SCHEMA)
+
+    def add(self, jobs: list, reopen_missing: bool = False) -> int:
+        """
+        Insert (competition, season, table, priority) jobs.
+
+        Done and failed jobs are reopened; jobs whose table was not on the page
+        ('missing', e.g. xG before 2017-18) only when `reopen_missing` is set.
+        """
+        reopen = "('done', 'failed', 'missing')" if reopen_missing else "('done', 'failed')"
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany(f"""
+                INSERT INTO jobs (competition, season, table_key, priority, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (competition, season, table_key) DO UPDATE SET
+                    priority = excluded.priority, status = 'pending', attempts = 0, error = NULL
+                WHERE jobs.status IN {reopen}
+            """, [(*job, time.time()) for job in jobs])
+            return self.conn.total_changes - before
+
+    def recover(self) -> int:
+        """Return jobs left 'running' by an interrupted run to the queue."""
+        with self.lock:
+            return self.conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'").rowcount
+
+    def claim_page(self) -> list:
+        """
+        Atomically claim every pending job of the highest-priority page.
+
+        Returns:
+            list: (competition, season, table_key, attempts) tuples sharing one
+                page (fbref_pages.pages_for); empty when done.
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                head = self.conn.execute("""
+                    SELECT competition, season, table_key FROM jobs WHERE status = 'pending'
+                    ORDER BY priority, competition, season, table_key LIMIT 1
+                """).fetchone()
+                if head is None:
+                    self.conn.execute("COMMIT")
+                    return []
+                pending = [row[0] for row in self.conn.execute("""
+                    SELECT table_key FROM jobs WHERE status = 'pending' AND competition = ? AND season = ?
+                """, head[:2])]
+                # The head job's page group: the whole season (overview) or one sub-page
+                keys = next(group for group in pages_for(pending).values() if head[2] in group)
+                marks = ', '.join('?' * len(keys))
+                jobs = self.conn.execute(f"""
+                    SELECT competition, season, table_key, attempts FROM jobs
+                    WHERE status = 'pending' AND competition = ? AND season = ? AND table_key IN ({marks})
+                """, (*head[:2], *keys)).fetchall()
+                self.conn.execute(f"""
+                    UPDATE jobs SET status = 'running', updated_at = ?
+                    WHERE status = 'pending' AND competition = ? AND season = ? AND table_key IN ({marks})
+                """, (time.time(), *head[:2], *keys))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            return jobs
+
+    def finish(self, jobs: list, status: str, error: str = None) -> None:
+        """Mark jobs done / missing, or failed (re-queued until MAX_ATTEMPTS)."""
+        with self.lock:
+            for competition, season, table_key, attempts in jobs:
+                new_status = status
+                if status == 'failed' and attempts + 1 < MAX_ATTEMPTS:
+                    new_status = 'pending'
+                self.conn.execute("""
+                    UPDATE jobs SET status = ?, attempts = attempts + ?, error = ?, updated_at = ?
+                    WHERE competition = ? AND season = ? AND table_key = ?
+                """, (new_status, int(status == 'failed'), error, time.time(), competition, season, table_key))
+
+    def summary(self) -> list:
+        with self.lock:
+            return self.conn.execute("""
+                SELECT competition, status, COUNT(*) FROM jobs
+                GROUP BY competition, status ORDER BY competition, status
+            """).fetchall()
+
+
+def plan_jobs(competitions: list, seasons: list, tables: list, raw_dir=RAW_DIR,
+              refresh_current: bool = False) -> list:
+    """Jobs for every table whose CSV is missing (plus the current season if refreshing)."""
+    jobs = []
+    for competition in competitions:
+        for season in seasons:
+            for table in tables:
+                refresh = refresh_current and season == CURRENT_SEASON
+                if refresh or not table_path(competition, table, season, raw_dir).exists():
+                    jobs.append((competition, season, table, job_priority(competition, season)))
+    return jobs
+
+
+# ============================================================================
+# WORKER POOL
+# ============================================================================
+
+class ScrapeRunner:
+    """Drains the job store with a pool of threads sharing one rate limiter."""
+
+    def __init__(self, store: JobStore, limiter: RateLimiter, raw_dir=RAW_DIR,
+                 base_url: str = BASE_URL, timeout: float = 15, archive: HtmlArchive = None):
+        self.store = store
+        self.archive = archive
+        self.limiter = limiter
+        self.raw_dir = raw_dir
+        self.base_url = base_url
+        self.timeout = timeout
+        self.local = threading.local()
+        self.stats_lock = threading.Lock()
+        self.stats = {'pages': 0, 'bytes': 0, 'tables': 0, 'missing': 0, 'errors': 0}
+
+    def _count(self, **increments) -> None:
+        with self.stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = make_session()
+        return self.local.session
+
+    def run_page(self, jobs: list) -> None:
+        competition, season = jobs[0][0], jobs[0][1]
+        page = next(iter(pages_for([job[2] for job in jobs])))
+        url = page_url(competition, season, page, self.base_url)
+        try:
+            response = polite_get(self._session(), url, self.limiter, self.timeout)
+        except Exception as e:
+            print(f"🔥 {competition} {season_str(season)} {page or 'overview'}: {e}")
+            self.store.finish(jobs, 'failed', str(e))
+            self._count(errors=1)
+            return
+
+        if self.archive is not None:
+            self.archive.put(url, response.text, competition, season, page)
+        tables = extract_tables(response.text, [job[2] for job in jobs])
+        found, missing = [], []
+        for job in jobs:
+            df = tables[job[2]]
+            if df is None:
+                missing.append(job)
+            else:
+                write_table(df, competition, job[2], season, self.raw_dir)
+                found.append(job)
+        self.store.finish(found, 'done')
+        self.store.finish(missing, 'missing', 'table not on page')
+        self._count(pages=1, bytes=response_bytes(response), tables=len(found), missing=len(missing))
+        print(f"✅ {competition} {season_str(season)} {page or 'overview'}: {len(found)} table(s)"
+              + (f", {len(missing)} missing" if missing else ""))
+
+    def _worker(self) -> None:
+        while True:
+            jobs = self.store.claim_page()
+            if not jobs:
+                return
+            self.run_page(jobs)
+
+    def run(self, workers: int = 2) -> dict:
+        self.store.recover()
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(self._worker) for _ in range(workers)]:
+                    future.result()
+        finally:
+            self.limiter.save()
+        return self.stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan and run FBRef scrape jobs across competitions")
+    sub = parser.add_subparsers(dest='command', required=True)
+    plan = sub.add_parser('plan', help="queue jobs for missing tables")
+    plan.add_argument('--competitions', default='premier_league',
+                      help=f"comma-separated keys or 'all' ({', '.join(COMPETITIONS)})")
+    plan.add_argument('--first-season', type=int, default=SEASONS[0])
+    plan.add_argument('--last-season', type=int, default=SEASONS[-1])
+    plan.add_argument('--tables', default='all', help="comma-separated table keys or 'all'")
+    plan.add_argument('--refresh-current', action='store_true', help="re-queue the current season")
+    run = sub.add_parser('run', help="process queued jobs")
+    run.add_argument('--workers', type=int, default=2)
+    run.add_argument('--interval', type=float, default=MIN_INTERVAL,
+                     help="minimum seconds between requests (the fixed spacing with --fixed-rate)")
+    run.add_argument('--fixed-rate', action='store_true', help="don't adapt the spacing (AIMD) to the server")
+    run.add_argument('--base-url', default=BASE_URL)
+    run.add_argument('--no-archive', action='store_true', help="don't keep fetched pages in the HTML archive")
+    sub.add_parser('status', help="job counts per competition and status")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("FBREF SCRAPE SCHEDULER")
+    print("=" * 80)
+
+    store = JobStore(JOBS_PATH)
+    if args.command == 'plan':
+        competitions = list(COMPETITIONS) if args.competitions == 'all' else args.competitions.split(',')
+        tables = list(TABLES) if args.tables == 'all' else args.tables.split(',')
+        seasons = list(range(args.first_season, args.last_season + 1))
+        jobs = plan_jobs(competitions, seasons, tables, refresh_current=args.refresh_current)
+        # Tables absent from a past season's page stay closed; the current season can still gain them
+        current = [job for job in jobs if job[1] == CURRENT_SEASON] if args.refresh_current else []
+        added = store.add(jobs) + store.add(current, reopen_missing=True)
+        print(f"{len(jobs)} missing table(s) across {len(competitions)} competition(s) x "
+              f"{len(seasons)} season(s); {added} job(s) queued or reopened")
+    elif args.command == 'run':
+        start = time.perf_counter()
+        limiter = (RateLimiter(args.interval) if args.fixed_rate
+                   else AdaptiveRateLimiter.load(min_interval=args.interval))
+        runner = ScrapeRunner(store, limiter, base_url=args.base_url,
+                              archive=None if args.no_archive else HtmlArchive())
+        stats = runner.run(args.workers)
+        elapsed = time.perf_counter() - start
+        print(f"\n{stats['pages']} page(s) ({stats['bytes'] / 1024:.0f} KB), {stats['tables']} table(s) saved, {stats['missing']} missing, "
+              f"{stats['errors']} error(s) in {elapsed:.0f}s; request spacing now {limiter.interval:.1f}s")
+
+    print("\nJob status:")
+    for competition, status, count in store.summary():
+        print(f"  {competition:15s} {status:8s} {count:5d}")
@@ -0,0 +1,144 @@
+"""
+Within-Season Ranks, Percentiles and Z-Scores
+=============================================
+
+"Is Man Utd's 2023-24 xG good?" depends on the other 19 clubs that season.
+This module adds three companion columns to every numeric metric in
+all_teams_standard_stats.csv, computed within each season:
+
+    {metric}_rank   1 = highest value that season (ties share the best rank)
+    {metric}_pct    percentile of the value, 0-100 (100 = highest)
+    {metric}_z      (value - season mean) / season standard deviation
+
+Direction is not interpreted: for metrics where lower is better (cards,
+goals conceded) read rank 1 / pct 100 as "most".
+
+All metrics are ranked in one grouped pass (pandas groupby rank/transform over
+the whole metric block). The result is written to
+data/processed/all_teams_season_percentiles.csv with a .json file holding a
+content hash per season; an update recomputes only the seasons whose rows
+changed (usually just the current one) and keeps the rest.
+
+Usage:
+    python notebooks/season_percentiles.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_PATH = Path("data/processed/all_teams_standard_stats.csv")
+PERCENTILES_PATH = Path("data/processed/all_teams_season_percentiles.csv")
+
+KEY_COLUMNS = ['squad', 'season']
+COMPANION_SUFFIXES = ('_rank', '_pct', '_z')
+
+
+def load_stats(data_path=DATA_PATH) -> tuple:
+    """Standard stats with goals_per_game, and the list of numeric metrics."""
+    df = pd.read_csv(data_path)
+    if 'goals_per_game' not in df.columns:
+        df['goals_per_game'] = df['performance_gls'] / df['playing_time_mp']
+    metrics = [
+        col for col in df.select_dtypes(include=[np.number]).columns
+        if col != 'season_start_year'
+    ]
+    return df, metrics
+
+
+def season_hashes(df: pd.DataFrame, metrics: list) -> dict:
+    """Content hash per season (row order independent)."""
+    row_hashes = pd.util.hash_pandas_object(df[KEY_COLUMNS + metrics], index=False)
+    return {
+        season: hashlib.sha1(np.sort(hashes.to_numpy()).tobytes()).hexdigest()[:16]
+        for season, hashes in row_hashes.groupby(df['season'])
+    }
+
+
+def companion_columns(df: pd.DataFrame, metrics: list, group_col: str = 'season') -> pd.DataFrame:
+    """
+    Rank, percentile and z-score of every metric within its group.
+
+    Returns:
+        pd.DataFrame: Same index as `df`; columns {metric}_rank, _pct, _z.
+            NaN where the metric is missing.
+    """
+    grouped = df.groupby(group_col)[metrics]
+    rank = grouped.rank(ascending=False, method='min')
+    pct = grouped.rank(pct=True, method='average') * 100
+    mean = grouped.transform('mean')
+    std = grouped.transform('std')
+    z = (df[metrics] - mean) / std.replace(0, np.nan)
+
+    companions = pd.concat([rank.add_suffix('_rank'), pct.add_suffix('_pct'), z.add_suffix('_z')], axis=1)
+    order = [f"{m}{suffix}" for m in metrics for suffix in COMPANION_SUFFIXES]
+    return companions[order]
+
+
+def update_percentiles(data_path=DATA_PATH, output_path=PERCENTILES_PATH) -> tuple:
+    """
+    Refresh the percentile file, recomputing only seasons whose rows changed.
+
+    Returns:
+        tuple: (full table with companion columns, list of recomputed seasons).
+    """
+    output_path = Path(output_path)
+    meta_path = output_path.with_suffix('.json')
+    df, metrics = load_stats(data_path)
+    hashes = season_hashes(df, metrics)
+
+    cached, old_hashes = None, {}
+    if output_path.exists() and meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # A different metric list changes every companion column
+        if meta['metrics'] == metrics:
+            cached = pd.read_csv(output_path)
+            old_hashes = meta['season_hashes']
+
+    stale = sorted(season for season, h in hashes.items() if old_hashes.get(season) != h)
+    fresh = df[df['season'].isin(stale)].copy()
+    fresh = pd.concat([fresh, companion_columns(fresh, metrics)], axis=1)
+
+    if cached is not None:
+        keep = cached[cached['season'].isin(hashes) & ~cached['season'].isin(stale)]
+        table = pd.concat([keep, fresh], ignore_index=True)
+    else:
+        table = fresh
+    table = table.sort_values(['season', 'squad']).reset_index(drop=True)
+
+    if stale or len(hashes) != len(old_hashes):
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        table.to_csv(tmp_path, index=False)
+        tmp_path.replace(output_path)
+        with open(meta_path, 'w') as f:
+            json.dump({'source': str(data_path), 'metrics': metrics, 'season_hashes': hashes}, f)
+    return table, stale
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("WITHIN-SEASON RANKS AND PERCENTILES")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    table, stale = update_percentiles()
+    elapsed = (time.perf_counter() - start) * 1000
+    n_metrics = sum(col.endswith('_pct') for col in table.columns)
+    print(f"{n_metrics} metrics x {table['season'].nunique()} seasons; "
+          f"recomputed {len(stale)} season(s) in {elapsed:.1f} ms")
+    print(f"Saved: {PERCENTILES_PATH}")
+
+    print("\n" + "=" * 80)
+    print("MAN UTD WITHIN-SEASON PERCENTILES")
+    print("=" * 80)
+    man_utd = table[table['squad'] == 'Manchester Utd']
+    cols = ['season', 'goals_per_game_rank', 'goals_per_game_pct', 'expected_xg_pct', 'poss_pct']
+    print(man_utd[[c for c in cols if c in man_utd.columns]].round(1).to_string(index=False))
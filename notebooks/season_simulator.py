@@ -0,0 +1,286 @@
+"""
+Monte Carlo Season Simulator (xG Poisson Model)
+===============================================
+
+Projects where every club finishes the current season. Each club gets an
+attack strength from `per_90_minutes_xg` (standard stats) and a defence
+strength from xG conceded (match log), both relative to the league average
+and shrunk towards last season while only a few games have been played.
+
+Remaining fixtures come from the match log (rows without a score). Each
+simulated season draws Poisson goals for every remaining fixture; points, goal
+difference and goals are accumulated with one matrix product per chunk and the
+table is ranked for all simulations at once. Chunks run across a process pool,
+each with its own SeedSequence stream.
+
+Output: finishing-position distribution, expected points, title / top-4 /
+relegation probabilities per club (data/processed/season_simulation.csv).
+
+Usage:
+    python notebooks/season_simulator.py --sims 50000 --workers 8
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from match_results import MatchLog, MATCH_LOG_DIR, MAN_UTD, team_match_rows
+
+DATA_PATH = Path("data/processed/all_teams_standard_stats.csv")
+OUTPUT_PATH = Path("data/processed/season_simulation.csv")
+
+# Games of last season's form a current-season estimate is shrunk towards
+PRIOR_GAMES = 10
+# sqrt(home xG / away xG) when the match log cannot provide it
+DEFAULT_HOME_ADVANTAGE = 1.1
+# Promoted clubs start from this quantile of last season's strengths
+PROMOTED_QUANTILE = 0.2
+CHUNK_SIMS = 5000
+RELEGATION_PLACES = 3
+
+
+def _previous_season(season: str) -> str:
+    start = int(season[:4]) - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _shrink(current: pd.Series, games: pd.Series, prior: pd.Series) -> pd.Series:
+    """Blend the current-season rate with last season's by games played."""
+    weight = games / (games + PRIOR_GAMES)
+    return (weight * current + (1 - weight) * prior).fillna(current)
+
+
+def _with_promoted_prior(prior: pd.Series, teams: list) -> pd.Series:
+    fallback = prior.quantile(PROMOTED_QUANTILE) if prior.notna().any() else np.nan
+    return prior.reindex(teams).fillna(fallback)
+
+
+def team_strengths(season: str, teams: list, df_all: pd.DataFrame, played: pd.DataFrame) -> pd.DataFrame:
+    """
+    Attack/defence multipliers (1.0 = league average) for each club.
+
+    Args:
+        season (str): Season being simulated, e.g. '2025-26'.
+        teams (list): Clubs in the season.
+        df_all (pd.DataFrame): All-teams standard stats (for per_90_minutes_xg).
+        played (pd.DataFrame): Played matches from the match log (may be empty).
+
+    Returns:
+        pd.DataFrame: Indexed by team with xg_for, xg_against, attack, defence.
+    """
+    stats = df_all.set_index(['season', 'squad'])
+    current = stats.loc[season]
+    previous_season = _previous_season(season)
+    previous = stats.loc[previous_season] if previous_season in stats.index.get_level_values(0) else None
+
+    games = current['playing_time_mp'].reindex(teams).fillna(0)
+    xg_for = current['per_90_minutes_xg'].reindex(teams)
+    if previous is not None:
+        xg_for = _shrink(xg_for, games, _with_promoted_prior(previous['per_90_minutes_xg'], teams))
+
+    # xG conceded is not in the standard stats; take it from the match log
+    rows = team_match_rows(played) if len(played) else pd.DataFrame(columns=['season', 'team', 'xg_against'])
+    per_season = rows.groupby(['season', 'team'])['xg_against'].agg(['mean', 'count'])
+    xg_against = pd.Series(np.nan, index=teams)
+    if season in per_season.index.get_level_values(0):
+        now = per_season.loc[season].reindex(teams)
+        xg_against = now['mean']
+        if previous_season in per_season.index.get_level_values(0):
+            prior = per_season.loc[previous_season]['mean']
+            # Promoted clubs concede more: use the upper quantile of last season
+            prior = prior.reindex(teams).fillna(prior.quantile(1 - PROMOTED_QUANTILE))
+            xg_against = _shrink(now['mean'], now['count'].fillna(0), prior)
+
+    strengths = pd.DataFrame({'xg_for': xg_for, 'xg_against': xg_against})
+    strengths['attack'] = strengths['xg_for'] / strengths['xg_for'].mean()
+    if strengths['xg_against'].notna().all():
+        strengths['defence'] = strengths['xg_against'] / strengths['xg_against'].mean()
+    else:
+        strengths['defence'] = 1.0
+    return strengths
+
+
+def home_advantage(played: pd.DataFrame, seasons: int = 3) -> float:
+    """sqrt(home xG / away xG) over the last few seasons of the match log."""
+    recent = played[played['season'].isin(sorted(played['season'].unique())[-seasons:])]
+    recent = recent.dropna(subset=['home_xg', 'away_xg'])
+    if recent.empty or recent['away_xg'].sum() == 0:
+        return DEFAULT_HOME_ADVANTAGE
+    return float(np.sqrt(recent['home_xg'].sum() / recent['away_xg'].sum()))
+
+
+def _simulate_chunk(task: tuple) -> tuple:
+    """Simulate `n_sims` seasons; returns (position counts, points sum)."""
+    lam_home, lam_away, home, away, start, n_teams, n_sims, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+
+    goals_home = rng.poisson(lam_home, size=(n_sims, len(lam_home))).astype(np.float32)
+    goals_away = rng.poisson(lam_away, size=(n_sims, len(lam_away))).astype(np.float32)
+    home_win = (goals_home > goals_away).astype(np.float32)
+    away_win = (goals_away > goals_home).astype(np.float32)
+    draw = 1.0 - home_win - away_win
+
+    # (fixtures, teams) one-hot maps turn per-fixture values into per-team totals
+    H = np.zeros((len(home), n_teams), dtype=np.float32)
+    A = np.zeros((len(away), n_teams), dtype=np.float32)
+    H[np.arange(len(home)), home] = 1.0
+    A[np.arange(len(away)), away] = 1.0
+
+    points = start['points'] + (3 * home_win + draw) @ H + (3 * away_win + draw) @ A
+    goals_for = start['goals_for'] + goals_home @ H + goals_away @ A
+    goals_against = start['goals_against'] + goals_away @ H + goals_home @ A
+    goal_diff = goals_for - goals_against
+
+    # Points, then goal difference, then goals scored; random final tiebreak
+    key = (points.astype(np.float64) * 1e6 + (goal_diff + 500) * 1e3 + goals_for
+           + rng.random((n_sims, n_teams)))
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.broadcast_to(np.arange(n_teams), order.shape), axis=1)
+
+    counts = np.bincount((np.arange(n_teams) * n_teams + positions).ravel(),
+                         minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return counts, points.sum(axis=0, dtype=np.float64)
+
+
+def simulate_season(fixtures: pd.DataFrame, played: pd.DataFrame, strengths: pd.DataFrame,
+                    home_adv: float = DEFAULT_HOME_ADVANTAGE, n_sims: int = 20000,
+                    workers: int = None, seed: int = 2025) -> pd.DataFrame:
+    """
+    Simulate the remaining fixtures `n_sims` times.
+
+    Args:
+        fixtures (pd.DataFrame): Unplayed fixtures (home, away).
+        played (pd.DataFrame): This season's played matches (starting table).
+        strengths (pd.DataFrame): Output of `team_strengths`.
+        home_adv (float): Multiplier on home xG (and divisor on away xG).
+        n_sims (int): Simulated seasons.
+        workers (int): Process pool size (1 = in-process).
+        seed (int): Root seed for the per-chunk streams.
+
+    Returns:
+        pd.DataFrame: Per club: current and expected points, mean position,
+            title / top-4 / relegation probabilities and P(position k) columns.
+    """
+    teams = list(strengths.index)
+    index = {team: i for i, team in enumerate(teams)}
+    n_teams = len(teams)
+
+    rows = team_match_rows(played) if len(played) else pd.DataFrame(
+        columns=['team', 'points', 'goals_for', 'goals_against'])
+    table = rows.groupby('team')[['points', 'goals_for', 'goals_against']].sum().reindex(teams).fillna(0)
+    start = {col: table[col].to_numpy(dtype=np.float32) for col in table.columns}
+
+    home = fixtures['home'].map(index).to_numpy()
+    away = fixtures['away'].map(index).to_numpy()
+    base = strengths['xg_for'].mean()
+    attack = strengths['attack'].to_numpy()
+    defence = strengths['defence'].to_numpy()
+    lam_home = base * attack[home] * defence[away] * home_adv
+    lam_away = base * attack[away] * defence[home] / home_adv
+
+    sizes = [min(CHUNK_SIMS, n_sims - s) for s in range(0, n_sims, CHUNK_SIMS)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(lam_home, lam_away, home, away, start, n_teams, size, stream)
+             for size, stream in zip(sizes, streams)]
+    if workers == 1:
+        results = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_chunk, tasks))
+
+    counts = sum(r[0] for r in results)
+    probs = counts / n_sims
+    places = np.arange(1, n_teams + 1)
+    out = pd.DataFrame({
+        'squad': teams,
+        'played': rows.groupby('team').size().reindex(teams).fillna(0).astype(int).to_numpy(),
+        'points': start['points'].astype(int),
+        'expected_points': sum(r[1] for r in results) / n_sims,
+        'mean_position': probs @ places,
+        'p_title': probs[:, 0],
+        'p_top4': probs[:, :4].sum(axis=1),
+        'p_relegation': probs[:, n_teams - RELEGATION_PLACES:].sum(axis=1),
+    })
+    for k in places:
+        out[f'p_pos_{k}'] = probs[:, k - 1]
+    return out.sort_values('expected_points', ascending=False).reset_index(drop=True)
+
+
+def season_fixtures(season: str, teams: list, match_log: MatchLog):
+    """
+    (remaining fixtures, played matches) for a season.
+
+    Without a match log every pairing is treated as unplayed (a full
+    double round-robin from zero points).
+    """
+    if match_log.exists():
+        current = match_log.current()
+        current = current[current['season'] == season]
+        if len(current):
+            played = current.dropna(subset=['home_goals', 'away_goals'])
+            remaining = current[current['home_goals'].isna() | current['away_goals'].isna()]
+            return remaining[['home', 'away']].reset_index(drop=True), played
+    pairs = pd.DataFrame(list(itertools.permutations(teams, 2)), columns=['home', 'away'])
+    return pairs, pd.DataFrame()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo projection of the current season")
+    parser.add_argument('--sims', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=2025)
+    parser.add_argument('--season', default=None, help="season label, default: latest in the data")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("MONTE CARLO SEASON SIMULATION")
+    print("=" * 80)
+
+    df_all = pd.read_csv(DATA_PATH)
+    season = args.season or df_all['season'].max()
+    match_log = MatchLog(MATCH_LOG_DIR)
+    if not match_log.exists():
+        print("⚠️ No match log found: simulating a full season from zero points "
+              "with league-average defence. Run notebooks/match_results.py for fixtures and xGA.")
+
+    teams = sorted(df_all.loc[df_all['season'] == season, 'squad'])
+    fixtures, played = season_fixtures(season, teams, match_log)
+    unknown = (set(fixtures['home']) | set(fixtures['away'])) - set(teams)
+    if unknown:
+        raise ValueError(f"Fixtures reference clubs missing from the standard stats: {sorted(unknown)}")
+
+    all_played = match_log.played() if match_log.exists() else pd.DataFrame()
+    strengths = team_strengths(season, teams, df_all, all_played)
+    home_adv = home_advantage(all_played) if len(all_played) else DEFAULT_HOME_ADVANTAGE
+    print(f"{season}: {len(played)} played, {len(fixtures)} remaining fixtures, home advantage x{home_adv:.3f}")
+
+    start = time.perf_counter()
+    projection = simulate_season(fixtures, played, strengths, home_adv, args.sims, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {args.sims:,} seasons in {elapsed:.2f}s "
+          f"({elapsed / args.sims * 10000:.2f}s per 10k seasons)")
+
+    projection.to_csv(OUTPUT_PATH, index=False)
+    print(f"Saved: {OUTPUT_PATH}")
+
+    print("\n" + "=" * 80)
+    print(f"PROJECTED {season} TABLE")
+    print("=" * 80)
+    cols = ['squad', 'played', 'points', 'expected_points', 'mean_position', 'p_title', 'p_top4', 'p_relegation']
+    print(projection[cols].round(3).to_string(index=False))
+
+    man_utd = projection[projection['squad'] == MAN_UTD]
+    if len(man_utd):
+        row = man_utd.iloc[0]
+        likely = int(np.argmax(row[[f'p_pos_{k}' for k in range(1, len(teams) + 1)]].to_numpy())) + 1
+        print(f"\nMan Utd: most likely finish {likely}, top 4 {row['p_top4']:.1%}, "
+              f"relegation {row['p_relegation']:.1%}")
@@ -0,0 +1,303 @@
+"""
+Similar Team-Season Index
+=========================
+
+"Which past team-season does this Man Utd season look like?" as a k-nearest-
+neighbour query instead of a manual scan.
+
+1. Profiles: per-90 versions of the standard, shooting, passing, defensive and
+   possession tables (fbref_tables.load_tables), one row per team-season.
+   Falls back to all_teams_standard_stats.csv when data/raw is not present.
+2. Scaling: features are standardised and projected onto their leading
+   principal components (90% of variance, at most MAX_COMPONENTS). Means,
+   scales and components are cached in data/processed/similarity_index.npz
+   and reused until the source files change.
+3. Index: a NumPy KD-tree over the projected coordinates. Low-dimensional
+   coordinates keep the tree effective, so queries stay sub-millisecond as
+   rows are added (more leagues, player-level rows).
+
+Usage:
+    python notebooks/similarity.py --squad "Manchester Utd" --season 2023-24 -k 5
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fbref_tables import RAW_DIR, KEY_COLUMNS, load_tables, table_files
+
+INDEX_PATH = Path("data/processed/similarity_index.npz")
+FALLBACK_PATH = Path("data/processed/all_teams_standard_stats.csv")
+
+PROFILE_TABLES = ['squad_standard', 'squad_shooting', 'squad_passing', 'squad_defensive', 'squad_possession']
+
+# Columns that are already rates, averages or shares, matched on the name without
+# the load_tables prefix; every other count is divided by 90s played
+RATE_COLUMNS = frozenset([
+    '#_pl', 'age', 'poss',
+    'standard_sh_90', 'standard_sot_90', 'standard_sot%', 'standard_g_sh', 'standard_g_sot',
+    'standard_dist', 'expected_npxg_sh',
+    'total_cmp%', 'short_cmp%', 'medium_cmp%', 'long_cmp%',
+    'challenges_tkl%', 'take_ons_succ%', 'take_ons_tkld%',
+])
+RATE_PREFIXES = ('per_90_minutes_',)
+# Playing time is the exposure, not a style feature (every club plays ~38 90s)
+EXPOSURE_COLUMNS = frozenset(['90s', 'playing_time_mp', 'playing_time_starts', 'playing_time_min',
+                              'playing_time_90s'])
+# Features observed in fewer rows than this are dropped (imputed otherwise)
+MIN_COVERAGE = 0.4
+EXPLAINED_VARIANCE = 0.9
+MAX_COMPONENTS = 12
+LEAF_SIZE = 64
+
+
+# ============================================================================
+# PROFILES AND SCALING
+# ============================================================================
+
+def _source_signature(raw_dir=RAW_DIR) -> tuple:
+    """(profile source, signature) so cached scaling is rebuilt when inputs or the feature spec change."""
+    spec = json.dumps([sorted(RATE_COLUMNS), RATE_PREFIXES, sorted(EXPOSURE_COLUMNS)]).encode()
+    files = [f for table in PROFILE_TABLES for f in table_files(table, raw_dir)]
+    if files:
+        stats = [(f, Path(f).stat().st_size, Path(f).stat().st_mtime_ns) for f in files]
+        return 'raw', hashlib.sha1(json.dumps(stats).encode() + spec).hexdigest()
+    return 'standard_stats', hashlib.sha1(FALLBACK_PATH.read_bytes() + spec).hexdigest()
+
+
+def load_profiles(raw_dir=RAW_DIR) -> pd.DataFrame:
+    """Wide per-team-season table from the raw FBRef tables (or the standard stats)."""
+    wide = load_tables(PROFILE_TABLES, raw_dir)
+    if len(wide):
+        return wide
+    return pd.read_csv(FALLBACK_PATH)
+
+
+def per_90_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Numeric feature columns, with season counts converted to per-90 values."""
+    nineties = next((df[c] for c in ['standard__playing_time_90s', 'playing_time_90s'] if c in df.columns), None)
+    features = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        name = col.split('__', 1)[-1]
+        if col == 'season_start_year' or name == 'rk' or name in EXPOSURE_COLUMNS:
+            continue
+        values = df[col].astype(float)
+        if nineties is not None and name not in RATE_COLUMNS and not name.startswith(RATE_PREFIXES):
+            values = values / nineties
+        features[col] = values
+    features = pd.DataFrame(features)
+    coverage = features.notna().mean()
+    return features.loc[:, (coverage >= MIN_COVERAGE) & (features.std() > 0)]
+
+
+def fit_scaling(features: pd.DataFrame) -> dict:
+    """Standardisation + PCA projection fitted on the feature matrix."""
+    X = features.to_numpy(dtype=np.float64)
+    mean = np.nanmean(X, axis=0)
+    scale = np.nanstd(X, axis=0)
+    Z = np.nan_to_num((X - mean) / scale)  # missing -> feature mean
+
+    _, singular, vt = np.linalg.svd(Z - Z.mean(axis=0), full_matrices=False)
+    explained = np.cumsum(singular ** 2) / np.sum(singular ** 2)
+    n_components = int(min(MAX_COMPONENTS, np.searchsorted(explained, EXPLAINED_VARIANCE) + 1))
+    return {
+        'features': list(features.columns),
+        'mean': mean,
+        'scale': scale,
+        'center': Z.mean(axis=0),
+        'components': vt[:n_components],
+        'explained': float(explained[n_components - 1]),
+    }
+
+
+def project(features: pd.DataFrame, scaling: dict) -> np.ndarray:
+    X = features.reindex(columns=scaling['features']).to_numpy(dtype=np.float64)
+    Z = np.nan_to_num((X - scaling['mean']) / scaling['scale'])
+    return (Z - scaling['center']) @ scaling['components'].T
+
+
+# ============================================================================
+# KD-TREE
+# ============================================================================
+
+class KDTree:
+    """Array-backed KD-tree (median splits on the widest dimension)."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.split_dim, self.split_val, self.left, self.right, self.start, self.end = [], [], [], [], [], []
+
+        stack = [(self._new_node(0, len(points)), 0, len(points))]
+        while stack:
+            node, lo, hi = stack.pop()
+            if hi - lo <= leaf_size:
+                continue
+            idx = self.order[lo:hi]
+            dim = int(np.ptp(self.points[idx], axis=0).argmax())
+            mid = (hi - lo) // 2
+            part = np.argpartition(self.points[idx, dim], mid)
+            self.order[lo:hi] = idx[part]
+            self.split_dim[node] = dim
+            self.split_val[node] = self.points[self.order[lo + mid], dim]
+            self.left[node] = self._new_node(lo, lo + mid)
+            self.right[node] = self._new_node(lo + mid, hi)
+            stack.append((self.left[node], lo, lo + mid))
+            stack.append((self.right[node], lo + mid, hi))
+        # Points stored in leaf order, so a leaf is a contiguous slice
+        self.leaf_points = self.points[self.order]
+
+    def _new_node(self, lo: int, hi: int) -> int:
+        self.split_dim.append(-1)
+        self.split_val.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.start.append(lo)
+        self.end.append(hi)
+        return len(self.start) - 1
+
+    def query(self, x: np.ndarray, k: int = 5) -> tuple:
+        """(distances, row indices) of the k nearest points, nearest first."""
+        x = np.asarray(x, dtype=np.float64)
+        coords = x.tolist()
+        best_d2 = np.full(k, np.inf)
+        best_rows = np.full(k, -1)
+        worst = np.inf
+        # (node, squared distance to the node's cell, per-dimension squared offsets)
+        stack = [(0, 0.0, [0.0] * len(coords))]
+        while stack:
+            node, bound, offsets = stack.pop()
+            if bound >= worst:
+                continue
+            dim = self.split_dim[node]
+            if dim < 0:
+                # Leaf: merge its points into the current best k in one step
+                lo, hi = self.start[node], self.end[node]
+                rows = self.order[lo:hi]
+                diff = self.leaf_points[lo:hi] - x
+                d2 = np.einsum('ij,ij->i', diff, diff)
+                if d2.min() < worst:
+                    d2 = np.concatenate([best_d2, d2])
+                    candidates = np.concatenate([best_rows, rows])
+                    keep = np.argpartition(d2, k - 1)[:k]
+                    best_d2, best_rows = d2[keep], candidates[keep]
+                    worst = best_d2.max()
+                continue
+            # Scalar bookkeeping on internal nodes (incremental cell distance)
+            diff = coords[dim] - self.split_val[node]
+            near, far = (self.left[node], self.right[node]) if diff < 0 else (self.right[node], self.left[node])
+            far_bound = bound - offsets[dim] + diff * diff
+            if far_bound < worst:
+                far_offsets = offsets.copy()
+                far_offsets[dim] = diff * diff
+                stack.append((far, far_bound, far_offsets))
+            stack.append((near, bound, offsets))
+        order = np.argsort(best_d2)
+        found = best_rows[order] >= 0
+        return np.sqrt(best_d2[order][found]), best_rows[order][found]
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class SimilarityIndex:
+    """k-NN over team-season profiles with cached scaling."""
+
+    def __init__(self, keys: pd.DataFrame, coords: np.ndarray, scaling: dict):
+        self.keys = keys.reset_index(drop=True)
+        self.coords = coords
+        self.scaling = scaling
+        self.tree = KDTree(coords)
+        self.squads = self.keys['squad'].to_numpy()
+        self.seasons = self.keys['season'].to_numpy()
+        self.row_index = {(s, t): i for i, (s, t) in enumerate(zip(self.squads, self.seasons))}
+
+    @classmethod
+    def build(cls, raw_dir=RAW_DIR, index_path=INDEX_PATH) -> 'SimilarityIndex':
+        """Load the cached index if its sources are unchanged, else rebuild and cache it."""
+        index_path = Path(index_path)
+        source, signature = _source_signature(raw_dir)
+        if index_path.exists():
+            with np.load(index_path, allow_pickle=False) as cached:
+                meta = json.loads(str(cached['meta']))
+                if meta['signature'] == signature:
+                    scaling = {
+                        'features': meta['features'], 'explained': meta['explained'],
+                        'mean': cached['mean'], 'scale': cached['scale'],
+                        'center': cached['center'], 'components': cached['components'],
+                    }
+                    keys = pd.DataFrame(meta['keys'], columns=KEY_COLUMNS)
+                    return cls(keys, cached['coords'], scaling)
+
+        profiles = load_profiles(raw_dir)
+        features = per_90_features(profiles)
+        scaling = fit_scaling(features)
+        coords = project(features, scaling)
+        keys = profiles[KEY_COLUMNS]
+
+        meta = {
+            'signature': signature, 'source': source, 'features': scaling['features'],
+            'explained': scaling['explained'], 'keys': keys.values.tolist(),
+        }
+        np.savez(index_path, meta=np.array(json.dumps(meta)), coords=coords,
+                 **{name: scaling[name] for name in ('mean', 'scale', 'center', 'components')})
+        return cls(keys, coords, scaling)
+
+    def query(self, squad: str, season: str, k: int = 5, include_self: bool = False) -> pd.DataFrame:
+        """The k team-seasons most similar to (squad, season)."""
+        try:
+            row = self.row_index[(squad, season)]
+        except KeyError:
+            raise KeyError(f"No profile for {squad} {season}") from None
+        distances, rows = self.tree.query(self.coords[row], k + (0 if include_self else 1))
+        keep = rows != row if not include_self else np.ones(len(rows), dtype=bool)
+        rows, distances = rows[keep][:k], distances[keep][:k]
+        return pd.DataFrame({
+            'squad': self.squads[rows],
+            'season': self.seasons[rows],
+            'distance': distances,
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the most similar team-seasons")
+    parser.add_argument('--squad', default='Manchester Utd')
+    parser.add_argument('--season', default=None, help="default: latest season")
+    parser.add_argument('-k', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("SIMILAR TEAM-SEASONS")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    index = SimilarityIndex.build()
+    print(f"Index over {len(index.keys)} team-seasons, {len(index.scaling['features'])} features -> "
+          f"{index.coords.shape[1]} components ({index.scaling['explained']:.0%} of variance) "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    season = args.season or index.keys['season'].max()
+    print(f"\nMost similar to {args.squad} {season}:")
+    print(index.query(args.squad, season, args.k).round(3).to_string(index=False))
+
+    # Latency over every team-season, checked against brute force
+    rows = list(index.row_index)
+    start = time.perf_counter()
+    for squad, season_key in rows:
+        index.query(squad, season_key, args.k)
+    per_query_us = (time.perf_counter() - start) / len(rows) * 1e6
+    row = index.row_index[(args.squad, season)]
+    brute = np.argsort(((index.coords - index.coords[row]) ** 2).sum(axis=1))[1:args.k + 1]
+    tree = index.tree.query(index.coords[row], args.k + 1)[1][1:]
+    print(f"\nQuery latency: {per_query_us:.0f} µs per k-NN query "
+          f"(matches brute force: {set(brute) == set(tree)})")
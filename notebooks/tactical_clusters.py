@@ -0,0 +1,319 @@
+"""
+Tactical Style Clusters
+=======================
+
+06 plots possession, tackles + interceptions and progressive carries one line
+per club. This module groups team-seasons by playing style instead: mini-batch
+k-means over the standardised tactical feature matrix, then tracks which style
+cluster each club belonged to season by season.
+
+Features (per 90 where they are counts):
+- raw FBRef tables (fbref_tables): possession, touches, progressive carries,
+  tackles + interceptions, pass completion %, progressive passes, shot distance
+- fallback without data/raw: possession, progressive carries and passes,
+  npxG, xAG and squad age from all_teams_standard_stats.csv
+
+FBRef only has these stats from 2017-18 (possession from 2014-15), so only
+team-seasons from 2017-18 on are clustered; the Ferguson years have no
+tactical features and are left out (the run reports how many). npxG / xAG are
+optional: they are dropped rather than allowed to cut further seasons.
+
+Mini-batch k-means (Sculley, 2010) updates centroids from small random batches
+with a per-centroid learning rate of 1 / (points seen), so the cost of a fit is
+set by the number of steps, not the number of rows. The model (scaling,
+centroids, counts, per-season content hashes) is saved to
+data/processed/tactical_clusters.npz. When a season is added or changes, the
+saved centroids are warm-started and only a few batches are run, half drawn
+from the changed seasons; cluster ids stay stable across updates, which is what
+makes membership over time comparable. --refit starts from scratch.
+
+Usage:
+    python notebooks/tactical_clusters.py           # fit or warm-start update
+    python notebooks/tactical_clusters.py --refit -k 6
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fbref_tables import RAW_DIR, KEY_COLUMNS, load_tables
+
+MODEL_PATH = Path("data/processed/tactical_clusters.npz")
+MEMBERSHIP_PATH = Path("data/processed/tactical_clusters.csv")
+FALLBACK_PATH = Path("data/processed/all_teams_standard_stats.csv")
+
+# feature name -> (source column, divide by 90s played)
+RAW_FEATURES = {
+    'possession': ('possession__poss', False),
+    'touches_per_90': ('possession__touches', True),
+    'prgc_per_90': ('possession__carries_prgc', True),
+    'tkl_int_per_90': ('defensive__tkl_int', True),
+    'pass_cmp_pct': ('passing__total_cmp%', False),
+    'prgp_per_90': ('passing__prgp', True),
+    'shot_distance': ('shooting__standard_dist', False),
+}
+FALLBACK_FEATURES = {
+    'possession': ('poss', False),
+    'prgc_per_90': ('progression_prgc', True),
+    'prgp_per_90': ('progression_prgp', True),
+    'npxg_per_90': ('per_90_minutes_npxg', False),
+    'xag_per_90': ('per_90_minutes_xag', False),
+    'squad_age': ('age', False),
+}
+
+# Used only where present for every team-season the other features cover
+OPTIONAL_FEATURES = ('npxg_per_90', 'xag_per_90')
+
+DEFAULT_K = 5
+BATCH_SIZE = 64
+FIT_STEPS = 300
+WARM_STEPS = 60
+N_INIT = 5
+TOLERANCE = 1e-4
+
+
+# ============================================================================
+# FEATURES
+# ============================================================================
+
+def tactical_features(raw_dir=RAW_DIR) -> pd.DataFrame:
+    """
+    (squad, season) plus one column per tactical feature; incomplete rows dropped.
+
+    Per-90 features are skipped when no 90s-played column is available.
+    """
+    wide = load_tables(['squad_standard', 'squad_shooting', 'squad_passing',
+                        'squad_defensive', 'squad_possession'], raw_dir)
+    if len(wide):
+        spec, nineties = RAW_FEATURES, wide.get('standard__playing_time_90s')
+    else:
+        wide = pd.read_csv(FALLBACK_PATH)
+        spec, nineties = FALLBACK_FEATURES, wide['playing_time_90s']
+
+    if nineties is None:
+        print("⚠️ No 90s played (squad_standard missing): per-90 tactical features skipped")
+
+    features = wide[KEY_COLUMNS].copy()
+    for name, (column, per_90) in spec.items():
+        if column not in wide.columns or (per_90 and nineties is None):
+            continue
+        values = pd.to_numeric(wide[column], errors='coerce')
+        features[name] = values / nineties if per_90 else values
+
+    required = [c for c in features.columns if c not in KEY_COLUMNS and c not in OPTIONAL_FEATURES]
+    covered = features[required].notna().all(axis=1)
+    optional = [c for c in OPTIONAL_FEATURES if c in features.columns]
+    features = features.drop(columns=[c for c in optional if features.loc[covered, c].isna().any()])
+
+    complete = features.dropna().reset_index(drop=True)
+    if 0 < len(complete) < len(features):
+        print(f"⚠️ {len(features) - len(complete)} of {len(features)} team-seasons have no tactical stats "
+              f"(FBRef has them from {complete['season'].min()} on) and are not clustered")
+    return complete
+
+
+def season_hashes(features: pd.DataFrame) -> dict:
+    """Content hash per season, used to find seasons that changed since the last fit."""
+    row_hashes = pd.util.hash_pandas_object(features, index=False)
+    return {
+        season: hashlib.sha1(np.sort(hashes.to_numpy()).tobytes()).hexdigest()[:16]
+        for season, hashes in row_hashes.groupby(features['season'])
+    }
+
+
+# ============================================================================
+# MINI-BATCH K-MEANS
+# ============================================================================
+
+def squared_distances(X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """(n, k) squared Euclidean distances."""
+    return ((X * X).sum(axis=1)[:, None] - 2 * X @ centroids.T + (centroids * centroids).sum(axis=1)[None, :]).clip(0)
+
+
+def kmeans_plus_plus(X: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """k-means++ seeding."""
+    centroids = [X[rng.integers(len(X))]]
+    for _ in range(1, k):
+        d2 = squared_distances(X, np.array(centroids)).min(axis=1)
+        centroids.append(X[rng.choice(len(X), p=d2 / d2.sum())])
+    return np.array(centroids)
+
+
+def minibatch_steps(X: np.ndarray, centroids: np.ndarray, counts: np.ndarray, n_steps: int,
+                    rng: np.random.Generator, focus: np.ndarray = None) -> tuple:
+    """
+    Run mini-batch k-means updates on copies of `centroids` and `counts`.
+
+    Args:
+        focus (np.ndarray): Optional row indices; half of every batch is drawn
+            from them (the changed seasons on a warm start).
+
+    Returns:
+        tuple: (centroids, counts, steps run).
+    """
+    centroids, counts = centroids.copy(), counts.astype(np.float64).copy()
+    k = len(centroids)
+    for step in range(1, n_steps + 1):
+        batch = rng.integers(len(X), size=BATCH_SIZE)
+        if focus is not None and len(focus):
+            batch[:BATCH_SIZE // 2] = focus[rng.integers(len(focus), size=BATCH_SIZE // 2)]
+        points = X[batch]
+        labels = squared_distances(points, centroids).argmin(axis=1)
+
+        batch_counts = np.bincount(labels, minlength=k).astype(np.float64)
+        batch_sums = np.zeros_like(centroids)
+        np.add.at(batch_sums, labels, points)
+        counts += batch_counts
+        hit = batch_counts > 0
+        # Per-centroid learning rate: (batch points) / (all points seen)
+        eta = batch_counts[hit] / counts[hit]
+        previous = centroids.copy()
+        centroids[hit] += eta[:, None] * (batch_sums[hit] / batch_counts[hit, None] - centroids[hit])
+        if np.abs(centroids - previous).max() < TOLERANCE:
+            break
+    return centroids, counts, step
+
+
+def inertia(X: np.ndarray, centroids: np.ndarray) -> float:
+    return float(squared_distances(X, centroids).min(axis=1).sum())
+
+
+# ============================================================================
+# MODEL
+# ============================================================================
+
+class TacticalClusters:
+    """Mini-batch k-means model with persisted state and warm-started updates."""
+
+    def __init__(self, model_path=MODEL_PATH):
+        self.model_path = Path(model_path)
+        self.state = None
+        if self.model_path.exists():
+            with np.load(self.model_path, allow_pickle=False) as saved:
+                self.state = {name: saved[name] for name in ('centroids', 'counts', 'mean', 'scale')}
+                self.state.update(json.loads(str(saved['meta'])))
+
+    def _standardise(self, features: pd.DataFrame) -> np.ndarray:
+        X = features[self.state['features']].to_numpy(dtype=np.float64)
+        return (X - self.state['mean']) / self.state['scale']
+
+    def fit(self, features: pd.DataFrame, k: int = DEFAULT_K, seed: int = 2013) -> dict:
+        """Full fit: new scaling, best of N_INIT k-means++ starts."""
+        names = [c for c in features.columns if c not in KEY_COLUMNS]
+        X = features[names].to_numpy(dtype=np.float64)
+        self.state = {'features': names, 'k': k, 'seed': seed,
+                      'mean': X.mean(axis=0), 'scale': X.std(axis=0)}
+        X = self._standardise(features)
+
+        rng = np.random.default_rng(seed)
+        best = None
+        for _ in range(N_INIT):
+            start = kmeans_plus_plus(X, k, rng)
+            centroids, counts, steps = minibatch_steps(X, start, np.zeros(k), FIT_STEPS, rng)
+            score = inertia(X, centroids)
+            if best is None or score < best[0]:
+                best = (score, centroids, counts, steps)
+        _, self.state['centroids'], self.state['counts'], steps = best
+        self.state['season_hashes'] = season_hashes(features)
+        self.state['updates'] = 0
+        return {'mode': 'fit', 'steps': steps, 'changed_seasons': sorted(self.state['season_hashes'])}
+
+    def update(self, features: pd.DataFrame) -> dict:
+        """Warm-start from the saved centroids using batches focused on changed seasons."""
+        hashes = season_hashes(features)
+        changed = sorted(s for s, h in hashes.items() if self.state['season_hashes'].get(s) != h)
+        steps = 0
+        if changed:
+            X = self._standardise(features)
+            focus = np.flatnonzero(features['season'].isin(changed).to_numpy())
+            rng = np.random.default_rng([self.state['seed'], self.state['updates'] + 1])
+            self.state['centroids'], self.state['counts'], steps = minibatch_steps(
+                X, self.state['centroids'], self.state['counts'], WARM_STEPS, rng, focus)
+            self.state['updates'] += 1
+        self.state['season_hashes'] = hashes
+        return {'mode': 'warm', 'steps': steps, 'changed_seasons': changed}
+
+    def fit_or_update(self, features: pd.DataFrame, k: int = DEFAULT_K, refit: bool = False) -> dict:
+        features_match = self.state is not None and self.state['features'] == \
+            [c for c in features.columns if c not in KEY_COLUMNS]
+        if refit or not features_match or self.state['k'] != k:
+            return self.fit(features, k)
+        return self.update(features)
+
+    def assign(self, features: pd.DataFrame) -> pd.DataFrame:
+        """Cluster and distance to its centroid for every team-season."""
+        d2 = squared_distances(self._standardise(features), self.state['centroids'])
+        labels = d2.argmin(axis=1)
+        membership = features[KEY_COLUMNS].copy()
+        membership['cluster'] = labels
+        membership['distance'] = np.sqrt(d2[np.arange(len(labels)), labels])
+        return membership
+
+    def profiles(self) -> pd.DataFrame:
+        """Centroids in original units, one row per cluster."""
+        values = self.state['centroids'] * self.state['scale'] + self.state['mean']
+        profile = pd.DataFrame(values, columns=self.state['features'])
+        profile.index.name = 'cluster'
+        return profile
+
+    def save(self) -> None:
+        meta = {name: self.state[name] for name in ('features', 'k', 'seed', 'season_hashes', 'updates')}
+        tmp_path = self.model_path.with_name(self.model_path.stem + '.tmp.npz')
+        np.savez(tmp_path, meta=np.array(json.dumps(meta)),
+                 **{name: self.state[name] for name in ('centroids', 'counts', 'mean', 'scale')})
+        tmp_path.replace(self.model_path)
+
+
+def membership_over_time(membership: pd.DataFrame, squads: list) -> pd.DataFrame:
+    """Cluster per season (columns) for each club (rows)."""
+    subset = membership[membership['squad'].isin(squads)]
+    return subset.pivot(index='squad', columns='season', values='cluster').reindex(squads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster team-seasons by tactical style")
+    parser.add_argument('-k', type=int, default=DEFAULT_K)
+    parser.add_argument('--refit', action='store_true', help="ignore the saved model and fit from scratch")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("TACTICAL STYLE CLUSTERS")
+    print("=" * 80)
+
+    features = tactical_features()
+    if features.empty:
+        print("⚠️ No tactical features available (need data/raw or advanced standard stats).")
+        raise SystemExit(1)
+    print(f"{len(features)} team-seasons x {features.shape[1] - 2} features "
+          f"({features['season'].min()} to {features['season'].max()})")
+
+    model = TacticalClusters(MODEL_PATH)
+    start = time.perf_counter()
+    result = model.fit_or_update(features, args.k, args.refit)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{result['mode']}: {result['steps']} mini-batch steps, "
+          f"{len(result['changed_seasons'])} changed season(s), {elapsed:.1f} ms")
+    model.save()
+
+    membership = model.assign(features)
+    membership.to_csv(MEMBERSHIP_PATH, index=False)
+    print(f"Saved: {MODEL_PATH}, {MEMBERSHIP_PATH}")
+
+    print("\nCluster profiles:")
+    profiles = model.profiles()
+    profiles['team_seasons'] = membership['cluster'].value_counts().reindex(profiles.index).fillna(0).astype(int)
+    print(profiles.round(2).to_string())
+
+    print("\n" + "=" * 80)
+    print("STYLE CLUSTER BY SEASON")
+    print("=" * 80)
+    squads = ['Manchester Utd', 'Manchester City', 'Liverpool', 'Arsenal', 'Chelsea', 'Tottenham']
+    print(membership_over_time(membership, squads).to_string())
@@ -0,0 +1,188 @@
+"""
+Batch Least-Squares Trend Engine
+================================
+
+05 and 07 call clubs "declining" by eyeballing line charts. This module fits
+trends to every (club, metric) series in the metric matrix at once and reports
+slopes with standard errors, so each claim has a number attached.
+
+Three models per series, all in goals/points/etc. per season:
+
+- linear:      y = a + b*t over all seasons
+- era_linear:  separate lines within each era (analytics_api.ERAS), with the
+               change in slope from the previous era and its standard error
+- piecewise:   one continuous line with hinges at the era boundaries
+               (after 2013 and 2020); the hinge coefficients are the slope
+               changes
+
+Every model is solved for all series together: the normal equations X'WX
+and X'Wy are built with one einsum over a (series, seasons) weight mask
+(missing seasons have weight 0) and inverted as a stack of small matrices.
+Count metrics are per match (MetricMatrix.per_game).
+
+Usage:
+    python notebooks/trends.py
+
+Author: Data-driven analysis of Man Utd's struggles
+Date: 2026-10-18
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics_api import DEFAULT_RIVALS, ERAS, era_label
+from metric_matrix import MetricMatrix, load_matrix
+
+OUTPUT_PATH = Path("data/processed/trends.csv")
+
+# Last season start year of each era but the final one (as in era_label)
+ERA_ENDS = [2013, 2020]
+
+
+def stacked_lstsq(X: np.ndarray, Y: np.ndarray, W: np.ndarray) -> dict:
+    """
+    Weighted least squares for many series sharing one design matrix.
+
+    Args:
+        X (np.ndarray): (n_obs, p) design matrix.
+        Y (np.ndarray): (n_series, n_obs) responses (NaN allowed where W is 0).
+        W (np.ndarray): (n_series, n_obs) 0/1 weights.
+
+    Returns:
+        dict: coef (n_series, p), cov (n_series, p, p), n (n_series,);
+            NaN for series that are rank deficient or have no residual
+            degrees of freedom.
+    """
+    p = X.shape[1]
+    W = W.astype(np.float64)
+    Y0 = np.where(W > 0, Y, 0.0)
+
+    XtWX = np.einsum('tp,st,tq->spq', X, W, X)
+    XtWy = np.einsum('tp,st->sp', X, W * Y0)
+    n = W.sum(axis=1)
+
+    valid = (n > p) & (np.linalg.matrix_rank(XtWX) == p)
+    XtWX[~valid] = np.eye(p)
+    inv = np.linalg.inv(XtWX)
+    coef = np.einsum('spq,sq->sp', inv, XtWy)
+
+    resid = (Y0 - coef @ X.T) * W
+    dof = np.where(valid, n - p, 1)
+    s2 = (resid ** 2).sum(axis=1) / dof
+    cov = s2[:, None, None] * inv
+
+    coef[~valid] = np.nan
+    cov[~valid] = np.nan
+    return {'coef': coef, 'cov': cov, 'n': n.astype(int)}
+
+
+def _contrast(fit: dict, c: np.ndarray):
+    """Estimate and standard error of c'beta for every series."""
+    est = fit['coef'] @ c
+    se = np.sqrt(np.einsum('p,spq,q->s', c, fit['cov'], c))
+    return est, se
+
+
+def fit_trends(matrix: MetricMatrix, metrics: list = None) -> pd.DataFrame:
+    """
+    Fit linear, per-era and piecewise trends to every (club, metric) series.
+
+    Returns:
+        pd.DataFrame: One row per (squad, metric, model, era) with slope,
+            slope_se, n_seasons and, where defined, slope_change / _se / _t
+            (vs the previous era).
+    """
+    metrics = metrics or matrix.analysis_metrics()
+    n_teams, n_seasons, _ = matrix.values.shape
+    Y = matrix.per_game(metrics).transpose(0, 2, 1).reshape(-1, n_seasons)
+    W = ~np.isnan(Y)
+
+    years = np.array([int(s[:4]) for s in matrix.seasons], dtype=np.float64)
+    t = years - (ERA_ENDS[0] + 0.5)  # centred on the Ferguson cutoff
+    eras = np.array([era_label(int(y)) for y in years])
+    squads = np.repeat(matrix.teams, len(metrics))
+    metric_names = np.tile(metrics, n_teams)
+
+    frames = []
+
+    def add(model, era, slope, se, n, change=None, change_se=None):
+        frame = pd.DataFrame({
+            'squad': squads, 'metric': metric_names, 'model': model, 'era': era,
+            'slope': slope, 'slope_se': se, 'n_seasons': n,
+        })
+        if change is not None:
+            frame['slope_change'] = change
+            frame['slope_change_se'] = change_se
+        frames.append(frame)
+
+    # Linear over all seasons
+    X = np.column_stack([np.ones_like(t), t])
+    fit = stacked_lstsq(X, Y, W)
+    add('linear', 'All seasons', fit['coef'][:, 1], np.sqrt(fit['cov'][:, 1, 1]), fit['n'])
+
+    # Separate line per era, slope change vs the previous era
+    previous = None
+    for era in ERAS:
+        fit = stacked_lstsq(X, Y, W & (eras == era)[None, :])
+        slope, se = fit['coef'][:, 1], np.sqrt(fit['cov'][:, 1, 1])
+        if previous is None:
+            add('era_linear', era, slope, se, fit['n'])
+        else:
+            add('era_linear', era, slope, se, fit['n'],
+                slope - previous[0], np.sqrt(se ** 2 + previous[1] ** 2))
+        previous = (slope, se)
+
+    # Continuous piecewise line with hinges at the era boundaries
+    hinges = [np.maximum(years - (end + 0.5), 0.0) for end in ERA_ENDS]
+    X_pw = np.column_stack([np.ones_like(t), t] + hinges)
+    fit = stacked_lstsq(X_pw, Y, W)
+    for k, era in enumerate(ERAS):
+        c = np.zeros(X_pw.shape[1])
+        c[1:2 + k] = 1.0  # base slope plus every hinge already passed
+        slope, se = _contrast(fit, c)
+        n = (W & (eras == era)[None, :]).sum(axis=1)
+        if k == 0:
+            add('piecewise', era, slope, se, n)
+        else:
+            add('piecewise', era, slope, se, n, fit['coef'][:, 1 + k], np.sqrt(fit['cov'][:, 1 + k, 1 + k]))
+
+    trends = pd.concat(frames, ignore_index=True)
+    trends['slope_t'] = trends['slope'] / trends['slope_se']
+    trends['slope_change_t'] = trends['slope_change'] / trends['slope_change_se']
+    return trends.dropna(subset=['slope']).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("BATCH TREND FITS")
+    print("=" * 80)
+
+    matrix = load_matrix()
+    start = time.perf_counter()
+    trends = fit_trends(matrix)
+    elapsed = (time.perf_counter() - start) * 1000
+    n_series = len(matrix.teams) * len(matrix.analysis_metrics())
+    print(f"Fitted 3 models to {n_series:,} series in {elapsed:.1f} ms ({len(trends):,} slope rows)")
+
+    trends.to_csv(OUTPUT_PATH, index=False)
+    print(f"Saved: {OUTPUT_PATH}")
+
+    # xG only exists from 2017, so piecewise fits are defined for season-long metrics only
+    print("\n" + "=" * 80)
+    print("RIVALS: goals_per_game change per season, piecewise trend")
+    print("=" * 80)
+    cols = ['squad', 'era', 'slope', 'slope_se', 'n_seasons', 'slope_change', 'slope_change_t']
+    view = trends[(trends['metric'] == 'goals_per_game') & (trends['model'] == 'piecewise')
+                  & trends['squad'].isin(DEFAULT_RIVALS)]
+    print(view[cols].round(4).to_string(index=False))
+
+    print("\n" + "=" * 80)
+    print("MAN UTD: LARGEST SLOPE CHANGES AFTER 2013 (per-era fits, |t| > 2)")
+    print("=" * 80)
+    man_utd = trends[(trends['squad'] == 'Manchester Utd') & (trends['model'] == 'era_linear')
+                     & (trends['era'] == ERAS[1]) & (trends['slope_change_t'].abs() > 2)]
+    print(man_utd.sort_values('slope_change_t')[['metric', 'slope', 'slope_change', 'slope_change_t']]
+          .round(4).to_string(index=False))
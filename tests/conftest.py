@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "notebooks"))
+
+
+@pytest.fixture
+def fixtures():
+    """Double round-robin for six clubs in one season, in MATCH_COLUMNS form (all played)."""
+    rng = np.random.default_rng(7)
+    teams = ['Arsenal', 'Chelsea', 'Liverpool', 'Manchester City', 'Manchester Utd', 'Tottenham']
+    n = len(teams)
+    rows = []
+    for leg in range(2):
+        for week in range(n - 1):
+            # Circle method: every club plays once per matchweek
+            order = [teams[0]] + [teams[1 + (i + week) % (n - 1)] for i in range(n - 1)]
+            for i in range(n // 2):
+                home, away = order[i], order[n - 1 - i]
+                if leg:
+                    home, away = away, home
+                matchweek = leg * (n - 1) + week + 1
+                rows.append({
+                    'season': '2024-25', 'matchweek': matchweek,
+                    'date': pd.Timestamp('2024-08-17') + pd.Timedelta(weeks=matchweek - 1),
+                    'home': home, 'away': away,
+                    'home_goals': float(rng.integers(0, 4)), 'away_goals': float(rng.integers(0, 4)),
+                    'home_xg': 1.5, 'away_xg': 1.0,
+                })
+    return pd.DataFrame(rows)
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from elo import EloEngine
+from match_results import MatchLog
+
+
+def _replayed(log):
+    engine = EloEngine()
+    engine.update(log)
+    return engine
+
+
+def _assert_same_state(engine, replay):
+    pd.testing.assert_frame_equal(engine.current_ratings(), replay.current_ratings())
+    key = ['date', 'team', 'opponent']
+    pd.testing.assert_frame_equal(engine.history_frame().sort_values(key).reset_index(drop=True),
+                                  replay.history_frame().sort_values(key).reset_index(drop=True))
+
+
+def test_incremental_update_matches_full_replay(tmp_path, fixtures):
+    log = MatchLog(tmp_path / "log")
+    state_path = tmp_path / "elo_state.npz"
+    for matchweek in sorted(fixtures['matchweek'].unique()):
+        log.append(fixtures[fixtures['matchweek'] == matchweek])
+        # Reload from disk each time, as the scripts do between runs
+        EloEngine(state_path).update(log)
+
+    _assert_same_state(EloEngine(state_path), _replayed(log))
+
+
+def test_correction_matches_full_replay(tmp_path, fixtures):
+    log = MatchLog(tmp_path / "log")
+    engine = EloEngine()
+    log.append(fixtures[fixtures['matchweek'] <= 6])
+    engine.update(log)
+
+    corrected = fixtures[fixtures['matchweek'] == 3].iloc[[0]].copy()
+    corrected['away_goals'] += 3
+    log.append(pd.concat([fixtures[fixtures['matchweek'] == 7], corrected]))
+    engine.update(log)
+
+    _assert_same_state(engine, _replayed(log))
+    assert engine.games.sum() == 2 * 7 * 3
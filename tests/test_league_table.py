@@ -0,0 +1,67 @@
+import pandas as pd
+
+from league_table import LeagueTableEngine
+from match_results import MatchLog
+
+
+def _correct(fixtures, matchweek):
+    """The first result of `matchweek` with a changed score."""
+    row = fixtures[fixtures['matchweek'] == matchweek].iloc[[0]].copy()
+    row['home_goals'] += 2
+    return row
+
+
+def _rebuilt(log):
+    engine = LeagueTableEngine()
+    engine.update(log)
+    return engine.standings()
+
+
+def test_incremental_update_matches_rebuild(tmp_path, fixtures):
+    log = MatchLog(tmp_path / "log")
+    state_path = tmp_path / "table_state.npz"
+    log.append(fixtures[fixtures['matchweek'] <= 3])
+    LeagueTableEngine(state_path).update(log)
+
+    # A new matchweek plus a corrected score from an earlier one
+    log.append(pd.concat([fixtures[fixtures['matchweek'] == 4], _correct(fixtures, 2)]))
+    engine = LeagueTableEngine(state_path)
+    touched = engine.update(log)
+
+    assert touched == {'2024-25'}
+    pd.testing.assert_frame_equal(engine.standings(), _rebuilt(log))
+
+
+def test_matchweek_by_matchweek_matches_rebuild(tmp_path, fixtures):
+    log = MatchLog(tmp_path / "log")
+    engine = LeagueTableEngine()
+    for matchweek in sorted(fixtures['matchweek'].unique()):
+        log.append(fixtures[fixtures['matchweek'] == matchweek])
+        engine.update(log)
+    log.append(_correct(fixtures, 7))
+    engine.update(log)
+
+    pd.testing.assert_frame_equal(engine.standings(), _rebuilt(log))
+    final = engine.final_table('2024-25')
+    assert final['played'].eq(10).all()
+
+
+def test_changes_retract_superseded_results(tmp_path, fixtures):
+    log = MatchLog(tmp_path / "log")
+    log.append(fixtures[fixtures['matchweek'] <= 2])
+    cursor = log.version
+    corrected = _correct(fixtures, 1)
+    log.append(corrected)
+
+    batches = dict(log.changes(cursor))
+    assert list(batches) == [('2024-25', 1)]
+    batch = batches[('2024-25', 1)]
+    assert sorted(batch['sign']) == [-1, 1]
+    old = batch[batch['sign'] == -1].iloc[0]
+    new = batch[batch['sign'] == 1].iloc[0]
+    assert (old['home'], old['away']) == (new['home'], new['away'])
+    assert new['home_goals'] == old['home_goals'] + 2
+
+    # Unchanged rows are not logged again, so there is nothing to consume
+    assert log.append(fixtures[fixtures['matchweek'] <= 2].drop(corrected.index)) == 0
+    assert list(log.changes(log.version)) == []
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "notebooks"))
+
+from rate_control import self_check  # noqa: E402
+
+
+def test_adaptive_limiter_finds_server_limit():
+    assert self_check()